@@ -0,0 +1,209 @@
+"""End-to-end throughput of ``run_posting`` against a fake Facebook and fake Sheets.
+
+Usage:
+    python benchmarks/bench_run.py [--groups N] [--workers N] [--browser chrome|edge] ...
+
+Group pages come from a local HTTP server serving the composer fixture (see
+``fake_facebook.py``) and the spreadsheet is the in-memory stand-in from
+``fake_sheets.py``; only the browser is real (headless Chrome or Edge with its
+driver on PATH). The run itself is the unmodified ``run_posting``: Sheets client,
+group cache, journal, timeouts, selector cache and tracker writer included.
+
+Reports posts/minute, Sheets API calls and WebDriver commands per post. Pass
+``--json PATH`` to keep the numbers for a before/after comparison, and
+``--check-posting-wait`` to confirm the run really waits out the "Posting"
+spinner (a second run with a longer ``--posting-ms`` must have a higher
+``post.total`` p50).
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import List
+from unittest import mock
+
+from fake_facebook import FakeFacebook
+from fake_sheets import fake_spreadsheet
+
+from fb_groups_poster import runner
+from fb_groups_poster.config import AppConfig, BrowserConfig, PosterConfig, SheetsConfig
+from fb_groups_poster.profiling import get_profiler
+
+# 1x1 transparent PNG, enough for the fixture's file input
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class CommandCounter:
+    """Counts the WebDriver commands every launched browser sends."""
+
+    def __init__(self):
+        self.commands: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def attach(self, driver) -> None:
+        executor = driver.command_executor
+        original = executor.execute
+
+        def execute(command, params):
+            with self._lock:
+                self.commands[command] += 1
+            return original(command, params)
+
+        executor.execute = execute
+
+    @property
+    def total(self) -> int:
+        return sum(self.commands.values())
+
+
+def headless_launcher(browser: str, counter: CommandCounter):
+    from selenium import webdriver
+
+    def launch(cfg, workers, clones, profiles=None) -> List:
+        drivers = []
+        for _ in range(workers):
+            if browser == "edge":
+                opts, factory = webdriver.EdgeOptions(), webdriver.Edge
+            else:
+                opts, factory = webdriver.ChromeOptions(), webdriver.Chrome
+            opts.add_argument("--headless=new")
+            opts.add_argument("--window-size=1920,1080")
+            driver = factory(options=opts)
+            # Session setup is not part of the per-post cost
+            counter.attach(driver)
+            drivers.append(driver)
+        return drivers
+
+    return launch
+
+
+def run(args) -> dict:
+    site = FakeFacebook(latency=args.page_latency_ms / 1000).start()
+    tmp = tempfile.mkdtemp(prefix="fbpost-bench-")
+    try:
+        urls = site.group_urls(args.groups, posting_ms=args.posting_ms, variant_b=args.variant_b, dead=args.dead)
+        spreadsheet = fake_spreadsheet(
+            urls,
+            latency=args.sheets_latency_ms / 1000,
+            quota_every=args.quota_every,
+        )
+        images = []
+        for i in range(args.images):
+            path = os.path.join(tmp, f"image{i}.png")
+            with open(path, "wb") as f:
+                f.write(PNG)
+            images.append(path)
+        cfg = AppConfig(
+            sheets=SheetsConfig(service_account_file=os.path.join(tmp, "key.json"), spreadsheet_id="bench"),
+            browser=BrowserConfig(edge_profile_dir=tmp, headless=True, workers=args.workers),
+            poster=PosterConfig(text="Benchmark post\nsecond line", image_paths=images, filter_tags=["bench"]),
+            cache_dir=os.path.join(tmp, "cache"),
+        )
+        counter = CommandCounter()
+        launcher = headless_launcher(args.browser, counter)
+        gspread_client = mock.Mock()
+        gspread_client.open_by_key.return_value = spreadsheet
+        with mock.patch("fb_groups_poster.sheets.Credentials.from_service_account_file"), \
+                mock.patch("fb_groups_poster.sheets.gspread.authorize", return_value=gspread_client), \
+                mock.patch.object(runner, "_launch_browsers", launcher), \
+                mock.patch("fb_groups_poster.orchestrator._launch_browsers", launcher):
+            started = time.perf_counter()
+            if args.use_async:
+                import asyncio
+                from fb_groups_poster.orchestrator import run_posting_async
+
+                asyncio.run(run_posting_async(cfg, assume_yes=True))
+            else:
+                runner.run_posting(cfg, assume_yes=True)
+            elapsed = time.perf_counter() - started
+    finally:
+        site.stop()
+
+    sheets_calls = spreadsheet.api.total
+    tracker = spreadsheet.worksheet("auto-poster-tracker").rows
+    posted = sum(1 for row in tracker if row[3] == "Posted")
+    failed = sum(1 for row in tracker if row[3] == "Error")
+    attempts = max(1, posted + failed)
+    summary = get_profiler().summary()
+    post_total = summary.get("post.total", {})
+    return {
+        "groups": args.groups,
+        "workers": args.workers,
+        "posted": posted,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "posts_per_minute": round(posted / elapsed * 60, 2) if elapsed else 0.0,
+        "post_p50": post_total.get("p50"),
+        "post_p95": post_total.get("p95"),
+        "page_loads": site.page_loads,
+        "sheets_calls": sheets_calls,
+        "sheets_calls_per_post": round(sheets_calls / attempts, 2),
+        "sheets_calls_by_method": dict(spreadsheet.api.calls),
+        "webdriver_commands": counter.total,
+        "webdriver_commands_per_post": round(counter.total / attempts, 1),
+        "webdriver_commands_by_name": dict(counter.commands.most_common()),
+    }
+
+
+def report(result: dict) -> None:
+    print()
+    print(f"groups: {result['groups']}  workers: {result['workers']}  posted: {result['posted']}  failed: {result['failed']}")
+    print(f"wall time: {result['seconds']:.1f}s  ->  {result['posts_per_minute']:.1f} posts/min")
+    print(f"post.total p50/p95: {result['post_p50']}s / {result['post_p95']}s  page loads: {result['page_loads']}")
+    print(f"Sheets calls: {result['sheets_calls']} ({result['sheets_calls_per_post']}/post)  {result['sheets_calls_by_method']}")
+    print(f"WebDriver commands: {result['webdriver_commands']} ({result['webdriver_commands_per_post']}/post)")
+    for name, count in list(result["webdriver_commands_by_name"].items())[:8]:
+        print(f"  {name:<28} {count}")
+
+
+def check_posting_wait(args, result: dict, extra_ms: int = 1000) -> bool:
+    """Re-run with the spinner up ``extra_ms`` longer; the post p50 must grow by most of that."""
+    slower = run(argparse.Namespace(**{**vars(args), "posting_ms": args.posting_ms + extra_ms}))
+    grew = (slower["post_p50"] or 0) - (result["post_p50"] or 0)
+    ok = grew >= 0.8 * extra_ms / 1000
+    print(
+        f"posting wait: +{extra_ms}ms spinner -> post.total p50 {result['post_p50']}s -> {slower['post_p50']}s"
+        f"  [{'ok' if ok else 'FAILED: the posting wait is not exercised'}]"
+    )
+    return ok
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--browser", choices=["chrome", "edge"], default=os.environ.get("FBPOST_BROWSER") or "chrome")
+    parser.add_argument("--page-latency-ms", type=int, default=0, help="delay before each group page is served")
+    parser.add_argument("--posting-ms", type=int, default=300, help="how long the 'Posting' spinner stays up")
+    parser.add_argument("--variant-b", type=float, default=0.0, help="share of groups with the alternate composer")
+    parser.add_argument("--dead", type=float, default=0.0, help="share of dead groups (not member, pending, unavailable)")
+    parser.add_argument("--sheets-latency-ms", type=int, default=0, help="latency of every Sheets API call")
+    parser.add_argument("--quota-every", type=int, default=0, help="fail every Nth Sheets call with a 429")
+    parser.add_argument("--images", type=int, default=1)
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use run_posting_async")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    parser.add_argument(
+        "--check-posting-wait", action="store_true", help="re-run with a longer spinner and fail unless post p50 rises"
+    )
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    report(result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.check_posting_wait and not check_posting_wait(args, result):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
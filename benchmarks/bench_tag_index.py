@@ -0,0 +1,80 @@
+"""Compare the per-row tag filter loop with the inverted ``TagIndex``.
+
+Usage:
+    python benchmarks/bench_tag_index.py [ROWS ...]
+
+Defaults to 10k, 100k and 1M synthetic rows. Each size reports the time for the
+original loop, building the index once, and answering the same filters from it.
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from typing import List, Tuple
+
+from fb_groups_poster.tag_index import TagIndex
+
+VOCABULARY = [f"tag{i}" for i in range(200)]
+# (filter_tags, query) pairs, roughly what a few campaigns in one process would ask for
+FILTERS = [
+    (["tag1"], None),
+    (["tag1", "tag2"], None),
+    (["tag3", "tag4", "tag5"], None),
+    ([], "tag6 AND (tag7 OR tag8) AND NOT tag9"),
+]
+
+
+def synthetic_rows(count: int, seed: int = 42) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    # A skewed distribution so a handful of tags are common, like real group lists
+    weights = [1.0 / (i + 1) for i in range(len(VOCABULARY))]
+    rows = []
+    for i in range(count):
+        tags = set(rng.choices(VOCABULARY, weights=weights, k=rng.randint(1, 6)))
+        rows.append((f"https://www.facebook.com/groups/{i}", ", ".join(sorted(tags))))
+    return rows
+
+
+def loop_filter(rows: List[Tuple[str, str]], filter_tags: List[str]) -> List[str]:
+    """The pre-index algorithm from ``get_filtered_group_links``."""
+    wanted = set(t.strip() for t in filter_tags)
+    out = []
+    for link, tags in rows:
+        row_tags = set(t.strip() for t in tags.split(",") if t.strip())
+        if wanted.issubset(row_tags):
+            out.append(link)
+    return out
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench(count: int) -> None:
+    rows = synthetic_rows(count)
+    loop_filters = [f for f, q in FILTERS if q is None]
+    _, loop_time = timed(lambda: [loop_filter(rows, f) for f in loop_filters])
+    index, build_time = timed(lambda: TagIndex(rows))
+    results, query_time = timed(lambda: [index.select(f, q) for f, q in FILTERS])
+    # Sanity check: the index agrees with the loop
+    for f in loop_filters:
+        assert index.select(f) == loop_filter(rows, f)
+    print(
+        f"{count:>9,} rows | loop x{len(loop_filters)}: {loop_time * 1000:9.1f} ms"
+        f" | index build: {build_time * 1000:9.1f} ms"
+        f" | index x{len(FILTERS)} (incl. query): {query_time * 1000:8.1f} ms"
+        f" | matches: {[len(r) for r in results]}"
+    )
+
+
+def main(argv: List[str]) -> None:
+    sizes = [int(a) for a in argv] or [10_000, 100_000, 1_000_000]
+    for count in sizes:
+        bench(count)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
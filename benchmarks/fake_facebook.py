@@ -0,0 +1,83 @@
+"""Local HTTP server standing in for Facebook group pages.
+
+Every ``/groups/<id>`` path serves ``tests/fixtures/group_composer.html``, after
+``latency`` seconds, with the query string passed through so the fixture can vary
+the "Posting" spinner duration, the selector variant and dead-group states.
+"""
+from __future__ import annotations
+
+import pathlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlencode
+
+FIXTURE = pathlib.Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "group_composer.html"
+
+
+class FakeFacebook:
+    def __init__(self, latency: float = 0.0, fixture: pathlib.Path = FIXTURE):
+        self.latency = latency
+        self.page = fixture.read_bytes()
+        self.page_loads = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> "FakeFacebook":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if not self.path.startswith("/groups/"):
+                    self.send_error(404)
+                    return
+                with fake._lock:
+                    fake.page_loads += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(fake.page)))
+                self.end_headers()
+                self.wfile.write(fake.page)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-facebook", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def group_urls(
+        self,
+        count: int,
+        posting_ms: int = 300,
+        variant_b: float = 0.0,
+        dead: float = 0.0,
+        seed: int = 42,
+    ) -> List[str]:
+        """Group links with a ``variant_b`` share of the alternate composer and a ``dead`` share of dead groups."""
+        rng = random.Random(seed)
+        urls = []
+        for i in range(count):
+            params = {"posting_ms": posting_ms}
+            if rng.random() < variant_b:
+                params["variant"] = "b"
+            if rng.random() < dead:
+                params["state"] = rng.choice(["not_member", "pending", "unavailable"])
+            urls.append(f"{self.base_url}/groups/{i}?{urlencode(params)}")
+        return urls
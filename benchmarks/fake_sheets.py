@@ -0,0 +1,136 @@
+"""In-memory stand-in for the gspread objects the poster uses.
+
+Every API method sleeps for ``latency`` seconds and counts the call; with
+``quota_every=N`` every Nth call fails with the same ``APIError`` (HTTP 429) gspread
+raises when the Sheets read/write quota is exhausted.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from gspread.exceptions import APIError
+
+
+class _QuotaResponse:
+    status_code = 429
+    text = "Quota exceeded"
+
+    def json(self):
+        return {"error": {"code": 429, "message": "Quota exceeded for quota metric 'Write requests'", "status": "RESOURCE_EXHAUSTED"}}
+
+
+class FakeApi:
+    """Shared latency, quota and call accounting for one fake spreadsheet."""
+
+    def __init__(self, latency: float = 0.0, quota_every: int = 0):
+        self.latency = latency
+        self.quota_every = quota_every
+        self.calls: Counter = Counter()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def call(self, name: str) -> None:
+        with self._lock:
+            self._total += 1
+            self.calls[name] += 1
+            fail = self.quota_every and self._total % self.quota_every == 0
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            self.calls["quota_errors"] += 1
+            raise APIError(_QuotaResponse())
+
+    @property
+    def total(self) -> int:
+        return sum(count for name, count in self.calls.items() if name != "quota_errors")
+
+
+class FakeWorksheet:
+    def __init__(self, api: FakeApi, title: str, rows: Optional[List[List[str]]] = None):
+        self.api = api
+        self.title = title
+        self.rows: List[List[str]] = [list(r) for r in rows or []]
+        self._lock = threading.Lock()
+
+    @property
+    def row_count(self) -> int:
+        # gspread reads this from the sheet properties, not with an API call
+        return len(self.rows)
+
+    def get_all_records(self) -> List[Dict[str, str]]:
+        self.api.call("get_all_records")
+        header, *body = self.rows or [[]]
+        return [dict(zip(header, row)) for row in body]
+
+    def get_all_values(self) -> List[List[str]]:
+        self.api.call("get_all_values")
+        return [list(r) for r in self.rows]
+
+    def row_values(self, row: int) -> List[str]:
+        self.api.call("row_values")
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def batch_get(self, ranges: List[str], **kwargs) -> List[List[List[str]]]:
+        self.api.call("batch_get")
+        return [self._range(r) for r in ranges]
+
+    def append_rows(self, rows: List[List[str]], **kwargs) -> None:
+        self.api.call("append_rows")
+        with self._lock:
+            self.rows.extend(list(r) for r in rows)
+
+    def append_row(self, row: List[str], **kwargs) -> None:
+        self.api.call("append_row")
+        with self._lock:
+            self.rows.append(list(row))
+
+    def _range(self, a1: str) -> List[List[str]]:
+        """Values of an ``A2:B100``-style range (open-ended rows like ``A2:B`` too)."""
+        a1 = a1.split("!")[-1]
+        start, _, end = a1.partition(":")
+        c0, r0 = _cell(start)
+        c1, r1 = _cell(end or start)
+        r0, r1 = r0 or 1, r1 or len(self.rows)
+        return [list(row[c0 : c1 + 1]) for row in self.rows[r0 - 1 : r1]]
+
+
+def _cell(ref: str):
+    letters = "".join(ch for ch in ref if ch.isalpha())
+    digits = "".join(ch for ch in ref if ch.isdigit())
+    col = 0
+    for ch in letters.upper():
+        col = col * 26 + (ord(ch) - ord("A") + 1)
+    return col - 1, int(digits) if digits else None
+
+
+class FakeSpreadsheet:
+    def __init__(self, api: FakeApi, worksheets: Dict[str, FakeWorksheet]):
+        self.api = api
+        self._worksheets = worksheets
+        self.modified = datetime.now(timezone.utc)
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self.api.call("worksheet")
+        return self._worksheets[title]
+
+    def get_lastUpdateTime(self) -> str:
+        self.api.call("get_lastUpdateTime")
+        return self.modified.isoformat()
+
+
+def fake_spreadsheet(
+    group_links: List[str],
+    tags: str = "bench",
+    tracker_sheet: str = "auto-poster-tracker",
+    groups_sheet: str = "Groups",
+    latency: float = 0.0,
+    quota_every: int = 0,
+) -> FakeSpreadsheet:
+    api = FakeApi(latency=latency, quota_every=quota_every)
+    groups = FakeWorksheet(api, groups_sheet, [["Group Link", "Tags"]] + [[link, tags] for link in group_links])
+    tracker = FakeWorksheet(api, tracker_sheet)
+    return FakeSpreadsheet(api, {groups_sheet: groups, tracker_sheet: tracker})
@@ -1,35 +1,234 @@
 from __future__ import annotations
 
+from dataclasses import replace
+from typing import Optional
+import json
+import logging
+import shutil
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
 from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
 from selenium.webdriver.edge.options import Options as EdgeOptions
 from selenium.webdriver.edge.service import Service
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
 from .config import BrowserConfig
+from .profiling import span
 import os
 
 
-def build_edge(cfg: BrowserConfig) -> webdriver.Edge:
-    opts = EdgeOptions()
-    opts.use_chromium = True
-    opts.add_argument(f"user-data-dir={cfg.edge_profile_dir}")
-    opts.add_argument(f"profile-directory={cfg.edge_profile_name}")
-    # Reduce browser / driver noise in console
-    opts.add_experimental_option("excludeSwitches", ["enable-logging"])  # suppress "DevTools listening" line
-    opts.add_argument("--log-level=3")
-    if getattr(cfg, "headless", False):
-        # Use new headless mode; ensure a reasonable window size for layout-dependent selectors
-        opts.add_argument("--headless=new")
-        opts.add_argument("--disable-gpu")
-        opts.add_argument("--window-size=1920,1080")
-    driver_path = EdgeChromiumDriverManager(
+# Profile sub-folders that are safe to skip when cloning: caches are rebuilt on demand
+# and lock files would make Edge think the clone is already in use.
+_CLONE_IGNORE = shutil.ignore_patterns(
+    "Cache",
+    "Code Cache",
+    "GPUCache",
+    "DawnCache",
+    "GrShaderCache",
+    "ShaderCache",
+    "Service Worker",
+    "Crashpad",
+    "Singleton*",
+    "LOCK",
+    "*.lock",
+)
+
+# Lightweight mode: requests the composer never needs. Facebook's own JS and CSS
+# (static.*.fbcdn.net) stay allowed; user media lives on scontent/video CDNs.
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m4a", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*scontent*.fbcdn.net/*",
+    "*video*.fbcdn.net/*",
+    "*doubleclick.net/*",
+    "*google-analytics.com/*",
+    "*googletagmanager.com/*",
+    "*googlesyndication.com/*",
+]
+
+
+def clone_profile(cfg: BrowserConfig, worker_no: int) -> BrowserConfig:
+    """Copy the configured Edge profile into a fresh user-data dir for one worker.
+
+    Edge refuses to open the same user-data dir twice, so parallel workers each get
+    their own copy (profile folder plus ``Local State``, which holds the cookie key).
+    The caller owns the returned ``edge_profile_dir`` and should remove it when done.
+    """
+    target_root = tempfile.mkdtemp(prefix=f"fbpost-worker{worker_no}-")
+    local_state = os.path.join(cfg.edge_profile_dir, "Local State")
+    if os.path.exists(local_state):
+        shutil.copy2(local_state, os.path.join(target_root, "Local State"))
+    shutil.copytree(
+        os.path.join(cfg.edge_profile_dir, cfg.edge_profile_name),
+        os.path.join(target_root, cfg.edge_profile_name),
+        ignore=_CLONE_IGNORE,
+    )
+    return replace(cfg, edge_profile_dir=target_root)
+
+
+DRIVER_CACHE_FILE = "edgedriver.json"
+SESSION_FILE = "browser-session.json"
+# How long a resolved msedgedriver path is trusted before asking webdriver-manager again
+DRIVER_CACHE_TTL = 7 * 24 * 3600
+
+
+def _resolve_with_manager() -> str:
+    return EdgeChromiumDriverManager(
         url="https://msedgedriver.microsoft.com/",
         latest_release_url="https://msedgedriver.microsoft.com/LATEST_RELEASE",
     ).install()
+
+
+def resolve_driver_path(cfg: BrowserConfig, cache_dir: Optional[str] = None, refresh: bool = False) -> str:
+    """Path to msedgedriver: the pinned ``driver_path``, else a cached lookup, else webdriver-manager.
+
+    The webdriver-manager lookup is a network version check on every call, so its
+    result is remembered in ``cache_dir`` for ``DRIVER_CACHE_TTL`` seconds.
+    """
+    if getattr(cfg, "driver_path", None):
+        return cfg.driver_path
+    cache_path = os.path.join(cache_dir, DRIVER_CACHE_FILE) if cache_dir else None
+    if cache_path and not refresh:
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if os.path.exists(cached["path"]) and time.time() - cached["resolved_at"] < DRIVER_CACHE_TTL:
+                return cached["path"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    driver_path = _resolve_with_manager()
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"path": driver_path, "resolved_at": time.time()}, f)
+        except OSError as e:
+            logging.getLogger(__name__).debug("Could not cache driver path: %s", e)
+    return driver_path
+
+
+def _service(driver_path: str) -> Service:
     # Suppress webdriver service logs regardless of Selenium version
     try:
-        service = Service(driver_path, log_output=os.devnull, service_args=['--log-level=OFF'])  # Selenium >= 4.25
+        return Service(driver_path, log_output=os.devnull, service_args=['--log-level=OFF'])  # Selenium >= 4.25
     except TypeError:
-        service = Service(driver_path, log_path=os.devnull)    # Older Selenium
-    return webdriver.Edge(service=service, options=opts)
+        return Service(driver_path, log_path=os.devnull)    # Older Selenium
+
 
+def build_edge(
+    cfg: BrowserConfig,
+    cache_dir: Optional[str] = None,
+    debugger_address: Optional[str] = None,
+    debug_port: Optional[int] = None,
+) -> webdriver.Edge:
+    """Launch Edge on the configured profile, or attach to a running one at ``debugger_address``.
+
+    ``debug_port`` opens Chromium's remote-debugging port so later runs can attach.
+    """
+    opts = EdgeOptions()
+    opts.use_chromium = True
+    if getattr(cfg, "lightweight", False):
+        # Return from driver.get at DOMContentLoaded rather than after every subresource
+        opts.page_load_strategy = "eager"
+    if debugger_address:
+        # Launch flags do not apply to a browser that is already running
+        opts.debugger_address = debugger_address
+    else:
+        opts.add_argument(f"user-data-dir={cfg.edge_profile_dir}")
+        opts.add_argument(f"profile-directory={cfg.edge_profile_name}")
+        # Reduce browser / driver noise in console
+        opts.add_experimental_option("excludeSwitches", ["enable-logging"])  # suppress "DevTools listening" line
+        opts.add_argument("--log-level=3")
+        if debug_port:
+            opts.add_argument(f"--remote-debugging-port={debug_port}")
+        if getattr(cfg, "lightweight", False):
+            opts.add_argument("--mute-audio")
+            opts.add_argument("--autoplay-policy=user-gesture-required")
+        if getattr(cfg, "headless", False):
+            # Use new headless mode; ensure a reasonable window size for layout-dependent selectors
+            opts.add_argument("--headless=new")
+            opts.add_argument("--disable-gpu")
+            opts.add_argument("--window-size=1920,1080")
+    with span("browser.resolve_driver"):
+        driver_path = resolve_driver_path(cfg, cache_dir)
+    try:
+        with span("browser.launch"):
+            driver = webdriver.Edge(service=_service(driver_path), options=opts)
+    except SessionNotCreatedException:
+        if getattr(cfg, "driver_path", None) or not cache_dir:
+            raise
+        # Most likely Edge auto-updated past the cached driver; look it up again once
+        logging.getLogger(__name__).info("Cached msedgedriver rejected; resolving a matching driver")
+        with span("browser.resolve_driver"):
+            driver_path = resolve_driver_path(cfg, cache_dir, refresh=True)
+        with span("browser.launch"):
+            driver = webdriver.Edge(service=_service(driver_path), options=opts)
+    if getattr(cfg, "lightweight", False):
+        block_heavy_resources(driver)
+    return driver
+
+
+def block_heavy_resources(driver) -> None:
+    """Drop media, font and tracker requests for the browser's tab via CDP.
+
+    Only the network is affected, nothing is written to the profile. Uploads still
+    work: the composer previews picked files from local blob: URLs.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        logging.getLogger(__name__).warning("Could not enable lightweight mode: %s", e)
+
+
+def composer_url(group_url: str) -> str:
+    """Canonical ``https://www.facebook.com/groups/<id>/`` for a Facebook group link.
+
+    Drops tracking parameters, fragments and sub-pages (``/posts/...``,
+    ``/about``), and moves ``m.``/``web.`` hosts to www, so the page served is the
+    plain group feed with the composer. Other URLs are returned unchanged.
+    """
+    parts = urllib.parse.urlsplit(group_url)
+    host = parts.netloc.lower()
+    if not (host == "facebook.com" or host.endswith(".facebook.com")):
+        return group_url
+    segments = [seg for seg in parts.path.split("/") if seg]
+    if len(segments) < 2 or segments[0] != "groups":
+        return group_url
+    return f"https://www.facebook.com/groups/{segments[1]}/"
+
+
+def write_session(cache_dir: str, debugger_address: str) -> str:
+    """Advertise a long-lived browser (``fbpost browser start``) to later runs."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, SESSION_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"debugger_address": debugger_address, "pid": os.getpid(), "started_at": time.time()}, f)
+    return path
+
+
+def clear_session(cache_dir: str) -> None:
+    try:
+        os.remove(os.path.join(cache_dir, SESSION_FILE))
+    except OSError:
+        pass
+
+
+def live_session_address(cache_dir: str) -> Optional[str]:
+    """Debugger address of a running browser session, or ``None`` if there is none."""
+    try:
+        with open(os.path.join(cache_dir, SESSION_FILE), "r", encoding="utf-8") as f:
+            address = json.load(f)["debugger_address"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=1):
+            return address
+    except Exception:
+        # Stale file from a session that is gone
+        return None
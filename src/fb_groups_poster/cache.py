@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from typing import List, Optional, Tuple
+
+
+class GroupsCache:
+    """On-disk copy of the Groups worksheet, one JSON file per spreadsheet + sheet.
+
+    Only the two columns the poster uses are stored, as ``[link, tags]`` pairs,
+    together with the spreadsheet's Drive ``modifiedTime`` at fetch time so a later
+    run can tell whether the sheet changed without downloading it again.
+
+    Tracker rows live in the same spreadsheet, so a run's own writes bump
+    ``modifiedTime``; ``restamp`` records the time after those writes so the next
+    run still gets a hit.
+    """
+
+    def __init__(self, cache_dir: str, spreadsheet_id: str, sheet_name: str, ttl: float = 900.0):
+        self.ttl = ttl
+        # The modifiedTime the cached rows were checked against in this process, if any
+        self.verified: Optional[str] = None
+        safe_sheet = re.sub(r"[^\w.-]+", "_", sheet_name)
+        self.path = os.path.join(cache_dir, f"groups-{spreadsheet_id}-{safe_sheet}.json")
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("rows"), list):
+            return None
+        return entry
+
+    def save(self, modified: Optional[str], rows: List[Tuple[str, str]]) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._write({"modified": modified, "fetched_at": time.time(), "rows": [list(r) for r in rows]})
+
+    def _write(self, entry: dict) -> None:
+        # Write-then-rename so an interrupted save never leaves a truncated cache behind
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, entry: dict, modified: Optional[str]) -> bool:
+        """Fresh when the spreadsheet is unchanged since the fetch.
+
+        ``ttl`` only applies when ``modifiedTime`` could not be read.
+        """
+        if modified is not None:
+            return entry.get("modified") == modified
+        return time.time() - float(entry.get("fetched_at", 0)) < self.ttl
+
+    def restamp(self, modified: Optional[str]) -> bool:
+        """Move the entry to ``modified`` after this process's own tracker writes.
+
+        Only done when the rows were checked against the sheet earlier in this
+        process, so an offline run never vouches for rows it did not check.
+        """
+        if modified is None or self.verified is None:
+            return False
+        entry = self.load()
+        if entry is None or entry.get("modified") != self.verified:
+            return False
+        # Keep the entry's fetched_at, so the TTL fallback still ages it
+        entry["modified"] = modified
+        self._write(entry)
+        self.verified = modified
+        return True
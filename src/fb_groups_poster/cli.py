@@ -2,36 +2,56 @@ import sys
 import os
 import logging
 import click
-from .config import load_config
-from .runner import run_posting
+from .commands import list_groups, queue_groups, show_profile, validate_config
+from .config import DEFAULT_CACHE_DIR, AppConfig, load_config
 
 
-@click.group()
-def main():
-    """Facebook Groups Poster CLI"""
+# The runner pulls in Selenium, gspread and tqdm; import it only for commands that
+# post or drive a browser, so --help, validate and groups list start quickly.
+def run_posting(cfg: AppConfig, **options) -> bool:
+    from .runner import run_posting as _run_posting
 
+    return _run_posting(cfg, **options)
 
-@main.command()
-@click.option(
+
+def run_worker(cfg: AppConfig, path: str, **options) -> bool:
+    from .worker import run_worker as _run_worker
+
+    return _run_worker(cfg, path, **options)
+
+
+def run_browser_session(cfg: AppConfig) -> bool:
+    from .runner import run_browser_session as _run_browser_session
+
+    return _run_browser_session(cfg)
+
+
+config_option = click.option(
     "--config",
     "config_path",
     default="config.yaml",
     show_default=True,
     type=click.Path(dir_okay=False),
 )
-@click.option("-y", "assume_yes", is_flag=True, help="Skip confirmations and proceed")
-@click.option("-v", "verbose", is_flag=True, help="Enable verbose (debug) logging")
-def run(config_path: str, assume_yes: bool, verbose: bool):
-    """Run poster with a YAML config"""
-    # Configure logging
+queue_option = click.option(
+    "--queue",
+    "queue_override",
+    metavar="PATH",
+    help="Shared work-queue file (default: queue.path from the config, or <cache_dir>/queue.sqlite)",
+)
+verbose_option = click.option("-v", "verbose", is_flag=True, help="Enable verbose (debug) logging")
+
+
+def _setup_logging(verbose: bool) -> None:
     log_level = logging.DEBUG if verbose else logging.INFO
     logging.basicConfig(
         level=log_level,
         format="%(asctime)s %(levelname)s %(message)s",
         datefmt="%H:%M:%S",
     )
-    logger = logging.getLogger(__name__)
 
+
+def _load_config_or_exit(config_path: str) -> AppConfig:
     if not os.path.exists(config_path):
         click.echo(
             f"Config file not found at '{config_path}'. "
@@ -41,7 +61,151 @@ def run(config_path: str, assume_yes: bool, verbose: bool):
         )
         sys.exit(1)
     cfg = load_config(config_path)
-    logger.debug("Loaded config from %s", config_path)
-    success = run_posting(cfg, assume_yes=assume_yes)
+    logging.getLogger(__name__).debug("Loaded config from %s", config_path)
+    return cfg
+
+
+@click.group()
+def main():
+    """Facebook Groups Poster CLI"""
+
+
+@main.command()
+@config_option
+@click.option("-y", "assume_yes", is_flag=True, help="Skip confirmations and proceed")
+@verbose_option
+@click.option("--refresh-groups", is_flag=True, help="Re-download the Groups sheet even if the local cache is fresh")
+@click.option("--offline", is_flag=True, help="Read groups from the local cache only; Google is contacted only to write the tracker once posting starts")
+@click.option("--resume", "resume_run_id", metavar="RUN_ID", help="Continue an interrupted run, skipping groups it already posted to")
+@click.option("--async", "use_async", is_flag=True, help="Use the asyncio engine: launch Edge while Sheets and groups load")
+def run(config_path: str, assume_yes: bool, verbose: bool, refresh_groups: bool, offline: bool, resume_run_id: str, use_async: bool):
+    """Run poster with a YAML config"""
+    _setup_logging(verbose)
+    cfg = _load_config_or_exit(config_path)
+    if refresh_groups and offline:
+        click.echo("--refresh-groups and --offline cannot be used together.", err=True)
+        sys.exit(2)
+    options = dict(
+        assume_yes=assume_yes,
+        refresh_groups=refresh_groups,
+        offline=offline,
+        resume_run_id=resume_run_id,
+    )
+    if use_async:
+        import asyncio
+        from .orchestrator import run_posting_async
+
+        success = asyncio.run(run_posting_async(cfg, **options))
+    else:
+        success = run_posting(cfg, **options)
     sys.exit(0 if success else 1)
 
+
+@main.command("coordinate")
+@config_option
+@queue_option
+@click.option("-y", "assume_yes", is_flag=True, help="Skip confirmations and proceed")
+@verbose_option
+@click.option("--refresh-groups", is_flag=True, help="Re-download the Groups sheet even if the local cache is fresh")
+@click.option("--offline", is_flag=True, help="Read groups from the local cache only, without contacting Google")
+def coordinate(config_path: str, queue_override: str, assume_yes: bool, verbose: bool, refresh_groups: bool, offline: bool):
+    """Queue the targeted groups for workers on one or more hosts"""
+    from .workqueue import queue_path
+
+    _setup_logging(verbose)
+    cfg = _load_config_or_exit(config_path)
+    if refresh_groups and offline:
+        click.echo("--refresh-groups and --offline cannot be used together.", err=True)
+        sys.exit(2)
+    try:
+        ok = queue_groups(cfg, queue_path(cfg, queue_override), refresh=refresh_groups, offline=offline, assume_yes=assume_yes)
+    except Exception as e:
+        logging.getLogger(__name__).debug("Queueing the run failed", exc_info=True)
+        click.echo(f"Could not queue the run: {e}", err=True)
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+@main.command("work")
+@config_option
+@queue_option
+@verbose_option
+@click.option("--run", "run_id", metavar="RUN_ID", help="Queued run to work on (default: the latest)")
+@click.option("--worker", "worker_name", metavar="NAME", help="Name shown in the queue and progress bar (default: host:pid)")
+def work(config_path: str, queue_override: str, verbose: bool, run_id: str, worker_name: str):
+    """Post queued groups until the run's queue is drained"""
+    from .workqueue import queue_path
+
+    _setup_logging(verbose)
+    cfg = _load_config_or_exit(config_path)
+    success = run_worker(cfg, queue_path(cfg, queue_override), run_id=run_id, worker=worker_name)
+    sys.exit(0 if success else 1)
+
+
+@main.group()
+def browser():
+    """Manage a long-lived Edge session that runs attach to"""
+
+
+@browser.command("start")
+@config_option
+@verbose_option
+def browser_start(config_path: str, verbose: bool):
+    """Launch Edge and keep it open until Ctrl+C"""
+    _setup_logging(verbose)
+    cfg = _load_config_or_exit(config_path)
+    sys.exit(0 if run_browser_session(cfg) else 1)
+
+
+@main.command()
+@click.argument("run_ref", metavar="RUN")
+@config_option
+def profile(run_ref: str, config_path: str):
+    """Show per-step timings (p50/p95/p99) of a run
+
+    RUN is a run ID, `latest`, or the path to an exported profile JSON.
+    """
+    if os.path.exists(config_path):
+        cfg = load_config(config_path)
+        cache_dir = cfg.cache_dir
+    else:
+        cache_dir = DEFAULT_CACHE_DIR
+    sys.exit(0 if show_profile(cache_dir, run_ref) else 1)
+
+
+@main.command()
+@config_option
+def validate(config_path: str):
+    """Check a config file without contacting Google or Facebook"""
+    try:
+        cfg = _load_config_or_exit(config_path)
+    except Exception as e:
+        click.echo(f"[ ❌ ] Cannot load {config_path}: {e}", err=True)
+        sys.exit(1)
+    sys.exit(0 if validate_config(cfg) else 1)
+
+
+@main.group()
+def groups():
+    """Inspect the Groups sheet"""
+
+
+@groups.command("list")
+@config_option
+@verbose_option
+@click.option("--refresh", "refresh_groups", is_flag=True, help="Re-download the Groups sheet even if the local cache is fresh")
+@click.option("--offline", is_flag=True, help="Read groups from the local cache only, without contacting Google")
+def groups_list(config_path: str, verbose: bool, refresh_groups: bool, offline: bool):
+    """List the groups the configured campaigns would post to"""
+    _setup_logging(verbose)
+    cfg = _load_config_or_exit(config_path)
+    if refresh_groups and offline:
+        click.echo("--refresh and --offline cannot be used together.", err=True)
+        sys.exit(2)
+    try:
+        ok = list_groups(cfg, refresh=refresh_groups, offline=offline)
+    except Exception as e:
+        logging.getLogger(__name__).debug("Listing groups failed", exc_info=True)
+        click.echo(f"Could not list groups: {e}", err=True)
+        ok = False
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,150 @@
+"""CLI commands that never start a browser.
+
+Everything here stays clear of Selenium. gspread and the Google auth stack are
+imported only by the commands that select groups (``list_groups``,
+``queue_groups``), offline ones included: the Groups cache is read through
+``sheets``, which loads them. With ``offline`` no Google session is opened.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import List, Tuple
+
+import click
+
+from .config import AppConfig, duplicate_campaign_names
+from .profiling import find_profile, load_profile, summarize
+from .tag_index import TagQueryError, parse_tag_query
+
+
+def check_config(cfg: AppConfig) -> Tuple[List[str], List[str]]:
+    """Offline sanity checks of a loaded config; returns ``(errors, warnings)``."""
+    errors: List[str] = []
+    warnings: List[str] = []
+
+    key_file = cfg.sheets.service_account_file
+    try:
+        with open(key_file, "r", encoding="utf-8") as f:
+            key = json.load(f)
+        if "client_email" not in key:
+            errors.append(f"sheets.service_account_file {key_file} is not a service account key (no client_email)")
+    except OSError:
+        errors.append(f"sheets.service_account_file not found: {key_file}")
+    except ValueError:
+        errors.append(f"sheets.service_account_file is not valid JSON: {key_file}")
+    if not cfg.sheets.spreadsheet_id or cfg.sheets.spreadsheet_id == "your-spreadsheet-id":
+        errors.append("sheets.spreadsheet_id is not set")
+
+    if not os.path.isdir(cfg.browser.edge_profile_dir):
+        warnings.append(f"browser.edge_profile_dir not found: {cfg.browser.edge_profile_dir} (Edge would start logged out)")
+    if cfg.browser.workers < 1:
+        errors.append("browser.workers must be at least 1")
+
+    for name in duplicate_campaign_names(cfg.poster.campaigns):
+        errors.append(f"poster.campaigns: more than one campaign is named '{name}'")
+    for campaign in cfg.poster.all_campaigns():
+        where = f"campaign '{campaign.name}'" if campaign.name else "poster"
+        if not campaign.text.strip():
+            errors.append(f"{where}: text is empty")
+        for path in campaign.image_paths:
+            if not os.path.isfile(path):
+                errors.append(f"{where}: image not found: {path}")
+        if campaign.tag_query:
+            try:
+                parse_tag_query(campaign.tag_query)
+            except TagQueryError as e:
+                errors.append(f"{where}: tag_query: {e}")
+        if not campaign.filter_tags and not campaign.tag_query:
+            warnings.append(f"{where}: no filter_tags or tag_query, every group in the sheet is targeted")
+
+    if cfg.pacing.posts_per_hour < 0:
+        errors.append("pacing.posts_per_hour cannot be negative")
+    if cfg.retry.max_attempts < 1:
+        errors.append("retry.max_attempts must be at least 1")
+    if cfg.queue.lease_seconds <= 0:
+        errors.append("queue.lease_seconds must be positive")
+    return errors, warnings
+
+
+def validate_config(cfg: AppConfig) -> bool:
+    errors, warnings = check_config(cfg)
+    for message in warnings:
+        click.echo(f"[ ⚠ ] {message}")
+    for message in errors:
+        click.echo(f"[ ❌ ] {message}", err=True)
+    if errors:
+        return False
+    campaigns = cfg.poster.all_campaigns()
+    click.echo(f"[ ✅ ] Config OK ({len(campaigns)} campaign(s))")
+    return True
+
+
+def _select_visits(cfg: AppConfig, refresh: bool, offline: bool) -> list:
+    from .cache import GroupsCache
+    from .planner import select_visits
+    from .sheets import init_sheets
+
+    cache = GroupsCache(cfg.cache_dir, cfg.sheets.spreadsheet_id, cfg.sheets.groups_sheet, ttl=cfg.sheets.groups_cache_ttl)
+    # The cache alone is enough offline; no need to log in to Google
+    sheets = None if offline else init_sheets(cfg.sheets)
+    try:
+        return select_visits(sheets, cfg.poster.all_campaigns(), cache, refresh=refresh, offline=offline)
+    finally:
+        if sheets is not None:
+            sheets.close()
+
+
+def list_groups(cfg: AppConfig, refresh: bool = False, offline: bool = False) -> bool:
+    """Print the groups the configured campaigns target, one per line."""
+    campaigns = cfg.poster.all_campaigns()
+    visits = _select_visits(cfg, refresh, offline)
+    for visit in visits:
+        if len(campaigns) > 1:
+            click.echo(f"{visit.url}\t{', '.join(c.name for c in visit.campaigns)}")
+        else:
+            click.echo(visit.url)
+    click.echo(f"{len(visits)} group(s)", err=True)
+    return True
+
+
+def queue_groups(cfg: AppConfig, path: str, refresh: bool = False, offline: bool = False, assume_yes: bool = False) -> bool:
+    """Queue the configured campaigns' group visits as a new run for ``fbpost work``."""
+    import uuid
+
+    from .workqueue import WorkQueue
+
+    visits = _select_visits(cfg, refresh, offline)
+    if not visits:
+        click.echo("No groups matched the provided filter tags. Nothing to queue.")
+        return False
+    posts = sum(len(visit.campaigns) for visit in visits)
+    if not assume_yes and not click.confirm(f"Queue {posts} post(s) in {len(visits)} group(s)?", default=True):
+        click.echo("Aborted by user.")
+        return False
+    run_id = str(uuid.uuid4())
+    WorkQueue(path).create_run(run_id, [(visit.url, [c.name for c in visit.campaigns]) for visit in visits])
+    click.echo(f"[ ✅ ] Queued {len(visits)} group(s) as run {run_id} in {path}")
+    click.echo(f"Start workers on each host with: fbpost work --queue {path} --run {run_id}")
+    return True
+
+
+def show_profile(cache_dir: str, run: str) -> bool:
+    """Print p50/p95/p99 per step for an exported run profile."""
+    path = find_profile(os.path.join(cache_dir, "profiles"), run)
+    if not path:
+        click.echo(f"No profile found for '{run}'.", err=True)
+        return False
+    data = load_profile(path)
+    rows = summarize(data.get("durations", {}), data.get("errors", {}))
+    click.echo(f"Run {data.get('run_id') or '?'}  ({path})")
+    header = f"{'step':<24} {'count':>6} {'err':>4} {'total s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    click.echo(header)
+    click.echo("-" * len(header))
+    # Slowest steps first: that is where the time goes
+    for name, row in sorted(rows.items(), key=lambda item: -item[1]["total"]):
+        click.echo(
+            f"{name:<24} {row['count']:>6} {row['errors']:>4} {row['total']:>9.1f}"
+            f" {row['p50']:>8.2f} {row['p95']:>8.2f} {row['p99']:>8.2f} {row['max']:>8.2f}"
+        )
+    return True
@@ -4,12 +4,20 @@ import os
 import yaml
 
 
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fb-groups-poster")
+
+
 @dataclass
 class SheetsConfig:
     service_account_file: str
     spreadsheet_id: str
     tracker_sheet: str = "auto-poster-tracker"
     groups_sheet: str = "Groups"
+    log_batch_size: int = 20
+    log_flush_interval: float = 30.0
+    log_queue_size: int = 1000
+    background_logging: bool = True
+    groups_cache_ttl: float = 900.0
 
 
 @dataclass
@@ -17,13 +25,72 @@ class BrowserConfig:
     edge_profile_dir: str
     edge_profile_name: str = "Default"
     headless: bool = False
+    workers: int = 1
+    per_group_selectors: bool = False
+    driver_path: Optional[str] = None
+    debug_port: int = 9222
+    lightweight: bool = False
+    recycle_after_posts: int = 0
+    recycle_rss_mb: int = 0
+    recycle_latency_factor: float = 0.0
 
 
 @dataclass
-class PosterConfig:
+class Campaign:
     text: str
-    image_paths: List[str]
+    image_paths: List[str] = field(default_factory=list)
+    filter_tags: List[str] = field(default_factory=list)
+    tag_query: Optional[str] = None
+    name: str = ""
+
+
+@dataclass
+class PosterConfig:
+    text: str = ""
+    image_paths: List[str] = field(default_factory=list)
     filter_tags: List[str] = field(default_factory=list)
+    tag_query: Optional[str] = None
+    optimize_images: bool = True
+    image_max_edge: int = 2048
+    image_quality: int = 85
+    campaigns: List[Campaign] = field(default_factory=list)
+
+    def all_campaigns(self) -> List[Campaign]:
+        """The configured campaigns, or the top-level text/images/tags as a single unnamed one."""
+        if self.campaigns:
+            return self.campaigns
+        return [Campaign(text=self.text, image_paths=self.image_paths, filter_tags=self.filter_tags, tag_query=self.tag_query)]
+
+
+@dataclass
+class PacingConfig:
+    posts_per_hour: float = 0.0
+    burst: int = 1
+    group_cooldown_hours: float = 0.0
+    error_window: int = 10
+    error_threshold: float = 0.5
+
+
+@dataclass
+class RetryConfig:
+    max_attempts: int = 3
+    base_delay: float = 60.0
+    max_delay: float = 900.0
+    budget_minutes: float = 30.0
+
+
+@dataclass
+class QueueConfig:
+    path: str = ""
+    lease_seconds: float = 600.0
+    poll_interval: float = 5.0
+
+
+@dataclass
+class MetricsConfig:
+    port: int = 0
+    host: str = "127.0.0.1"
+    events_path: str = ""
 
 
 @dataclass
@@ -31,6 +98,21 @@ class AppConfig:
     sheets: SheetsConfig
     browser: BrowserConfig
     poster: PosterConfig
+    cache_dir: str = DEFAULT_CACHE_DIR
+    pacing: PacingConfig = field(default_factory=PacingConfig)
+    retry: RetryConfig = field(default_factory=RetryConfig)
+    queue: QueueConfig = field(default_factory=QueueConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+
+
+def duplicate_campaign_names(campaigns: List[Campaign]) -> List[str]:
+    seen = set()
+    duplicates: List[str] = []
+    for campaign in campaigns:
+        if campaign.name in seen and campaign.name not in duplicates:
+            duplicates.append(campaign.name)
+        seen.add(campaign.name)
+    return duplicates
 
 
 def load_config(path: str) -> AppConfig:
@@ -39,11 +121,41 @@ def load_config(path: str) -> AppConfig:
 
     sheets = SheetsConfig(**raw["sheets"])
     browser = BrowserConfig(**raw["browser"])
-    poster = PosterConfig(**raw["poster"])
+    poster_raw = dict(raw["poster"])
+    campaigns = [Campaign(**c) for c in poster_raw.pop("campaigns", None) or []]
+    poster = PosterConfig(**poster_raw, campaigns=campaigns)
+    if not campaigns and not poster.text:
+        raise ValueError("poster.text is required unless poster.campaigns is given")
 
     # Normalize paths
     sheets.service_account_file = os.path.abspath(sheets.service_account_file)
     poster.image_paths = [os.path.abspath(p) for p in poster.image_paths]
+    for i, campaign in enumerate(poster.campaigns, start=1):
+        campaign.name = campaign.name or f"campaign-{i}"
+        campaign.image_paths = [os.path.abspath(p) for p in campaign.image_paths]
+    duplicates = duplicate_campaign_names(poster.campaigns)
+    if duplicates:
+        # The journal and the work queue key posts by campaign name
+        raise ValueError(f"poster.campaigns: duplicate name(s): {', '.join(duplicates)}")
+    cache_dir = os.path.abspath(os.path.expanduser(raw.get("cache_dir") or DEFAULT_CACHE_DIR))
+
+    pacing = PacingConfig(**(raw.get("pacing") or {}))
+    retry = RetryConfig(**(raw.get("retry") or {}))
+    queue = QueueConfig(**(raw.get("queue") or {}))
+    if queue.path:
+        queue.path = os.path.abspath(os.path.expanduser(queue.path))
+    metrics = MetricsConfig(**(raw.get("metrics") or {}))
+    if metrics.events_path:
+        metrics.events_path = os.path.abspath(os.path.expanduser(metrics.events_path))
 
-    return AppConfig(sheets=sheets, browser=browser, poster=poster)
+    return AppConfig(
+        sheets=sheets,
+        browser=browser,
+        poster=poster,
+        cache_dir=cache_dir,
+        pacing=pacing,
+        retry=retry,
+        queue=queue,
+        metrics=metrics,
+    )
 
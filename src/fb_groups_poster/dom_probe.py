@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import re
+from typing import Callable, List, Optional, Sequence, Union
+
+# Each probe is a single ``execute_script`` call, i.e. one WebDriver round-trip, that
+# walks the candidates in-page and hands back the winning element (or null).
+
+_FIRST_CLICKABLE_JS = """
+const xpaths = arguments[0];
+const visible = (el) => {
+  if (!el.isConnected || el.closest('[aria-hidden="true"]')) return false;
+  const style = window.getComputedStyle(el);
+  if (style.visibility === 'hidden' || style.display === 'none') return false;
+  return el.getClientRects().length > 0;
+};
+const enabled = (el) => !el.disabled && el.getAttribute('aria-disabled') !== 'true';
+for (let i = 0; i < xpaths.length; i++) {
+  const found = document.evaluate(xpaths[i], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  for (let j = 0; j < found.snapshotLength; j++) {
+    const el = found.snapshotItem(j);
+    if (el.nodeType === 1 && visible(el) && enabled(el)) return [i, el];
+  }
+}
+return null;
+"""
+
+_FIRST_MATCH_JS = """
+const candidates = arguments[0];
+const textboxXpath = arguments[1];
+let boxes = null;
+for (let i = 0; i < candidates.length; i++) {
+  const c = candidates[i];
+  if (c.regex !== undefined) {
+    if (boxes === null) {
+      boxes = [];
+      const found = document.evaluate(textboxXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      for (let j = 0; j < found.snapshotLength; j++) boxes.push(found.snapshotItem(j));
+    }
+    const re = new RegExp(c.regex, c.flags);
+    for (const el of boxes) {
+      if (re.test(el.getAttribute('aria-placeholder') || '')) return [i, el];
+    }
+  } else {
+    const el = document.evaluate(c.xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (el) return [i, el];
+  }
+}
+return null;
+"""
+
+_CLIMB_AND_QUERY_JS = """
+let node = arguments[0];
+for (let i = 0; i < arguments[1] && node; i++) node = node.parentElement;
+return node ? node.querySelector(arguments[2]) : null;
+"""
+
+# Recognizes group pages no post can succeed on. Checked in order, cheapest first;
+# relies on the English UI like the rest of the selectors.
+_PAGE_STATE_JS = """
+const path = location.pathname;
+if (path.startsWith('/checkpoint')) return 'checkpoint';
+if (path.startsWith('/login') || document.querySelector('form#login_form, input[name="pass"]')) return 'login';
+const text = (document.body && document.body.innerText || '').slice(0, 20000);
+// A member's page has the composer
+if (/write something|what.s on your mind/i.test(text)) return 'ok';
+// Feed posts sharing a deleted post say "This content isn't available" too, so only the
+// page's own heading, or a main column holding little more than the notice, counts
+const gone = /this content isn.t available|this page isn.t available|content not found/i;
+const headings = Array.from(document.querySelectorAll('h1, h2')).filter((h) => !h.closest('[role="feed"], [role="article"]'));
+const main = document.querySelector('[role="main"]');
+const mainText = main ? (main.innerText || '').trim() : '';
+if (headings.some((h) => gone.test(h.textContent || '')) || (mainText.length < 500 && gone.test(mainText))) return 'unavailable';
+// Membership is read from the group's own column only: the page may not have rendered
+// its composer yet, and the sidebar suggests other groups with "Join group" buttons
+const label = (el) => (el.getAttribute('aria-label') || el.textContent || '').trim();
+const buttons = Array.from((main || document).querySelectorAll('[role="button"], button'))
+  .filter((el) => !el.closest('[role="complementary"]'))
+  .map(label);
+if (buttons.some((t) => /^cancel request$/i.test(t)) || /your membership is pending/i.test(main ? mainText : text)) return 'pending';
+if (buttons.some((t) => /^join group$/i.test(t))) return 'not_member';
+return 'ok';
+"""
+
+PAGE_STATES = ("ok", "not_member", "pending", "login", "checkpoint", "unavailable")
+
+
+def _js_flags(pattern: "re.Pattern") -> str:
+    flags = ""
+    if pattern.flags & re.IGNORECASE:
+        flags += "i"
+    if pattern.flags & re.MULTILINE:
+        flags += "m"
+    if pattern.flags & re.DOTALL:
+        flags += "s"
+    return flags
+
+
+def first_clickable(xpaths: Sequence[str]) -> Callable:
+    """Wait condition: the first XPath (in order) with a visible, enabled element.
+
+    Returns ``(index, element)`` or ``False``. Every candidate is checked on each
+    poll, in one round-trip, so they all share one timeout.
+    """
+
+    def _condition(driver):
+        result = driver.execute_script(_FIRST_CLICKABLE_JS, list(xpaths))
+        return (int(result[0]), result[1]) if result else False
+
+    return _condition
+
+
+def first_match(candidates: Sequence[Union["re.Pattern", str]], textbox_xpath: str) -> Callable:
+    """Wait condition over mixed candidates, evaluated in-page in one round-trip.
+
+    A compiled regex matches the ``aria-placeholder`` of any element found by
+    ``textbox_xpath``; a string is an XPath. Returns ``(index, element)`` for the first
+    candidate that matches, or ``False``.
+    """
+    payload: List[dict] = []
+    for candidate in candidates:
+        if isinstance(candidate, str):
+            payload.append({"xpath": candidate})
+        else:
+            payload.append({"regex": candidate.pattern, "flags": _js_flags(candidate)})
+
+    def _condition(driver):
+        result = driver.execute_script(_FIRST_MATCH_JS, payload, textbox_xpath)
+        return (int(result[0]), result[1]) if result else False
+
+    return _condition
+
+
+def page_state(driver) -> str:
+    """Classify the loaded group page in one round-trip: one of ``PAGE_STATES``."""
+    state = driver.execute_script(_PAGE_STATE_JS)
+    return state if state in PAGE_STATES else "ok"
+
+
+def climb_and_query(driver, element, levels: int, css_selector: str) -> Optional[object]:
+    """Go ``levels`` parents up from ``element`` and return its first ``css_selector`` match."""
+    return driver.execute_script(_CLIMB_AND_QUERY_JS, element, levels, css_selector)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+# Facebook re-encodes uploads down to 2048px on the long edge, so anything larger is
+# only extra bytes on the wire for every group.
+MAX_EDGE = 2048
+JPEG_QUALITY = 85
+
+# Bump when the processing below changes so stale cache entries are not reused
+_PIPELINE_VERSION = 1
+
+
+def _content_hash(path: str, max_edge: int, quality: int) -> str:
+    digest = hashlib.sha256(f"v{_PIPELINE_VERSION}:{max_edge}:{quality}:".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _process_image(src: str, dst_base: str, max_edge: int, quality: int) -> str:
+    """Resize/recompress ``src`` without metadata; return the written path.
+
+    Runs in a worker process. Images with transparency stay PNG, everything else is
+    written as progressive JPEG.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        # Bake the EXIF orientation into the pixels before the EXIF block is dropped
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if has_alpha:
+            dst = dst_base + ".png"
+            out, fmt, options = img.convert("RGBA"), "PNG", {"optimize": True}
+        else:
+            dst = dst_base + ".jpg"
+            out, fmt, options = img.convert("RGB"), "JPEG", {"quality": quality, "optimize": True, "progressive": True}
+        tmp_path = dst + ".tmp"
+        # Saving without exif=/icc_profile= leaves all metadata behind
+        out.save(tmp_path, fmt, **options)
+    os.replace(tmp_path, dst)
+    return dst
+
+
+def _cached(dst_base: str) -> Optional[str]:
+    for ext in (".jpg", ".png"):
+        if os.path.exists(dst_base + ext):
+            return dst_base + ext
+    return None
+
+
+def prepare_images(
+    paths: List[str],
+    cache_dir: str,
+    max_edge: int = MAX_EDGE,
+    quality: int = JPEG_QUALITY,
+    workers: Optional[int] = None,
+) -> List[str]:
+    """Return upload-ready copies of ``paths``, in the same order.
+
+    Outputs live in ``<cache_dir>/images`` keyed by a hash of the source bytes and the
+    settings, so an image is only processed the first time any campaign uses it.
+    Missing images are processed in parallel on a process pool. Without Pillow (the
+    ``images`` extra), or for an image that fails to process, the original is used.
+    """
+    if not paths:
+        return []
+    logger = logging.getLogger(__name__)
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("Pillow is not installed; uploading original images (pip install 'fb-groups-poster[images]')")
+        return list(paths)
+
+    out_dir = os.path.join(cache_dir, "images")
+    os.makedirs(out_dir, exist_ok=True)
+    prepared: Dict[int, str] = {}
+    todo: Dict[str, List[int]] = {}
+    for idx, path in enumerate(paths):
+        try:
+            dst_base = os.path.join(out_dir, _content_hash(path, max_edge, quality))
+        except OSError as e:
+            logger.warning("Cannot read image %s: %s", path, e)
+            prepared[idx] = path
+            continue
+        hit = _cached(dst_base)
+        if hit:
+            prepared[idx] = hit
+        else:
+            todo.setdefault(dst_base, []).append(idx)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers or min(len(todo), os.cpu_count() or 1)) as pool:
+            futures = {
+                dst_base: pool.submit(_process_image, paths[idxs[0]], dst_base, max_edge, quality)
+                for dst_base, idxs in todo.items()
+            }
+            for dst_base, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    src = paths[todo[dst_base][0]]
+                    logger.warning("Could not optimize image %s, uploading the original: %s", src, e)
+                    result = src
+                for idx in todo[dst_base]:
+                    prepared[idx] = result
+
+    before = sum(_size(p) for p in paths)
+    after = sum(_size(prepared[i]) for i in range(len(paths)))
+    logger.info(
+        "Prepared %d image(s): %.1f MB -> %.1f MB (%d processed, %d from cache)",
+        len(paths),
+        before / 1e6,
+        after / 1e6,
+        sum(len(idxs) for idxs in todo.values()),
+        len(paths) - sum(len(idxs) for idxs in todo.values()),
+    )
+    return [prepared[i] for i in range(len(paths))]
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Set
+
+# Statuses that mean the post may be in the group: ``--resume`` skips them and the
+# group cooldown counts them. "unconfirmed" failed after the Post click.
+DONE_STATUSES = ("posted", "unconfirmed")
+
+
+class RunJournal:
+    """Append-only local record of every group a run has finished, for ``--resume``.
+
+    One JSON line per group result in ``<cache_dir>/journal/<run_id>.jsonl``. Each
+    line is flushed to the OS right away, so killing the process loses nothing; the
+    more expensive ``fsync`` (surviving a power cut) is batched to every
+    ``sync_every`` records or ``sync_interval`` seconds, and on ``close``.
+    """
+
+    def __init__(self, cache_dir: str, run_id: str, sync_every: int = 20, sync_interval: float = 5.0):
+        self.run_id = run_id
+        self.path = self.path_for(cache_dir, run_id)
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(cache_dir: str, run_id: str) -> str:
+        return os.path.join(cache_dir, "journal", f"{run_id}.jsonl")
+
+    @staticmethod
+    def last_posted(cache_dir: str) -> Dict[str, float]:
+        """When each group was last posted to, across every journaled run."""
+        latest: Dict[str, float] = {}
+        for path in glob.glob(os.path.join(cache_dir, "journal", "*.jsonl")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if entry.get("status") in DONE_STATUSES and entry.get("ts", 0) > latest.get(entry["url"], 0):
+                            latest[entry["url"]] = entry["ts"]
+            except OSError:
+                continue
+        return latest
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def completed(self, campaign: Optional[str] = None) -> Set[str]:
+        """Group URLs this run already posted ``campaign`` to, including unconfirmed posts.
+
+        Groups that failed before the Post click are not included.
+        """
+        done: Set[str] = set()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        continue
+                    if entry.get("status") in DONE_STATUSES and entry.get("campaign") == campaign:
+                        done.add(entry["url"])
+        except OSError:
+            pass
+        return done
+
+    def record(self, url: str, ok: bool, notes: str = "", campaign: Optional[str] = None, code: str = "") -> None:
+        status = "posted" if ok else "unconfirmed" if code == "unconfirmed" else "error"
+        entry = {"ts": time.time(), "url": url, "status": status}
+        if campaign:
+            entry["campaign"] = campaign
+        if notes:
+            entry["notes"] = notes
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._open_locked()
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync_locked()
+
+    def _open_locked(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        torn = False
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        self._file = open(self.path, "a", encoding="utf-8")
+        if torn:
+            # Terminate a line left half-written by a crash so the next entry stays readable
+            self._file.write("\n")
+
+    def _sync_locked(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._sync_locked()
+            self._file.close()
+            self._file = None
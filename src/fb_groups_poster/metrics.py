@@ -0,0 +1,204 @@
+"""Live metrics of an in-flight run, for runs on headless servers.
+
+``RunMetrics`` counts post results as they happen and renders them, together with
+the run profiler's step timings and a few gauges, in the Prometheus text format.
+``MetricsServer`` serves that on ``http://<host>:<port>/metrics`` from a daemon
+thread. Every post result, retry and browser relaunch can also be appended to a
+JSONL event file that is flushed line by line, so ``tail -f`` follows it.
+
+Both are off unless ``metrics.port`` or ``metrics.events_path`` is set.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .profiling import Profiler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upper bounds (seconds) of the step latency histogram buckets
+BUCKETS: Sequence[float] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# posts/sec is measured over this many trailing seconds
+RATE_WINDOW = 60.0
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RunMetrics:
+    """Counters, gauges and the event stream of one run; safe to use from every worker thread.
+
+    ``gauges`` maps a metric name to a callable read at scrape time (e.g. the tracker
+    rows waiting for the Sheets writer).
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        profiler: Optional[Profiler] = None,
+        events_path: str = "",
+        gauges: Optional[Dict[str, Callable[[], Optional[float]]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.run_id = run_id
+        self.profiler = profiler
+        self.gauges = dict(gauges or {})
+        self.clock = clock
+        self.started = clock()
+        self.success = 0
+        self.errors = 0
+        self.retries = 0
+        self.events = 0
+        self._recent: deque = deque()
+        self._lock = threading.Lock()
+        self._events = open(events_path, "a", encoding="utf-8", buffering=1) if events_path else None
+
+    def post(self, url: str, ok: bool, elapsed: float, code: str = "", campaign: str = "", attempt: int = 1) -> None:
+        """Count the final result of one post."""
+        with self._lock:
+            if ok:
+                self.success += 1
+            else:
+                self.errors += 1
+            self._recent.append(self.clock())
+        self.event("post", url=url, ok=ok, code=code, campaign=campaign, attempt=attempt, seconds=round(elapsed, 3))
+
+    def retry(self, url: str, elapsed: float, code: str, delay: float, campaign: str = "", attempt: int = 1) -> None:
+        """Count a failed attempt that will be retried."""
+        with self._lock:
+            self.retries += 1
+        self.event(
+            "retry", url=url, code=code, campaign=campaign, attempt=attempt, seconds=round(elapsed, 3), delay=round(delay, 1)
+        )
+
+    def event(self, kind: str, **fields) -> None:
+        """Append one ``{"ts", "run_id", "event", ...}`` line to the event file, if any."""
+        if self._events is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 3), "run_id": self.run_id, "event": kind, **fields})
+        with self._lock:
+            if self._events is None:
+                return
+            self._events.write(line + "\n")
+            self.events += 1
+
+    def rate(self) -> float:
+        """Final results per second over the last ``RATE_WINDOW`` seconds."""
+        now = self.clock()
+        with self._lock:
+            while self._recent and self._recent[0] < now - RATE_WINDOW:
+                self._recent.popleft()
+            count = len(self._recent)
+        span = min(RATE_WINDOW, now - self.started)
+        return count / span if span > 0 else 0.0
+
+    def render(self) -> str:
+        """The current values in the Prometheus text exposition format."""
+        with self._lock:
+            success, errors, retries = self.success, self.errors, self.retries
+        lines: List[str] = [
+            "# HELP fbpost_run_info The run being reported.",
+            "# TYPE fbpost_run_info gauge",
+            f'fbpost_run_info{{run_id="{_label(self.run_id)}"}} 1',
+            "# HELP fbpost_posts_total Posts with a final result.",
+            "# TYPE fbpost_posts_total counter",
+            f'fbpost_posts_total{{result="success"}} {success}',
+            f'fbpost_posts_total{{result="error"}} {errors}',
+            "# HELP fbpost_retries_total Failed attempts queued for a retry.",
+            "# TYPE fbpost_retries_total counter",
+            f"fbpost_retries_total {retries}",
+            f"# HELP fbpost_posts_per_second Final results per second over the last {RATE_WINDOW:.0f}s.",
+            "# TYPE fbpost_posts_per_second gauge",
+            f"fbpost_posts_per_second {self.rate():.4f}",
+        ]
+        for name, read in sorted(self.gauges.items()):
+            try:
+                value = read()
+            except Exception:
+                value = None
+            if value is None:
+                continue
+            lines += [f"# TYPE fbpost_{name} gauge", f"fbpost_{name} {_number(value)}"]
+        if self.profiler is not None:
+            lines += self._histograms()
+        return "\n".join(lines) + "\n"
+
+    def _histograms(self) -> List[str]:
+        durations = self.profiler.durations()
+        errors = self.profiler.errors()
+        lines = [
+            "# HELP fbpost_step_seconds Duration of each profiled step.",
+            "# TYPE fbpost_step_seconds histogram",
+        ]
+        for step in sorted(durations):
+            values = durations[step]
+            label = _label(step)
+            for bound in BUCKETS:
+                count = sum(1 for v in values if v <= bound)
+                lines.append(f'fbpost_step_seconds_bucket{{step="{label}",le="{bound:g}"}} {count}')
+            lines += [
+                f'fbpost_step_seconds_bucket{{step="{label}",le="+Inf"}} {len(values)}',
+                f'fbpost_step_seconds_sum{{step="{label}"}} {sum(values):.6f}',
+                f'fbpost_step_seconds_count{{step="{label}"}} {len(values)}',
+            ]
+        lines += ["# HELP fbpost_step_errors_total Profiled steps that raised.", "# TYPE fbpost_step_errors_total counter"]
+        lines += [f'fbpost_step_errors_total{{step="{_label(step)}"}} {count}' for step, count in sorted(errors.items())]
+        return lines
+
+    def close(self) -> None:
+        with self._lock:
+            events, self._events = self._events, None
+        if events is not None:
+            events.close()
+
+
+class MetricsServer:
+    """Serves ``metrics.render()`` at ``/metrics`` from a daemon thread; port 0 picks a free port."""
+
+    def __init__(self, metrics: RunMetrics, host: str = "127.0.0.1", port: int = 0):
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] not in ("/metrics", "/"):
+                    handler.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", CONTENT_TYPE)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                logging.getLogger(__name__).debug("metrics: " + format, *args)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._server.server_close()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import time
+from typing import Optional
+
+import click
+from tqdm import tqdm
+
+from .config import AppConfig
+from .runner import (
+    _confirm_groups,
+    _drain_tracker,
+    _fetch_groups_stage,
+    _finish,
+    _init_sheets_stage,
+    _launch_browsers,
+    _log_started,
+    _next_work,
+    _new_run,
+    _new_watchdog,
+    _post_visit,
+    _prepare_images_stage,
+    _prepare_posting,
+    _Progress,
+    _quiet_noisy_loggers,
+    _recycle_if_needed,
+    _release_browsers,
+    _Run,
+    _worker_count,
+)
+
+PROGRESS_REFRESH = 0.5
+
+
+async def _drive(run: _Run, driver, work: "queue.Queue") -> None:
+    """One cooperating task per browser: post to queued groups and due retries until none are left.
+
+    Each post runs on a worker thread, so the event loop stays free for the other
+    browsers and the progress ticker while this one waits on Facebook.
+    """
+    watchdog = _new_watchdog(run)
+    while True:
+        # Deferred retries may be backing off; wait for them off the event loop
+        item = await asyncio.to_thread(_next_work, run, work)
+        if item is None:
+            return
+        try:
+            results = await asyncio.to_thread(_post_visit, run, driver, *item)
+        finally:
+            run.retries.done()
+        fresh = await asyncio.to_thread(_recycle_if_needed, run, driver, watchdog, results)
+        if fresh is None:
+            return
+        driver = fresh
+
+
+async def _tick(pbar: tqdm) -> None:
+    # Keeps the elapsed time and rate moving while a long post is still in flight
+    while True:
+        await asyncio.sleep(PROGRESS_REFRESH)
+        pbar.refresh()
+
+
+async def _abandon_launch(run: _Run, launch: "asyncio.Task") -> None:
+    """Wait for an in-flight browser launch and shut down whatever it started."""
+    try:
+        run.drivers = await launch
+    except Exception as e:
+        logging.getLogger(__name__).debug("Browser launch failed after the run was called off: %s", e)
+    await asyncio.to_thread(_release_browsers, run)
+
+
+async def run_posting_async(
+    cfg: AppConfig,
+    assume_yes: bool = False,
+    refresh_groups: bool = False,
+    offline: bool = False,
+    resume_run_id: Optional[str] = None,
+) -> bool:
+    """Asyncio counterpart of ``runner.run_posting`` with the same arguments and result.
+
+    Edge starts launching straight away, in parallel with the Sheets login and the
+    group download, instead of after them. Because the group count is not known yet,
+    ``browser.workers`` sessions are launched up front and the surplus is shut down
+    once the groups are in. Tracker rows are always written by the background
+    writer so Sheets calls never sit on a browser's posting path.
+    """
+    _quiet_noisy_loggers()
+    run = _new_run(cfg, resume_run_id)
+    if run is None:
+        return False
+
+    run.launch_started = time.monotonic()
+    workers = max(1, getattr(cfg.browser, "workers", 1))
+    launch = asyncio.create_task(asyncio.to_thread(_launch_browsers, cfg, workers, run.clones, run.profiles))
+
+    # Offline the groups come from the local cache; Sheets is set up once they are confirmed
+    if not offline and not await asyncio.to_thread(_init_sheets_stage, run):
+        await _abandon_launch(run, launch)
+        return False
+    if run.sheets is not None:
+        run.sheets.writer.start()
+    if not await asyncio.to_thread(_fetch_groups_stage, run, refresh_groups, offline):
+        await _abandon_launch(run, launch)
+        _drain_tracker(run.sheets)
+        return False
+    verdict = await asyncio.to_thread(_confirm_groups, run, assume_yes)
+    if verdict is not None:
+        await _abandon_launch(run, launch)
+        _drain_tracker(run.sheets)
+        return verdict
+    if offline:
+        if not await asyncio.to_thread(_init_sheets_stage, run):
+            await _abandon_launch(run, launch)
+            return False
+        run.sheets.writer.start()
+
+    await asyncio.to_thread(_prepare_images_stage, run)
+    await asyncio.to_thread(_log_started, run)
+    try:
+        run.drivers = await launch
+    except Exception as e:
+        logging.getLogger(__name__).exception("Failed to launch browser: %s", e)
+        click.echo("[ ❌ ] Launching Edge: failed to launch browser", err=True)
+        await asyncio.to_thread(_release_browsers, run)
+        _drain_tracker(run.sheets)
+        return False
+    surplus, run.drivers = run.drivers[_worker_count(run):], run.drivers[: _worker_count(run)]
+    run.profiles = run.profiles[: _worker_count(run)]
+    for driver in surplus:
+        await asyncio.to_thread(driver.quit)
+
+    work = _prepare_posting(run)
+    try:
+        total = run.posts
+        click.echo("")
+        with tqdm(total=total, desc="Posting to groups", unit="post", ncols=80) as pbar:
+            run.progress = _Progress(pbar=pbar, total=total)
+            ticker = asyncio.create_task(_tick(pbar))
+            try:
+                await asyncio.gather(*(_drive(run, driver, work) for driver in run.drivers))
+            finally:
+                ticker.cancel()
+    finally:
+        await asyncio.to_thread(_finish, run)
+
+    return run.errors == 0 and not run.stopped
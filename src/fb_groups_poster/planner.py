@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .cache import GroupsCache
+from .config import Campaign
+from .profiling import span
+from .sheets import SheetsClient, get_filtered_group_links, load_group_index
+
+
+@dataclass
+class GroupVisit:
+    """One group page load and every campaign to post while it is open."""
+
+    url: str
+    campaigns: List[Campaign] = field(default_factory=list)
+
+
+def plan_visits(selections: Sequence[Tuple[Campaign, Sequence[str]]]) -> List[GroupVisit]:
+    """Merge each campaign's target groups into one visit per unique group.
+
+    ``selections`` pairs every campaign with the group links it targets. Groups keep
+    the order in which they are first targeted, and campaigns keep config order
+    within a visit, so the number of navigations equals the number of unique groups.
+    """
+    visits: Dict[str, GroupVisit] = {}
+    for campaign, links in selections:
+        for url in links:
+            visit = visits.setdefault(url, GroupVisit(url))
+            if not any(existing is campaign for existing in visit.campaigns):
+                visit.campaigns.append(campaign)
+    return list(visits.values())
+
+
+def post_count(visits: Sequence[GroupVisit]) -> int:
+    return sum(len(visit.campaigns) for visit in visits)
+
+
+def select_visits(
+    client: SheetsClient,
+    campaigns: Sequence[Campaign],
+    cache: Optional[GroupsCache] = None,
+    refresh: bool = False,
+    offline: bool = False,
+) -> List[GroupVisit]:
+    """Look up every campaign's groups in the Groups sheet and plan one visit per group."""
+    if len(campaigns) == 1:
+        links = get_filtered_group_links(
+            client,
+            campaigns[0].filter_tags,
+            cache=cache,
+            refresh=refresh,
+            offline=offline,
+            query=campaigns[0].tag_query,
+        ) or []
+        return plan_visits([(campaigns[0], links)])
+    # One download and index for every campaign's filter
+    index = load_group_index(client, cache, refresh=refresh, offline=offline)
+    with span("groups.select"):
+        return plan_visits([(c, index.select(c.filter_tags, c.tag_query)) for c in campaigns])
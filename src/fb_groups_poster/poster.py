@@ -2,18 +2,96 @@ from __future__ import annotations
 
 import time
 import uuid
-from typing import List
+from dataclasses import dataclass
+from typing import List, Optional
 import re
 import logging
 from datetime import datetime
 
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-import pyperclip
+from selenium.common.exceptions import TimeoutException
 
+from .browser import composer_url
+from .dom_probe import climb_and_query, first_clickable, first_match, page_state
+from .profiling import get_profiler, span
+from .selector_cache import SelectorCache
 from .sheets import SheetsClient
+from .text_input import insert_text
+from .waits import AdaptiveTimeouts, wait_until
+
+
+CREATE_POST_SELECTORS = [
+    "//span[contains(text(), 'Write something...')]",
+    "//span[contains(text(), \"What's on your mind\")]",
+    "//div[@role='button']//span[contains(text(), 'Write something')]",
+    "//div[contains(@class, 'x1lliihq')]//span[contains(text(), 'Write something')]",
+]
+
+TEXTBOX_XPATH = "//div[@role='textbox' and @contenteditable='true']"
+# Regexes matched against aria-placeholder for robustness (evaluated in-page by dom_probe)
+TEXT_AREA_PATTERNS = [
+    re.compile(r"write\s+something", re.I),
+    re.compile(r"create\s+.*\s+post", re.I),
+    re.compile(r"create\s+a\s+public\s+post", re.I),
+]
+# Fallback to a few XPath contains selectors if regex approach fails
+TEXT_AREA_FALLBACK_SELECTORS = [
+    "//div[@role='textbox' and @contenteditable='true' and contains(@aria-placeholder, 'Write something')]",
+    "//div[@role='textbox' and @contenteditable='true' and contains(@aria-placeholder, 'Create a public post')]",
+]
+# Text-area candidates as the selector cache sees them: regex sources, then XPaths
+TEXT_AREA_CANDIDATES = [pat.pattern for pat in TEXT_AREA_PATTERNS] + TEXT_AREA_FALLBACK_SELECTORS
+_PATTERNS_BY_SOURCE = {pat.pattern: pat for pat in TEXT_AREA_PATTERNS}
+
+PHOTO_BUTTON_XPATH = "//div[@aria-label='Photo/video' and @role='button']"
+# The image input sits next to the Photo/video button, three levels up
+IMAGE_INPUT_CSS = "input[type='file'][accept^='image']"
+POST_BUTTON_XPATH = "//div[@aria-label='Post' and @role='button']"
+UPLOAD_PROGRESS_XPATH = "//div[@role='dialog']//*[@role='progressbar']"
+# The composer previews each picked image from a local blob: URL
+ATTACHMENT_PREVIEW_XPATH = "//div[@role='dialog']//img[starts-with(@src, 'blob:')]"
+POSTING_XPATH = "//*[contains(text(), 'Posting')]"
+
+# Page states that doom one group, and ones that doom every post of the account
+GROUP_STATES = frozenset({"not_member", "pending", "unavailable"})
+ACCOUNT_STATES = frozenset({"login", "checkpoint"})
+
+
+class PageStateError(RuntimeError):
+    """The group page is in a state no post can succeed in (see ``dom_probe.PAGE_STATES``)."""
+
+    def __init__(self, code: str):
+        super().__init__(f"Group page is {code.replace('_', ' ')}")
+        self.code = code
+
+
+@dataclass
+class PostResult:
+    """Outcome of one ``post_to_group`` call; truthy when the post went out.
+
+    ``code`` is ``"ok"``, a page state such as ``"not_member"`` or ``"login"``,
+    ``"timeout"`` when a step's wait ran out, ``"unconfirmed"`` when anything failed
+    after the Post button was clicked (the post has probably gone out), or
+    ``"error"`` for anything else. ``seconds`` is the time spent in the browser (the
+    ``post.total`` span); 0 for results that never reached it.
+    """
+
+    ok: bool
+    code: str = "ok"
+    error: str = ""
+    seconds: float = 0.0
+
+    def __bool__(self) -> bool:
+        return self.ok
+
+
+def _error_code(exc: Exception) -> str:
+    if isinstance(exc, PageStateError):
+        return exc.code
+    if isinstance(exc, TimeoutException):
+        return "timeout"
+    return "error"
 
 
 def log_app(client: SheetsClient, event: str, details: str, status: str, notes: str, run_id: str) -> None:
@@ -27,98 +105,148 @@ def log_app(client: SheetsClient, event: str, details: str, status: str, notes:
     )
 
 
-def post_to_group(driver, wait: WebDriverWait, client: SheetsClient, group_url: str, text: str, image_paths: List[str], run_id: str) -> bool:
+def _find_with_cache(
+    driver,
+    timeouts: AdaptiveTimeouts,
+    selectors: SelectorCache,
+    step: str,
+    candidates: List[str],
+    make_condition,
+    message: str,
+    group_url: str,
+):
+    """Wait for the best candidate of ``step``, trying historically winning ones first."""
+    ordered = selectors.order(step, candidates, group=group_url)
+    started = time.monotonic()
+    try:
+        with span(f"post.{step}"), timeouts.step(step) as timeout:
+            hit, element = wait_until(driver, timeout, make_condition(ordered), message)
+    except Exception:
+        selectors.record(step, ordered, None, group=group_url)
+        raise
+    selectors.record(step, ordered, hit, time.monotonic() - started, group=group_url)
+    logging.getLogger(__name__).debug("%s matched %r", step, ordered[hit])
+    return element
+
+
+def _composer_ready(images: int):
+    """Wait condition: a preview for each of ``images``, no upload progress bar, Post enabled.
+
+    Post is enabled as soon as the text is in, before the uploads even start, so the
+    previews are what tells the images are attached.
+    """
+
+    def _condition(driver):
+        if len(driver.find_elements(By.XPATH, ATTACHMENT_PREVIEW_XPATH)) < images:
+            return False
+        if driver.find_elements(By.XPATH, UPLOAD_PROGRESS_XPATH):
+            return False
+        ready = first_clickable([POST_BUTTON_XPATH])(driver)
+        return ready[1] if ready else False
+
+    return _condition
+
+
+def post_to_group(
+    driver,
+    client: SheetsClient,
+    group_url: str,
+    text: str,
+    image_paths: List[str],
+    run_id: str,
+    timeouts: Optional[AdaptiveTimeouts] = None,
+    selectors: Optional[SelectorCache] = None,
+    navigate: bool = True,
+    lightweight: bool = False,
+) -> PostResult:
+    """Post ``text`` and ``image_paths`` to one group and log the result to the tracker.
+
+    With ``navigate=False`` the group page already open in ``driver`` is reused, for
+    the second and later posts of the same visit. Right after navigating the page is
+    classified in one script call, so a group the account cannot post to (not a
+    member, pending approval, login wall, checkpoint, removed) fails immediately
+    instead of after every selector wait has timed out. ``lightweight`` loads the
+    bare group URL (see ``composer_url``) instead of the link as written in the sheet.
+    """
     logger = logging.getLogger(__name__)
-    driver.get(group_url)
+    timeouts = timeouts or AdaptiveTimeouts()
+    selectors = selectors or SelectorCache()
+    started = time.perf_counter()
+    ok = False
+    clicked = False
     try:
-        logger.debug("Navigated to group page")
-        selectors = [
-            "//span[contains(text(), 'Write something...')]",
-            "//span[contains(text(), \"What's on your mind\")]",
-            "//div[@role='button']//span[contains(text(), 'Write something')]",
-            "//div[contains(@class, 'x1lliihq')]//span[contains(text(), 'Write something')]",
-        ]
-        create_post_input = None
-        for sel in selectors:
-            try:
-                create_post_input = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, sel)))
-                break
-            except Exception:
-                continue
-        if not create_post_input:
-            raise RuntimeError("Create-post input not found")
+        if navigate:
+            with span("post.navigate"):
+                driver.get(composer_url(group_url) if lightweight else group_url)
+            with span("post.page_state"):
+                state = page_state(driver)
+            if state != "ok":
+                raise PageStateError(state)
+            logger.debug("Navigated to group page")
+        # All create-post selectors are polled together under a single timeout
+        try:
+            create_post_input = _find_with_cache(
+                driver,
+                timeouts,
+                selectors,
+                "create_post",
+                CREATE_POST_SELECTORS,
+                first_clickable,
+                "Create-post input not found",
+                group_url,
+            )
+        except TimeoutException:
+            # The page may have finished rendering into a dead state after the first check
+            state = page_state(driver)
+            if state != "ok":
+                raise PageStateError(state)
+            raise
         create_post_input.click()
 
         # text area
-        # Python-side regex matching on aria-placeholder for robustness
-        regex_patterns = [
-            re.compile(r"write\s+something", re.I),
-            re.compile(r"create\s+.*\s+post", re.I),
-            re.compile(r"create\s+a\s+public\s+post", re.I),
-        ]
-        text_area = None
-        try:
-            # Broad query to collect possible editable textboxes
-            candidates = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, "//div[@role='textbox' and @contenteditable='true']")
-                )
-            )
-            for el in candidates:
-                placeholder = el.get_attribute("aria-placeholder") or ""
-                for pat in regex_patterns:
-                    if pat.search(placeholder):
-                        text_area = el
-                        break
-                if text_area:
-                    break
-        except Exception:
-            text_area = None
-        # Fallback to a few XPath contains selectors if regex approach fails
-        if not text_area:
-            fallback_selectors = [
-                "//div[@role='textbox' and @contenteditable='true' and contains(@aria-placeholder, 'Write something')]",
-                "//div[@role='textbox' and @contenteditable='true' and contains(@aria-placeholder, 'Create a public post')]",
-            ]
-            for sel in fallback_selectors:
-                try:
-                    text_area = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.XPATH, sel))
-                    )
-                    if text_area:
-                        break
-                except Exception:
-                    continue
-        if not text_area:
-            raise RuntimeError("Text area not found")
+        text_area = _find_with_cache(
+            driver,
+            timeouts,
+            selectors,
+            "text_area",
+            TEXT_AREA_CANDIDATES,
+            lambda ordered: first_match([_PATTERNS_BY_SOURCE.get(c, c) for c in ordered], TEXTBOX_XPATH),
+            "Text area not found",
+            group_url,
+        )
         text_area.click()
-        try:
-            pyperclip.copy(text)
-            text_area.send_keys(Keys.CONTROL + 'v')
-            logger.debug("Text pasted via clipboard")
-        except Exception:
-            # Fallback in environments where clipboard is unavailable (e.g., headless)
-            text_area.send_keys(text)
-            logger.debug("Clipboard unavailable; text sent via keystrokes")
-        time.sleep(2)
-
-        photo_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='Photo/video' and @role='button']")))
-        # climb and find file input
-        parent = photo_btn
-        for _ in range(3):
-            parent = parent.find_element(By.XPATH, './..')
-        file_input = parent.find_element(By.XPATH, ".//input[@type='file' and starts-with(@accept, 'image')]")
-        file_input.send_keys("\n".join(image_paths))
-        logger.debug("Queued %d image(s) for upload", len(image_paths))
-
-        post_button = wait.until(EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='Post' and @role='button']")))
-        time.sleep(5)
-        post_button.click()
-        logger.debug("Clicked Post button; waiting for completion")
-
-        posting_wait = WebDriverWait(driver, 120)
-        posting_el = posting_wait.until(EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Posting')]")))
-        posting_wait.until(EC.invisibility_of_element(posting_el))
+        with span("post.text_entry"):
+            method = insert_text(driver, text_area, text)
+            logger.debug("Text inserted via %s", method)
+            # Wait until the editor shows the text rather than sleeping a fixed time; an
+            # images-only post has nothing to show
+            if text.strip():
+                with timeouts.step("text_entry") as timeout:
+                    wait_until(driver, timeout, lambda d: (text_area.text or "").strip(), "Text did not appear in the editor")
+
+        with span("post.photo_button"), timeouts.step("photo_button") as timeout:
+            _, photo_btn = wait_until(driver, timeout, first_clickable([PHOTO_BUTTON_XPATH]), "Photo/video button not found")
+        with span("post.image_upload"):
+            # climb and find file input, in one round-trip
+            file_input = climb_and_query(driver, photo_btn, 3, IMAGE_INPUT_CSS)
+            if file_input is None:
+                raise RuntimeError("Image file input not found")
+            file_input.send_keys("\n".join(image_paths))
+            logger.debug("Queued %d image(s) for upload", len(image_paths))
+            # Images attached, uploads finished and Post enabled, instead of a fixed pause
+            with timeouts.step("composer_ready") as timeout:
+                post_button = wait_until(
+                    driver, timeout, _composer_ready(len(image_paths)), "Post button did not become ready"
+                )
+
+        with span("post.posting"):
+            post_button.click()
+            clicked = True
+            logger.debug("Clicked Post button; waiting for completion")
+            with timeouts.step("posting_started") as timeout:
+                posting_el = wait_until(driver, timeout, EC.presence_of_element_located((By.XPATH, POSTING_XPATH)))
+            with timeouts.step("posting_finished") as timeout:
+                wait_until(driver, timeout, EC.invisibility_of_element(posting_el))
         logger.debug("Posting completed")
 
         client.log_row(
@@ -129,15 +257,19 @@ def post_to_group(driver, wait: WebDriverWait, client: SheetsClient, group_url:
             notes=f"Images: {len(image_paths)}",
             run_id=run_id,
         )
-        return True
+        ok = True
+        return PostResult(True, seconds=time.perf_counter() - started)
     except Exception as e:
+        # Past the click a retry could post twice; only a human can tell whether it went out
+        code = "unconfirmed" if clicked else _error_code(e)
         client.log_row(
             content=(text[:50] + "...") if len(text) > 50 else text,
             post_type="Group post",
             details=f"Failed to post to {group_url}",
             status="Error",
-            notes=f"Error: {e}",
+            notes=f"Error [{code}]: {e}",
             run_id=run_id,
         )
-        return False
-
+        return PostResult(False, code, str(e), seconds=time.perf_counter() - started)
+    finally:
+        get_profiler().record("post.total", time.perf_counter() - started, error=not ok)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import csv
+import glob
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (``pct`` in 0..100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Profiler:
+    """Collects named timing spans (seconds) for one run and summarizes them per step.
+
+    Spans are cheap -- a ``perf_counter`` pair and a list append under a lock -- so they
+    can wrap every step of every post. A span that raises is still timed and also
+    counted as an error for its step.
+    """
+
+    def __init__(self, run_id: str = ""):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self._durations: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.record(name, time.perf_counter() - start, error=True)
+            raise
+        self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self._durations.setdefault(name, []).append(seconds)
+            if error:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    def durations(self) -> Dict[str, List[float]]:
+        with self._lock:
+            return {name: list(values) for name, values in self._durations.items()}
+
+    def errors(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._errors)
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            errors = dict(self._errors)
+        return summarize(self.durations(), errors)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            errors = dict(self._errors)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "durations": self.durations(),
+            "errors": errors,
+        }
+
+    def export(self, directory: str) -> str:
+        """Write ``<run_id>.json`` (raw samples) and ``<run_id>.csv`` (summary); return the JSON path."""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.run_id or time.strftime("%Y%m%d-%H%M%S"))
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        with open(base + ".csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(SUMMARY_COLUMNS)
+            for name, row in self.summary().items():
+                writer.writerow([name] + [row[col] for col in SUMMARY_COLUMNS[1:]])
+        return base + ".json"
+
+
+SUMMARY_COLUMNS = ["step", "count", "errors", "total", "p50", "p95", "p99", "max"]
+
+
+def summarize(durations: Dict[str, List[float]], errors: Optional[Dict[str, int]] = None) -> Dict[str, dict]:
+    errors = errors or {}
+    out: Dict[str, dict] = {}
+    for name in sorted(durations):
+        values = durations[name]
+        out[name] = {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "total": round(sum(values), 3),
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "max": round(max(values), 3) if values else 0.0,
+        }
+    return out
+
+
+def load_profile(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_profile(directory: str, run: str) -> Optional[str]:
+    """Resolve ``run`` (a JSON path, a run ID, or ``latest``) to an exported profile."""
+    if os.path.isfile(run):
+        return run
+    if run == "latest":
+        candidates = glob.glob(os.path.join(directory, "*.json"))
+        return max(candidates, key=os.path.getmtime) if candidates else None
+    path = os.path.join(directory, f"{run}.json")
+    return path if os.path.exists(path) else None
+
+
+# Process-wide profiler the instrumented functions report to; the runner installs a
+# fresh one per run. Outside a run spans go to a throwaway default.
+_current = Profiler()
+
+
+def get_profiler() -> Profiler:
+    return _current
+
+
+def set_profiler(profiler: Profiler) -> None:
+    global _current
+    _current = profiler
+
+
+def span(name: str):
+    """Time a block under ``name`` on the current run's profiler."""
+    return _current.span(name)
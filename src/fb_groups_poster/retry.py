@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+from typing import Any, List, Optional, Tuple
+
+from .scheduler import Clock
+
+# Failures worth another attempt later: a step's wait ran out, or the browser threw
+# something unexpected (stale element, detached frame, ...) before Post was clicked.
+# Page states such as not_member or login fail the same way on every attempt, and an
+# "unconfirmed" post (failed after the click) may already be in the group.
+TRANSIENT_CODES = frozenset({"timeout", "error"})
+
+
+def is_transient(code: str) -> bool:
+    return code in TRANSIENT_CODES
+
+
+class RetryQueue:
+    """Deferred retries with exponential backoff, shared by all workers.
+
+    ``push`` schedules an item ``base_delay * 2**(attempt - 1)`` seconds out (capped
+    at ``max_delay``) and refuses it once ``max_attempts`` is reached or when it would
+    fall due more than ``budget`` seconds after the first deferral of the run, so the
+    retry phase cannot drag a run on indefinitely. Workers pick up due items with
+    ``get`` once their regular work is done.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 60.0,
+        max_delay: float = 900.0,
+        budget: float = 1800.0,
+        clock: Optional[Clock] = None,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.clock = clock or Clock()
+        self._heap: List[Tuple[float, int, int, Any]] = []
+        self._seq = itertools.count()
+        self._deadline: Optional[float] = None
+        self._busy = 0
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def delay(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def allows(self, attempt: int) -> Optional[float]:
+        """When the retry after the ``attempt``-th failure falls due, or None if it gets no more tries.
+
+        The retry budget starts with the first deferral asked for.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        now = self.clock.monotonic()
+        due = now + self.delay(attempt)
+        with self._cond:
+            if self._deadline is None:
+                self._deadline = now + self.budget
+            if due > self._deadline:
+                return None
+        return due
+
+    def push(self, item: Any, attempt: int) -> bool:
+        """Defer ``item`` after its ``attempt``-th failure; False if it gets no more tries."""
+        due = self.allows(attempt)
+        if due is None:
+            return False
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), attempt + 1, item))
+            self._cond.notify_all()
+        return True
+
+    def pop_due(self) -> Optional[Tuple[Any, int]]:
+        """The earliest due ``(item, attempt)`` without waiting, or None."""
+        with self._cond:
+            if self._heap and self._heap[0][0] <= self.clock.monotonic():
+                _, _, attempt, item = heapq.heappop(self._heap)
+                return item, attempt
+        return None
+
+    def next_due_in(self) -> Optional[float]:
+        with self._cond:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - self.clock.monotonic())
+
+    def begin(self) -> None:
+        """Mark a worker busy on a post that may still push a retry."""
+        with self._cond:
+            self._busy += 1
+
+    def done(self) -> None:
+        with self._cond:
+            self._busy -= 1
+            self._cond.notify_all()
+
+    def get(self, stop=lambda: False) -> Optional[Tuple[Any, int]]:
+        """Wait for the next due ``(item, attempt)``; None once nothing is left to retry.
+
+        Keeps waiting while another worker is busy, since its post may still fail
+        and be deferred. ``stop`` is polled so a stopped run does not sit out a backoff.
+        """
+        with self._cond:
+            while not stop():
+                if self._heap:
+                    wait = self._heap[0][0] - self.clock.monotonic()
+                    if wait <= 0:
+                        _, _, attempt, item = heapq.heappop(self._heap)
+                        return item, attempt
+                    self._cond.wait(min(wait, 1.0))
+                elif self._busy:
+                    self._cond.wait(1.0)
+                else:
+                    return None
+            dropped = len(self._heap)
+            self._heap.clear()
+        if dropped:
+            logging.getLogger(__name__).info("Dropped %d deferred retry attempt(s) after the run was stopped", dropped)
+        return None
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Dict
+from typing import Any, Dict, List, Optional, Tuple
+import queue
+import shutil
+import threading
 
-from selenium.webdriver.support.ui import WebDriverWait
 import click
 import logging
 import time
@@ -12,14 +16,124 @@ import os
 from .cli_ui import Spinner
 from tqdm import tqdm
 
-from .config import AppConfig
-from .browser import build_edge
-from .sheets import init_sheets, get_filtered_group_links
-from .poster import post_to_group, log_app
+from .config import AppConfig, BrowserConfig, Campaign, PacingConfig, RetryConfig
+from .browser import build_edge, clear_session, clone_profile, live_session_address, write_session
+from .cache import GroupsCache
+from .images import prepare_images
+from .journal import RunJournal
+from .metrics import MetricsServer, RunMetrics
+from .profiling import Profiler, set_profiler, span
+from .planner import GroupVisit, post_count, select_visits
+from .sheets import init_sheets
+from .poster import ACCOUNT_STATES, GROUP_STATES, PostResult, post_to_group, log_app
+from .retry import RetryQueue, is_transient
+from .scheduler import Scheduler
+from .selector_cache import SelectorCache
+from .waits import AdaptiveTimeouts
+from .watchdog import BrowserWatchdog, browser_rss
 
 
-def run_posting(cfg: AppConfig, assume_yes: bool = False) -> bool:
+@dataclass
+class _Progress:
+    """Success/error counters and the tqdm bar, shared by all browser workers."""
+
+    pbar: tqdm
+    total: int
+    success: int = 0
+    errors: int = 0
+    first_result_at: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, idx: int, url: str, ok: bool, elapsed: float, note: str = "") -> None:
+        with self._lock:
+            if self.first_result_at is None:
+                self.first_result_at = time.monotonic()
+            symbol = "✅" if ok else "❌"
+            if ok:
+                self.success += 1
+            else:
+                self.errors += 1
+            self.pbar.set_postfix({"last": f"{elapsed:.1f}s", "ok": self.success, "err": self.errors})
+            self.pbar.update(1)
+            suffix = f"  ({note})" if note else ""
+            click.echo(f"  {symbol} [{idx}/{self.total}] {elapsed:.1f}s  {url}{suffix}")
+
+    def defer(self, idx: int, url: str, elapsed: float, note: str) -> None:
+        """Report a failed attempt that will be retried; the bar only counts final results."""
+        with self._lock:
+            click.echo(f"  ↻ [{idx}/{self.total}] {elapsed:.1f}s  {url}  ({note})")
+
+
+def _launch_browsers(cfg: AppConfig, workers: int, clones: List[str], profiles: Optional[list] = None) -> list:
+    """Start one Edge session per worker; extra workers run on cloned profiles.
+
+    When ``fbpost browser start`` is keeping a session alive, the first worker attaches
+    to it instead of cold-starting Edge. ``profiles`` receives the browser config each
+    session was launched with (None for the attached one), for relaunching it later.
+    """
     logger = logging.getLogger(__name__)
+    drivers = []
+    profiles = profiles if profiles is not None else []
+    try:
+        attach_to = live_session_address(cfg.cache_dir)
+        if attach_to:
+            logger.info("Attaching to running browser session at %s", attach_to)
+            drivers.append(build_edge(cfg.browser, cache_dir=cfg.cache_dir, debugger_address=attach_to))
+            profiles.append(None)
+        elif workers == 1:
+            drivers.append(build_edge(cfg.browser, cache_dir=cfg.cache_dir))
+            profiles.append(cfg.browser)
+        for worker_no in range(len(drivers) + 1, workers + 1):
+            worker_cfg = clone_profile(cfg.browser, worker_no)
+            clones.append(worker_cfg.edge_profile_dir)
+            drivers.append(build_edge(worker_cfg, cache_dir=cfg.cache_dir))
+            profiles.append(worker_cfg)
+    except Exception:
+        for driver in drivers:
+            driver.quit()
+        raise
+    return drivers
+
+
+@dataclass
+class _Run:
+    """State of one posting run, shared by the sync runner and the asyncio orchestrator."""
+
+    cfg: AppConfig
+    run_id: str
+    resumed: bool
+    journal: RunJournal
+    profiler: Profiler
+    sheets: Any = None
+    groups_cache: Optional[GroupsCache] = None
+    visits: List[GroupVisit] = field(default_factory=list)
+    images: Dict[str, str] = field(default_factory=dict)
+    drivers: list = field(default_factory=list)
+    # Launch config per entry of ``drivers``; None where the session cannot be relaunched
+    profiles: List[Optional[BrowserConfig]] = field(default_factory=list)
+    clones: List[str] = field(default_factory=list)
+    timeouts: Optional[AdaptiveTimeouts] = None
+    selectors: Optional[SelectorCache] = None
+    progress: Optional[_Progress] = None
+    scheduler: Optional[Scheduler] = None
+    retries: Optional[RetryQueue] = None
+    metrics: Optional[RunMetrics] = None
+    metrics_server: Optional[MetricsServer] = None
+    # Set to the page state that makes every remaining post pointless (e.g. logged out)
+    stopped: Optional[str] = None
+    start_time: datetime = field(default_factory=datetime.now)
+    launch_started: float = field(default_factory=time.monotonic)
+
+    @property
+    def posts(self) -> int:
+        return post_count(self.visits)
+
+    @property
+    def errors(self) -> int:
+        return self.progress.errors if self.progress else 0
+
+
+def _quiet_noisy_loggers() -> None:
     # Silence Selenium / urllib3 noise unless verbose logging is enabled
     if logging.getLogger().level > logging.DEBUG:
         for noisy in (
@@ -30,95 +144,600 @@ def run_posting(cfg: AppConfig, assume_yes: bool = False) -> bool:
             logging.getLogger(noisy).setLevel(logging.WARNING)
         # Also silence Selenium driver manager stdout if possible
         os.environ.setdefault("WDM_LOG_LEVEL", "0")
+
+
+def _new_run(cfg: AppConfig, resume_run_id: Optional[str]) -> Optional[_Run]:
+    run_id = resume_run_id or str(uuid.uuid4())
+    journal = RunJournal(cfg.cache_dir, run_id)
+    if resume_run_id and not journal.exists():
+        click.echo(f"No journal found for run '{resume_run_id}' (looked in {journal.path}).", err=True)
+        return None
+    profiler = Profiler(run_id)
+    set_profiler(profiler)
+    return _Run(
+        cfg=cfg,
+        run_id=run_id,
+        resumed=bool(resume_run_id),
+        journal=journal,
+        profiler=profiler,
+    )
+
+
+def _init_sheets_stage(run: _Run) -> bool:
     # Stage: Initialize Sheets
     sp = Spinner("Initializing Google Sheets client")
     sp.start()
     try:
-        sheets = init_sheets(cfg.sheets)
+        run.sheets = init_sheets(run.cfg.sheets)
         sp.succeed()
+        return True
     except Exception as e:
         sp.fail("failed to initialize")
-        logger.exception("Failed to initialize Google Sheets client: %s", e)
+        logging.getLogger(__name__).exception("Failed to initialize Google Sheets client: %s", e)
         click.echo("Check your service account file, spreadsheet ID, and sharing permissions.", err=True)
         return False
 
+
+def _fetch_groups_stage(run: _Run, refresh_groups: bool, offline: bool) -> bool:
     # Stage: Fetch groups
-    tags_label = ", ".join(cfg.poster.filter_tags) or "<none>"
-    sp = Spinner(f"Fetching group links (tags: {tags_label})")
+    cfg = run.cfg
+    campaigns = cfg.poster.all_campaigns()
+    if len(campaigns) > 1:
+        tags_label = f"{len(campaigns)} campaigns"
+    else:
+        tags_label = "tags: " + (", ".join(campaigns[0].filter_tags) or "<none>")
+        if campaigns[0].tag_query:
+            tags_label += f"; query: {campaigns[0].tag_query}"
+    cache = run.groups_cache = GroupsCache(
+        cfg.cache_dir, cfg.sheets.spreadsheet_id, cfg.sheets.groups_sheet, ttl=cfg.sheets.groups_cache_ttl
+    )
+    source = "cache only" if offline else ("refresh" if refresh_groups else "cached")
+    sp = Spinner(f"Fetching group links ({tags_label}; {source})")
     sp.start()
     try:
-        group_links = get_filtered_group_links(sheets, cfg.poster.filter_tags) or []
-        sp.succeed(f"  —  {len(group_links)} group(s)")
+        run.visits = select_visits(run.sheets, campaigns, cache, refresh=refresh_groups, offline=offline)
+        suffix = f"  —  {len(run.visits)} group(s)"
+        if len(campaigns) > 1:
+            suffix += f", {run.posts} post(s)"
+        sp.succeed(suffix)
+        return True
     except Exception as e:
         sp.fail("failed to fetch groups")
-        logger.exception("Failed to fetch group links: %s", e)
+        logging.getLogger(__name__).exception("Failed to fetch group links: %s", e)
         return False
-    count = len(group_links)
-    if count == 0:
+
+
+def _confirm_groups(run: _Run, assume_yes: bool) -> Optional[bool]:
+    """Apply ``--resume`` and ask for confirmation; a bool return ends the run with that result."""
+    if not run.visits:
         click.echo("No groups matched the provided filter tags. Nothing to post.")
         return False
-    if not assume_yes and not click.confirm(f"Proceed to post to {count} group(s)?", default=True):
+    if run.resumed:
+        before = run.posts
+        done = {}
+        for visit in run.visits:
+            for campaign in visit.campaigns:
+                if campaign.name not in done:
+                    done[campaign.name] = run.journal.completed(campaign.name or None)
+            visit.campaigns = [c for c in visit.campaigns if visit.url not in done[c.name]]
+        run.visits = [visit for visit in run.visits if visit.campaigns]
+        click.echo(f"Resuming run {run.run_id}: {before - run.posts} post(s) already made, {run.posts} left.")
+        if not run.visits:
+            return True
+    count = len(run.visits)
+    prompt = f"Proceed to post to {count} group(s)?"
+    if run.posts != count:
+        prompt = f"Proceed to make {run.posts} post(s) in {count} group(s)?"
+    if not assume_yes and not click.confirm(prompt, default=True):
         click.echo("Aborted by user before posting.")
         return False
+    return None
+
+
+def _prepare_images_stage(run: _Run) -> None:
+    # Stage: Shrink images once per run instead of uploading the originals to every group
+    poster = run.cfg.poster
+    paths = list(dict.fromkeys(p for visit in run.visits for c in visit.campaigns for p in c.image_paths))
+    if not paths or not getattr(poster, "optimize_images", True):
+        return
+    sp = Spinner(f"Preparing {len(paths)} image(s)")
+    sp.start()
+    try:
+        with span("images.prepare"):
+            prepared = prepare_images(
+                paths,
+                run.cfg.cache_dir,
+                max_edge=poster.image_max_edge,
+                quality=poster.image_quality,
+            )
+        run.images = dict(zip(paths, prepared))
+        sp.succeed()
+    except Exception as e:
+        sp.fail("using original images")
+        logging.getLogger(__name__).warning("Image preparation failed, uploading originals: %s", e)
+
 
-    run_id = str(uuid.uuid4())
-    start_time = datetime.now()
+def _worker_count(run: _Run) -> int:
+    return max(1, min(getattr(run.cfg.browser, "workers", 1), len(run.visits) or 1))
 
+
+def _log_started(run: _Run) -> None:
+    campaigns = run.cfg.poster.all_campaigns()
+    run.start_time = datetime.now()
+    if len(campaigns) > 1:
+        details = f"Starting {run.posts} posts in {len(run.visits)} groups"
+        notes = f"Campaigns: {', '.join(c.name for c in campaigns)}"
+    else:
+        details = f"Starting for {len(run.visits)} groups"
+        notes = f"Tags: {', '.join(campaigns[0].filter_tags)}; Images: {len(campaigns[0].image_paths)}"
     log_app(
-        sheets,
-        event="Started",
-        details=f"Starting for {len(group_links)} groups",
+        run.sheets,
+        event="Resumed" if run.resumed else "Started",
+        details=details,
         status="Started",
-        notes=f"Tags: {', '.join(cfg.poster.filter_tags)}; Images: {len(cfg.poster.image_paths)}",
-        run_id=run_id,
+        notes=notes,
+        run_id=run.run_id,
     )
 
-    # Stage: Launch browser
-    sp = Spinner(f"Launching Edge (headless={getattr(cfg.browser, 'headless', False)})")
+
+def _release_browsers(run: _Run) -> None:
+    for driver in run.drivers:
+        if driver is None:
+            continue
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.getLogger(__name__).debug("Browser did not shut down cleanly: %s", e)
+    run.drivers = []
+    run.profiles = []
+    for path in run.clones:
+        shutil.rmtree(path, ignore_errors=True)
+    run.clones = []
+
+
+def _launch_stage(run: _Run, workers: int) -> bool:
+    # Stage: Launch browser(s)
+    sp = Spinner(f"Launching Edge (headless={getattr(run.cfg.browser, 'headless', False)}, workers={workers})")
     sp.start()
     try:
-        driver = build_edge(cfg.browser)
-        wait = WebDriverWait(driver, 60)
+        run.drivers = _launch_browsers(run.cfg, workers, run.clones, run.profiles)
         sp.succeed()
+        return True
     except Exception as e:
         sp.fail("failed to launch browser")
-        logger.exception("Failed to launch browser: %s", e)
+        logging.getLogger(__name__).exception("Failed to launch browser: %s", e)
+        _release_browsers(run)
+        _drain_tracker(run.sheets)
         return False
 
-    logger.info("Browser ready. Starting posting run: %s", run_id)
 
-    success = 0
-    errors = 0
+def _prepare_posting(run: _Run) -> "queue.Queue":
+    """Log that posting starts and return the queue of ``(first post number, visit)`` work items."""
+    cfg = run.cfg
+    logging.getLogger(__name__).info(
+        "Browser ready in %.1fs. Starting posting run: %s (resume with: fbpost run --resume %s)",
+        time.monotonic() - run.launch_started,
+        run.run_id,
+        run.run_id,
+    )
+    _init_posting_state(run)
+    retry = getattr(cfg, "retry", None) or RetryConfig()
+    run.retries = RetryQueue(
+        max_attempts=retry.max_attempts,
+        base_delay=retry.base_delay,
+        max_delay=retry.max_delay,
+        budget=retry.budget_minutes * 60.0,
+    )
+    # Visits run in schedule order: groups still cooling down from earlier runs go last
+    slots = run.scheduler.plan([(visit.url, len(visit.campaigns)) for visit in run.visits])
+    by_url = {visit.url: visit for visit in run.visits}
+    run.visits = [by_url[slot.url] for slot in slots]
+    if run.scheduler.posts_per_hour or run.scheduler.cooldown:
+        logging.getLogger(__name__).info(
+            "Pacing: %s posts/hour, last group starts in ~%.0f min",
+            f"{run.scheduler.posts_per_hour:g}" if run.scheduler.posts_per_hour else "unlimited",
+            (slots[-1].at if slots else 0) / 60,
+        )
+    # Groups are handed out from one queue so a slow worker never holds a fixed shard hostage
+    work: "queue.Queue" = queue.Queue()
+    idx = 1
+    for visit in run.visits:
+        work.put((idx, visit))
+        idx += len(visit.campaigns)
+    return work
+
+
+def _init_posting_state(run: _Run) -> None:
+    cfg = run.cfg
+    # Step timings from earlier runs tighten the element waits; shared by all workers
+    run.timeouts = AdaptiveTimeouts(path=os.path.join(cfg.cache_dir, "step-timings.json"))
+    run.selectors = SelectorCache(
+        path=os.path.join(cfg.cache_dir, "selector-stats.json"),
+        per_group=getattr(cfg.browser, "per_group_selectors", False),
+    )
+    run.scheduler = _build_scheduler(run)
+    _start_metrics(run)
+
+
+def _sheets_pending(run: _Run) -> Optional[int]:
+    pending = getattr(getattr(run.sheets, "writer", None), "pending", None)
+    return pending if isinstance(pending, int) else None
+
+
+def _start_metrics(run: _Run) -> None:
+    """Start the metrics endpoint and event stream if ``metrics`` is configured."""
+    settings = getattr(run.cfg, "metrics", None)
+    if settings is None or not (settings.port or settings.events_path):
+        return
+    logger = logging.getLogger(__name__)
     try:
-        total = len(group_links)
-        click.echo("")
-        with tqdm(total=total, desc="Posting to groups", unit="group", ncols=80) as pbar:
-            for idx, url in enumerate(group_links, start=1):
-                iter_start = time.time()
-                ok = post_to_group(driver, wait, sheets, url, cfg.poster.text, cfg.poster.image_paths, run_id)
-                elapsed = time.time() - iter_start
-                symbol = "✅" if ok else "❌"
-                if ok:
-                    success += 1
-                else:
-                    errors += 1
-                pbar.set_postfix({"last": f"{elapsed:.1f}s", "ok": success, "err": errors})
-                pbar.update(1)
-                click.echo(f"  {symbol} [{idx}/{total}] {elapsed:.1f}s  {url}")
+        run.metrics = RunMetrics(
+            run.run_id,
+            run.profiler,
+            events_path=settings.events_path,
+            gauges={
+                "posts_planned": lambda: run.posts,
+                "active_browsers": lambda: sum(1 for d in run.drivers if d is not None),
+                "sheets_pending_rows": lambda: _sheets_pending(run),
+            },
+        )
+    except OSError as e:
+        logger.warning("Could not open the metrics event file %s: %s", settings.events_path, e)
+        run.metrics = RunMetrics(run.run_id, run.profiler)
+    if settings.port:
+        try:
+            run.metrics_server = MetricsServer(run.metrics, settings.host, settings.port)
+            run.metrics_server.start()
+            logger.info("Serving run metrics at %s", run.metrics_server.address)
+        except OSError as e:
+            logger.warning("Could not serve metrics on %s:%s: %s", settings.host, settings.port, e)
+            run.metrics_server = None
+    run.metrics.event("started", posts=run.posts, groups=len(run.visits), browsers=len(run.drivers), resumed=run.resumed)
+
+
+def _stop_metrics(run: _Run) -> None:
+    if run.metrics_server is not None:
+        run.metrics_server.stop()
+        run.metrics_server = None
+    if run.metrics is not None:
+        run.metrics.close()
+
+
+def _build_scheduler(run: _Run) -> Scheduler:
+    pacing = getattr(run.cfg, "pacing", None) or PacingConfig()
+    cooldown = pacing.group_cooldown_hours * 3600.0
+    return Scheduler(
+        posts_per_hour=pacing.posts_per_hour,
+        burst=pacing.burst,
+        cooldown=cooldown,
+        last_posted=RunJournal.last_posted(run.cfg.cache_dir) if cooldown > 0 else None,
+        workers=len(run.drivers) or 1,
+        error_window=pacing.error_window,
+        error_threshold=pacing.error_threshold,
+    )
+
+
+def _post_visit(
+    run: _Run, driver, idx: int, visit: GroupVisit, attempt: int = 1
+) -> List[Tuple[Campaign, PostResult]]:
+    """Open the group once and make every campaign's post in it.
+
+    Returns the result of each post made; campaigns skipped because the run was
+    stopped are missing from it.
+    """
+    results: List[Tuple[Campaign, PostResult]] = []
+    navigate = True
+    dead: Optional[PostResult] = None
+    labelled = len(run.cfg.poster.all_campaigns()) > 1
+    for offset, campaign in enumerate(visit.campaigns):
+        if run.stopped:
+            break
+        iter_start = time.time()
+        if dead is not None:
+            # The group itself is unusable; the other campaigns would fail the same way
+            result = replace(dead, seconds=0.0)
+        else:
+            with span("post.pacing"):
+                # The group cooldown gates the visit, not each campaign's post in it; a
+                # retry already waited it out on its first attempt
+                run.scheduler.acquire(visit.url, cooldown=offset == 0 and attempt == 1)
+            iter_start = time.time()
+            result = post_to_group(
+                driver,
+                run.sheets,
+                visit.url,
+                campaign.text,
+                [run.images.get(p, p) for p in campaign.image_paths],
+                run.run_id,
+                timeouts=run.timeouts,
+                selectors=run.selectors,
+                navigate=navigate,
+                lightweight=run.cfg.browser.lightweight,
+            )
+            if result.code in GROUP_STATES:
+                dead = result
+            elif result.code not in ACCOUNT_STATES:
+                # Dead groups and logouts say nothing about throttling
+                run.scheduler.report(visit.url, result.ok)
+        ok = result.ok
+        # After a failure the page may be left with a half-open composer; start clean
+        navigate = not ok
+        note = "" if ok else result.code
+        if attempt > 1:
+            note = f"{note}, attempt {attempt}" if note else f"attempt {attempt}"
+        run.journal.record(visit.url, ok, notes=note, campaign=campaign.name or None, code=result.code)
+        label = f"{visit.url} [{campaign.name}]" if labelled else visit.url
+        elapsed = time.time() - iter_start
+        if not ok and is_transient(result.code) and run.retries.push((idx + offset, GroupVisit(visit.url, [campaign])), attempt):
+            run.progress.defer(idx + offset, label, elapsed, f"{note}; retrying in {run.retries.delay(attempt):.0f}s")
+            if run.metrics:
+                run.metrics.retry(visit.url, elapsed, result.code, run.retries.delay(attempt), campaign.name, attempt)
+        else:
+            run.progress.record(idx + offset, label, ok, elapsed, note=note)
+            if run.metrics:
+                run.metrics.post(visit.url, ok, elapsed, "" if ok else result.code, campaign.name, attempt)
+        results.append((campaign, result))
+        if result.code in ACCOUNT_STATES and not run.stopped:
+            run.stopped = result.code
+            logging.getLogger(__name__).error(
+                "Facebook shows a %s page; stopping the run (continue with: fbpost run --resume %s)",
+                result.code,
+                run.run_id,
+            )
+    return results
+
+
+def _new_watchdog(run: _Run) -> BrowserWatchdog:
+    browser = run.cfg.browser
+    return BrowserWatchdog(
+        max_posts=browser.recycle_after_posts,
+        max_rss_mb=browser.recycle_rss_mb,
+        latency_factor=browser.recycle_latency_factor,
+    )
+
+
+def _recycle_if_needed(run: _Run, driver, watchdog: BrowserWatchdog, results: list):
+    """Feed a visit's posts to ``watchdog``; returns the driver to carry on with.
+
+    Latency is each post's time in ``post_to_group``, so pacing and cooldown waits
+    never look like a slow browser.
+
+    That is ``driver`` itself, or a freshly launched browser on the same profile once
+    the watchdog asks for a recycle, or None if the relaunch failed.
+    """
+    if not watchdog.enabled or not results:
+        return driver
+    for _, result in results:
+        watchdog.record(result.seconds or None)
+    slot = next((i for i, d in enumerate(run.drivers) if d is driver), None)
+    profile = run.profiles[slot] if slot is not None and slot < len(run.profiles) else None
+    if profile is None or run.stopped:
+        # Attached to `fbpost browser start`: that session is not ours to restart
+        return driver
+    rss = browser_rss(driver) if watchdog.max_rss_mb else None
+    reason = watchdog.check(rss)
+    if reason is None:
+        return driver
+    logger = logging.getLogger(__name__)
+    logger.info(
+        "Recycling browser %d after %d post(s) (%s%s)",
+        slot + 1,
+        watchdog.posts,
+        reason,
+        f", {rss / 1024 / 1024:.0f} MB" if rss else "",
+    )
+    with span("browser.recycle"):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug("Browser did not shut down cleanly: %s", e)
+        try:
+            fresh = build_edge(profile, cache_dir=run.cfg.cache_dir)
+        except Exception as e:
+            logger.exception("Could not relaunch browser %d; its worker stops: %s", slot + 1, e)
+            run.drivers[slot] = None
+            return None
+    run.drivers[slot] = fresh
+    if run.metrics:
+        run.metrics.event("browser_recycled", browser=slot + 1, reason=reason, posts=watchdog.posts, rss=rss)
+    watchdog.reset()
+    return fresh
+
+
+def _next_work(run: _Run, work: "queue.Queue") -> Optional[tuple]:
+    """Next ``(idx, visit, attempt)``: regular groups first, then due retries; None when done.
+
+    May block while deferred retries back off. The caller must call
+    ``run.retries.done()`` after working on the returned item.
+    """
+    if run.stopped:
+        return None
+    try:
+        idx, visit = work.get_nowait()
+        run.retries.begin()
+        return idx, visit, 1
+    except queue.Empty:
+        pass
+    retry = run.retries.get(stop=lambda: bool(run.stopped))
+    if retry is None:
+        return None
+    (idx, visit), attempt = retry
+    run.retries.begin()
+    return idx, visit, attempt
+
+
+def _post_worker(run: _Run, driver, work: "queue.Queue") -> None:
+    """Drain the shared work queue, then the deferred retries, with one browser."""
+    watchdog = _new_watchdog(run)
+    while True:
+        item = _next_work(run, work)
+        if item is None:
+            return
+        try:
+            results = _post_visit(run, driver, *item)
+        finally:
+            run.retries.done()
+        fresh = _recycle_if_needed(run, driver, watchdog, results)
+        if fresh is None:
+            return
+        driver = fresh
+
+
+def _post_all(run: _Run, work: "queue.Queue") -> None:
+    total = run.posts
+    click.echo("")
+    with tqdm(total=total, desc="Posting to groups", unit="post", ncols=80) as pbar:
+        run.progress = _Progress(pbar=pbar, total=total)
+        if len(run.drivers) == 1:
+            _post_worker(run, run.drivers[0], work)
+        else:
+            with ThreadPoolExecutor(max_workers=len(run.drivers), thread_name_prefix="fbpost-worker") as pool:
+                futures = [pool.submit(_post_worker, run, driver, work) for driver in run.drivers]
+                for future in futures:
+                    future.result()
+
+
+def _finish(run: _Run) -> None:
+    """Shut browsers down, persist run state and log the summary row."""
+    logger = logging.getLogger(__name__)
+    logger.info("Shutting down browser…")
+    _release_browsers(run)
+    run.journal.close()
+    if run.timeouts:
+        run.timeouts.save()
+    if run.selectors:
+        run.selectors.save()
+    _export_profile(run.profiler, run.cfg)
+    success = run.progress.success if run.progress else 0
+    errors = run.errors
+    duration = str(datetime.now() - run.start_time).split('.')[0]
+    status = "Finished" if errors == 0 else f"Finished, Error ({errors} errors)"
+    if run.stopped:
+        status = f"Stopped ({run.stopped})"
+    first_post = ""
+    if run.progress and run.progress.first_result_at is not None:
+        first_post = f"; Time to first post: {run.progress.first_result_at - run.launch_started:.1f}s"
+    logger.info("Run complete in %s. Success: %d, Errors: %d%s", duration, success, errors, first_post)
+    log_app(
+        run.sheets,
+        event="Finished",
+        details=f"Completed. Success: {success}, Errors: {errors}",
+        status=status,
+        notes=f"Total: {run.posts}; Duration: {duration}{first_post}",
+        run_id=run.run_id,
+    )
+    if run.metrics:
+        run.metrics.event("finished", success=success, errors=errors, status=status, duration=duration)
+    try:
+        _drain_tracker(run.sheets)
+        _restamp_groups_cache(run)
     finally:
-        logger.info("Shutting down browser…")
-        driver.quit()
-        duration = str(datetime.now() - start_time).split('.')[0]
-        status = "Finished" if errors == 0 else f"Finished, Error ({errors} errors)"
-        logger.info("Run complete in %s. Success: %d, Errors: %d", duration, success, errors)
-        log_app(
-            sheets,
-            event="Finished",
-            details=f"Completed. Success: {success}, Errors: {errors}",
-            status=status,
-            notes=f"Total: {len(group_links)}; Duration: {duration}",
-            run_id=run_id,
+        _stop_metrics(run)
+
+
+def _drain_tracker(sheets) -> None:
+    """Drain queued tracker rows; a Sheets hiccup here must not mask the run result."""
+    if sheets is None:
+        return
+    try:
+        sheets.close()
+    except Exception as e:
+        logging.getLogger(__name__).exception("Failed to write tracker rows: %s", e)
+
+
+def _restamp_groups_cache(run: _Run) -> None:
+    """Keep the groups cache valid past this run's own tracker writes."""
+    cache, sheets = run.groups_cache, run.sheets
+    if cache is None or cache.verified is None or sheets is None or sheets.spreadsheet is None:
+        return
+    try:
+        cache.restamp(sheets.spreadsheet.get_lastUpdateTime())
+    except Exception as e:
+        logging.getLogger(__name__).debug("Could not re-stamp the groups cache: %s", e)
+
+
+def _export_profile(profiler: Profiler, cfg: AppConfig) -> None:
+    try:
+        path = profiler.export(os.path.join(cfg.cache_dir, "profiles"))
+        logging.getLogger(__name__).info(
+            "Step timings saved to %s (view with: fbpost profile %s)", path, profiler.run_id
         )
+    except OSError as e:
+        logging.getLogger(__name__).warning("Could not export step timings: %s", e)
+
+
+def run_posting(
+    cfg: AppConfig,
+    assume_yes: bool = False,
+    refresh_groups: bool = False,
+    offline: bool = False,
+    resume_run_id: Optional[str] = None,
+) -> bool:
+    _quiet_noisy_loggers()
+    run = _new_run(cfg, resume_run_id)
+    if run is None:
+        return False
+    # Offline the groups come from the local cache; Google is only needed once there is
+    # something to post and the tracker has to be written
+    if not offline and not _init_sheets_stage(run):
+        return False
+    if not _fetch_groups_stage(run, refresh_groups, offline):
+        return False
+    verdict = _confirm_groups(run, assume_yes)
+    if verdict is not None:
+        return verdict
+    if offline and not _init_sheets_stage(run):
+        return False
+
+    _prepare_images_stage(run)
+    run.launch_started = time.monotonic()
+    _log_started(run)
+    if not _launch_stage(run, _worker_count(run)):
+        return False
+
+    work = _prepare_posting(run)
+    try:
+        _post_all(run, work)
+    finally:
+        _finish(run)
+
+    return run.errors == 0 and not run.stopped
 
-    return errors == 0
+
+def run_browser_session(cfg: AppConfig) -> bool:
+    """Keep one Edge session open (until Ctrl+C) for ``fbpost run`` to attach to."""
+    logger = logging.getLogger(__name__)
+    existing = live_session_address(cfg.cache_dir)
+    if existing:
+        click.echo(f"A browser session is already running at {existing}.", err=True)
+        return False
+    address = f"127.0.0.1:{cfg.browser.debug_port}"
+    sp = Spinner(f"Launching Edge (headless={getattr(cfg.browser, 'headless', False)}, debugger {address})")
+    sp.start()
+    launch_started = time.monotonic()
+    try:
+        driver = build_edge(cfg.browser, cache_dir=cfg.cache_dir, debug_port=cfg.browser.debug_port)
+        sp.succeed(f"  —  {time.monotonic() - launch_started:.1f}s")
+    except Exception as e:
+        sp.fail("failed to launch browser")
+        logger.exception("Failed to launch browser: %s", e)
+        return False
+    write_session(cfg.cache_dir, address)
+    click.echo("Browser session ready; `fbpost run` will attach to it. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(30)
+            # Cheap liveness probe; raises once the browser has been closed or crashed
+            driver.current_url
+    except KeyboardInterrupt:
+        click.echo("Stopping browser session…")
+    except Exception as e:
+        logger.warning("Browser session ended: %s", e)
+    finally:
+        clear_session(cfg.cache_dir)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug("Browser did not shut down cleanly: %s", e)
+    return True
 
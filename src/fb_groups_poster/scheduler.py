@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+
+class Clock:
+    """Wall/monotonic time and sleeping, swappable for a fake clock in tests."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``.
+
+    ``reserve`` always takes a token, letting the balance go negative, and returns how
+    long the caller has to wait before using it. Callers queue up fairly that way
+    without polling.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1, clock: Optional[Clock] = None):
+        self.clock = clock or Clock()
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = self.clock.monotonic()
+
+    def _refill(self) -> None:
+        now = self.clock.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        self._refill()
+        self.rate = rate
+
+    def reserve(self) -> float:
+        self._refill()
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+@dataclass
+class Slot:
+    """One planned group visit: ``at`` seconds after the start of posting."""
+
+    url: str
+    at: float
+    posts: int = 1
+
+
+class Scheduler:
+    """Paces posts against a global hourly budget and per-group cooldowns.
+
+    ``plan`` orders the groups into a time-ordered schedule for ``workers`` browsers;
+    at run time every post calls ``acquire`` (which sleeps until both the global
+    token bucket and the group's cooldown allow it) and then ``report``.
+
+    When the error rate over the last ``error_window`` posts exceeds
+    ``error_threshold`` -- the usual sign of Facebook throttling -- the rate is
+    halved (down to ``min_factor`` of the starting rate). Each following clean window
+    raises it by half again until it is back at the budget, so the run settles at the
+    highest rate that does not trip throttling. Without a budget the run is unpaced
+    until the first error spike, which is then measured against the observed rate.
+    """
+
+    def __init__(
+        self,
+        posts_per_hour: float = 0.0,
+        burst: int = 1,
+        cooldown: float = 0.0,
+        last_posted: Optional[Dict[str, float]] = None,
+        workers: int = 1,
+        clock: Optional[Clock] = None,
+        error_window: int = 10,
+        error_threshold: float = 0.5,
+        min_factor: float = 0.125,
+    ):
+        self.clock = clock or Clock()
+        self.limit = posts_per_hour / 3600.0 if posts_per_hour > 0 else None
+        self.rate = self.limit
+        self.cooldown = cooldown
+        self.last_posted = dict(last_posted or {})
+        self.workers = max(1, workers)
+        self.burst = max(1, burst)
+        self.error_window = max(1, error_window)
+        self.error_threshold = error_threshold
+        self.min_factor = min_factor
+        self._peak = self.limit
+        self._bucket = TokenBucket(self.rate, self.burst, self.clock) if self.rate else None
+        self._outcomes: Deque[Tuple[float, bool]] = deque(maxlen=self.error_window)
+        self._lock = threading.Lock()
+
+    @property
+    def posts_per_hour(self) -> Optional[float]:
+        return self.rate * 3600.0 if self.rate else None
+
+    def cooldown_left(self, url: str) -> float:
+        last = self.last_posted.get(url)
+        if last is None or self.cooldown <= 0:
+            return 0.0
+        return max(0.0, last + self.cooldown - self.clock.time())
+
+    def plan(self, visits: Sequence[Tuple[str, int]], post_seconds: float = 30.0) -> List[Slot]:
+        """Time-ordered schedule for ``(url, posts)`` visits, assuming ``post_seconds`` per post."""
+        interval = 1.0 / self.rate if self.rate else 0.0
+        ready = sorted(
+            ((self.cooldown_left(url), pos, url, posts) for pos, (url, posts) in enumerate(visits)),
+        )
+        free_at = [0.0] * self.workers
+        issued = 0
+        slots: List[Slot] = []
+        for cooldown, _, url, posts in ready:
+            worker_free = heapq.heappop(free_at)
+            token_at = max(0, issued - self.burst + 1) * interval
+            at = max(worker_free, cooldown, token_at)
+            finish = at
+            for n in range(posts):
+                finish = max(finish, max(0, issued + n - self.burst + 1) * interval) + post_seconds
+            issued += posts
+            heapq.heappush(free_at, finish)
+            slots.append(Slot(url=url, at=at, posts=posts))
+        slots.sort(key=lambda slot: slot.at)
+        return slots
+
+    def acquire(self, url: str, cooldown: bool = True) -> float:
+        """Block until a post to ``url`` is allowed; return the seconds waited.
+
+        Pass ``cooldown=False`` for the later posts of a visit that already waited out
+        the group's cooldown (and for retries within the run): they only take a slot
+        of the hourly budget.
+        """
+        with self._lock:
+            wait = self._bucket.reserve() if self._bucket else 0.0
+            if cooldown:
+                wait = max(wait, self.cooldown_left(url))
+        if wait > 0:
+            logging.getLogger(__name__).debug("Pacing: waiting %.1fs before posting to %s", wait, url)
+            self.clock.sleep(wait)
+        return wait
+
+    def report(self, url: str, ok: bool) -> None:
+        now = self.clock.monotonic()
+        with self._lock:
+            if ok:
+                self.last_posted[url] = self.clock.time()
+            self._outcomes.append((now, ok))
+            if len(self._outcomes) < self.error_window:
+                return
+            errors = sum(1 for _, good in self._outcomes if not good)
+            if errors / len(self._outcomes) > self.error_threshold:
+                self._slow_down(now)
+            elif errors == 0 and self.rate is not None and self._peak and self.rate < self._peak:
+                self._set_rate(min(self._peak, self.rate * 1.5))
+                if self.limit is None and self.rate >= self._peak:
+                    # Back to the unpaced rate that was running before the spike
+                    self._set_rate(None)
+            else:
+                return
+            self._outcomes.clear()
+
+    def _slow_down(self, now: float) -> None:
+        current = self.rate
+        if current is None:
+            span = now - self._outcomes[0][0]
+            current = len(self._outcomes) / span if span > 0 else 1.0
+            self._peak = current
+        new_rate = max(current / 2, self._peak * self.min_factor)
+        logging.getLogger(__name__).warning(
+            "Error rate above %.0f%%; slowing down to %.1f posts/hour", self.error_threshold * 100, new_rate * 3600
+        )
+        self._set_rate(new_rate)
+
+    def _set_rate(self, rate: Optional[float]) -> None:
+        self.rate = rate
+        if rate is None:
+            self._bucket = None
+        elif self._bucket is None:
+            self._bucket = TokenBucket(rate, 1, self.clock)
+        else:
+            self._bucket.set_rate(rate)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+
+class SelectorCache:
+    """Remembers which selector candidates win for each step and tries those first.
+
+    Every lookup records a hit for the winning candidate and a miss for the ones
+    checked before it. Scores are an exponential moving average of hits (``alpha``
+    weights the newest observation) and drift back to neutral with ``half_life``
+    seconds of inactivity, so a Facebook UI change is relearned within a few posts.
+    Candidates are ordered by score, then by average latency; unseen candidates keep
+    their original position relative to each other.
+
+    With ``per_group`` the same statistics are also kept per group URL and preferred
+    once a group has its own history, for groups served a different UI variant.
+    """
+
+    PRIOR = 0.5
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        alpha: float = 0.3,
+        half_life: float = 7 * 24 * 3600,
+        per_group: bool = False,
+    ):
+        self.path = path
+        self.alpha = alpha
+        self.half_life = half_life
+        self.per_group = per_group
+        self._stats: Dict[str, Dict[str, dict]] = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def _keys(self, step: str, group: Optional[str]) -> List[str]:
+        if self.per_group and group:
+            return [f"{step}@{group}", step]
+        return [step]
+
+    def _score(self, entry: dict, now: float) -> float:
+        age = max(0.0, now - entry.get("ts", now))
+        weight = 0.5 ** (age / self.half_life) if self.half_life > 0 else 1.0
+        return self.PRIOR + (entry["score"] - self.PRIOR) * weight
+
+    def order(self, step: str, candidates: Sequence[str], group: Optional[str] = None) -> List[str]:
+        now = time.time()
+        with self._lock:
+            stats: Dict[str, dict] = {}
+            for key in self._keys(step, group):
+                if self._stats.get(key):
+                    stats = self._stats[key]
+                    break
+            ranked = []
+            for pos, candidate in enumerate(candidates):
+                entry = stats.get(candidate)
+                score = self._score(entry, now) if entry else self.PRIOR
+                latency = entry["latency"] if entry else float("inf")
+                ranked.append((-score, latency, pos, candidate))
+        ranked.sort()
+        return [candidate for _, _, _, candidate in ranked]
+
+    def record(
+        self,
+        step: str,
+        tried: Sequence[str],
+        hit: Optional[int],
+        latency: float = 0.0,
+        group: Optional[str] = None,
+    ) -> None:
+        """Record the outcome of one lookup over ``tried`` (in the order they were checked).
+
+        ``hit`` is the index of the winning candidate, or ``None`` if nothing matched.
+        """
+        now = time.time()
+        checked = tried if hit is None else tried[: hit + 1]
+        with self._lock:
+            for key in self._keys(step, group):
+                stats = self._stats.setdefault(key, {})
+                for idx, candidate in enumerate(checked):
+                    won = idx == hit
+                    entry = stats.get(candidate)
+                    if entry is None:
+                        # A candidate that only ever missed sorts after winners of equal score
+                        entry = stats[candidate] = {"score": self.PRIOR, "latency": latency, "n": 0, "ts": now}
+                    entry["score"] = self._score(entry, now) * (1 - self.alpha) + (1.0 if won else 0.0) * self.alpha
+                    if won:
+                        entry["latency"] = entry["latency"] * (1 - self.alpha) + latency * self.alpha
+                    entry["n"] += 1
+                    entry["ts"] = now
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(raw, dict):
+            with self._lock:
+                self._stats = raw
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._stats)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.getLogger(__name__).warning("Could not save selector stats to %s: %s", self.path, e)
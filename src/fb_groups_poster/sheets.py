@@ -1,28 +1,168 @@
 from __future__ import annotations
 
-from typing import List, Tuple
-from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
+import atexit
+import logging
+import queue
+import threading
+import time
 
 import gspread
+from gspread.utils import rowcol_to_a1
 from google.oauth2.service_account import Credentials
 
+from .cache import GroupsCache
 from .config import SheetsConfig
+from .profiling import span
+from .tag_index import TagIndex
 
 
+GROUP_LINK_COLUMN = "Group Link"
+TAGS_COLUMN = "Tags"
+# Rows per batch_get when reading the Groups sheet
+GROUPS_CHUNK_ROWS = 2000
+
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
 ]
 
 
+_STOP = object()
+
+
+class TrackerWriter:
+    """Buffers tracker rows and writes each batch with a single ``append_rows`` call.
+
+    A batch is flushed once ``batch_size`` rows are queued or ``flush_interval``
+    seconds have passed since the last write, whichever comes first. Call ``flush``
+    at the end of a run to write whatever is left.
+
+    A failed write keeps its rows and holds off further automatic writes for
+    ``flush_interval`` seconds, doubling with each consecutive failure (up to 16x),
+    so a quota error is not retried on every new row. ``flush`` always tries.
+
+    After ``start()`` the writes happen on a background thread: ``add`` only puts the
+    row on a bounded queue (blocking when it is full, so a stalled Sheets API slows
+    producers down instead of growing memory) and ``close()`` drains it.
+    """
+
+    def __init__(self, worksheet, batch_size: int = 20, flush_interval: float = 30.0, queue_size: int = 1000):
+        self.worksheet = worksheet
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._rows: List[List[str]] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows) + self._queue.qsize()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="tracker-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stop the background thread after it has written every queued row."""
+        thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            if thread.is_alive():
+                logging.getLogger(__name__).warning("Tracker writer still busy after %.0fs", timeout or 0)
+                return
+            self._thread = None
+        # Rows kept back by a failed background write get one last synchronous attempt
+        self.flush()
+
+    def add(self, row: List[str]) -> None:
+        if self._thread is not None:
+            self._queue.put(row)
+            return
+        with self._lock:
+            self._rows.append(row)
+            if self._due_locked():
+                self._flush_locked()
+
+    def flush(self) -> None:
+        if self._thread is not None:
+            # Let the background thread move everything queued into the buffer first
+            self._queue.join()
+        with self._lock:
+            self._flush_locked()
+
+    def _run(self) -> None:
+        while True:
+            wake = max(self._last_flush + self.flush_interval, self._retry_at)
+            timeout = max(0.0, wake - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            try:
+                with self._lock:
+                    if item is not None and item is not _STOP:
+                        self._rows.append(item)
+                    if item is _STOP or self._due_locked():
+                        self._flush_locked()
+            except Exception as e:
+                logging.getLogger(__name__).warning("Tracker write failed, will retry: %s", e)
+            finally:
+                if item is not None:
+                    self._queue.task_done()
+            if item is _STOP:
+                return
+
+    def _due_locked(self) -> bool:
+        now = time.monotonic()
+        if now < self._retry_at:
+            # Backing off after a failed write; a full batch does not override that
+            return False
+        return len(self._rows) >= self.batch_size or now - self._last_flush >= self.flush_interval
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        try:
+            self.worksheet.append_rows(rows)
+        except Exception:
+            # Keep the rows so a later flush can retry them
+            self._rows = rows + self._rows
+            self._failures += 1
+            delay = max(1.0, self.flush_interval) * 2 ** min(self._failures - 1, 4)
+            self._retry_at = self._last_flush + delay
+            raise
+        self._failures = 0
+        self._retry_at = 0.0
+        logging.getLogger(__name__).debug("Wrote %d tracker row(s)", len(rows))
+
+
 @dataclass
 class SheetsClient:
     tracker_ws: any
     groups_ws: any
+    spreadsheet: any = None
+    batch_size: int = 20
+    flush_interval: float = 30.0
+    queue_size: int = 1000
+    writer: TrackerWriter = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.writer = TrackerWriter(self.tracker_ws, self.batch_size, self.flush_interval, self.queue_size)
 
     def log_row(self, content: str, post_type: str, details: str, status: str, notes: str, run_id: str) -> None:
-        self.tracker_ws.append_row([
+        self.writer.add([
             content,
             post_type,
             details,
@@ -32,27 +172,146 @@ class SheetsClient:
             run_id,
         ])
 
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self, timeout: float | None = None) -> None:
+        self.writer.close(timeout)
+
+
+def _flush_at_exit(client: SheetsClient) -> None:
+    try:
+        client.close(timeout=30)
+    except Exception as e:
+        logging.getLogger(__name__).error("Failed to write %d buffered tracker row(s): %s", client.writer.pending, e)
+
 
 def init_sheets(cfg: SheetsConfig) -> SheetsClient:
-    creds = Credentials.from_service_account_file(cfg.service_account_file, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    ss = client.open_by_key(cfg.spreadsheet_id)
-    tracker = ss.worksheet(cfg.tracker_sheet)
-    groups = ss.worksheet(cfg.groups_sheet)
-    return SheetsClient(tracker_ws=tracker, groups_ws=groups)
-
-
-def get_filtered_group_links(client: SheetsClient, filter_tags: List[str]) -> List[str]:
-    data = client.groups_ws.get_all_records()
-    wanted = set(t.strip() for t in filter_tags)
-    out: List[str] = []
-    for row in data:
-        tags = row.get("Tags", "")
-        link = row.get("Group Link", "").strip()
-        if not link:
-            continue
-        row_tags = set(t.strip() for t in tags.split(",") if t.strip())
-        if wanted.issubset(row_tags):
-            out.append(link)
-    return out
+    with span("sheets.init"):
+        creds = Credentials.from_service_account_file(cfg.service_account_file, scopes=SCOPES)
+        client = gspread.authorize(creds)
+        ss = client.open_by_key(cfg.spreadsheet_id)
+        tracker = ss.worksheet(cfg.tracker_sheet)
+        groups = ss.worksheet(cfg.groups_sheet)
+    sheets = SheetsClient(
+        tracker_ws=tracker,
+        groups_ws=groups,
+        spreadsheet=ss,
+        batch_size=cfg.log_batch_size,
+        flush_interval=cfg.log_flush_interval,
+        queue_size=cfg.log_queue_size,
+    )
+    if cfg.background_logging:
+        sheets.writer.start()
+    # Last line of defence: rows still buffered when the process dies are written on exit
+    atexit.register(_flush_at_exit, sheets)
+    return sheets
+
+
+def _column_values(value_range, rows: int) -> List[str]:
+    """First cell of each row of a one-column range, padded to ``rows``.
+
+    The API leaves out trailing empty cells and rows, so short results are blanks.
+    """
+    values = [str(row[0]) if row else "" for row in value_range or []]
+    return values + [""] * (rows - len(values))
+
+
+def iter_group_rows(worksheet, chunk_rows: int = GROUPS_CHUNK_ROWS) -> Iterator[Tuple[str, str]]:
+    """Yield ``(group link, tags)`` for every row of the Groups sheet that has a link.
+
+    Reads the header row once, then only the ``Group Link`` and ``Tags`` columns,
+    ``chunk_rows`` rows per ``batch_get`` call up to the sheet's ``row_count``, so
+    other columns are never downloaded and no more than one chunk is held at a time.
+    """
+    header = [str(cell).strip() for cell in worksheet.row_values(1)]
+    if GROUP_LINK_COLUMN not in header:
+        logging.getLogger(__name__).warning("Groups sheet has no '%s' column", GROUP_LINK_COLUMN)
+        return
+    columns = [header.index(GROUP_LINK_COLUMN) + 1]
+    if TAGS_COLUMN in header:
+        columns.append(header.index(TAGS_COLUMN) + 1)
+    last_row = worksheet.row_count
+    start = 2
+    while start <= last_row:
+        end = start + chunk_rows - 1
+        ranges = [f"{rowcol_to_a1(start, col)}:{rowcol_to_a1(end, col)}" for col in columns]
+        with span("groups.fetch_chunk"):
+            fetched = worksheet.batch_get(ranges)
+        # Blank chunks do not end the sheet (groups may follow a gap); row_count does
+        links = _column_values(fetched[0], chunk_rows)
+        tags = _column_values(fetched[1], chunk_rows) if len(columns) > 1 else [""] * chunk_rows
+        for link, row_tags in zip(links, tags):
+            link = link.strip()
+            if link:
+                yield link, row_tags
+        start = end + 1
+
+
+def _fetch_group_rows(client: SheetsClient) -> List[Tuple[str, str]]:
+    return list(iter_group_rows(client.groups_ws))
+
+
+def load_group_rows(
+    client: SheetsClient,
+    cache: Optional[GroupsCache] = None,
+    refresh: bool = False,
+    offline: bool = False,
+) -> List[Tuple[str, str]]:
+    """Return ``(group link, tags)`` pairs, served from ``cache`` while the sheet is unchanged.
+
+    ``refresh`` forces a download; ``offline`` never contacts Google and fails if
+    nothing is cached yet.
+    """
+    logger = logging.getLogger(__name__)
+    entry = cache.load() if cache else None
+    if offline:
+        if entry is None:
+            raise RuntimeError("Offline mode needs a cached Groups sheet; run once without --offline first")
+        logger.debug("Using cached groups from %s (offline)", cache.path)
+        return [(link, tags) for link, tags in entry["rows"]]
+    modified = None
+    if cache and client.spreadsheet is not None:
+        try:
+            modified = client.spreadsheet.get_lastUpdateTime()
+        except Exception as e:
+            logger.debug("Could not read spreadsheet modification time: %s", e)
+    if entry is not None and not refresh and cache.is_fresh(entry, modified):
+        logger.debug("Using cached groups from %s", cache.path)
+        cache.verified = modified
+        return [(link, tags) for link, tags in entry["rows"]]
+    with span("groups.download"):
+        rows = _fetch_group_rows(client)
+    if cache:
+        try:
+            cache.save(modified, rows)
+            cache.verified = modified
+        except OSError as e:
+            logger.warning("Could not write groups cache %s: %s", cache.path, e)
+    return rows
+
+
+def load_group_index(
+    client: SheetsClient,
+    cache: Optional[GroupsCache] = None,
+    refresh: bool = False,
+    offline: bool = False,
+) -> TagIndex:
+    """Load the Groups sheet into a ``TagIndex`` that can answer many tag filters."""
+    with span("groups.load"):
+        rows = load_group_rows(client, cache, refresh=refresh, offline=offline)
+    with span("groups.index"):
+        return TagIndex(rows)
+
 
+def get_filtered_group_links(
+    client: SheetsClient,
+    filter_tags: List[str],
+    cache: Optional[GroupsCache] = None,
+    refresh: bool = False,
+    offline: bool = False,
+    query: Optional[str] = None,
+) -> List[str]:
+    index = load_group_index(client, cache, refresh=refresh, offline=offline)
+    with span("groups.select"):
+        return index.select(filter_tags, query)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+
+class TagQueryError(ValueError):
+    """Raised for a malformed tag expression."""
+
+
+# Parsed expression nodes: a tag name, or a tuple ("and" | "or", [nodes]) / ("not", node)
+Node = Union[str, Tuple[str, object]]
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_KEYWORDS = {"AND", "OR", "NOT"}
+
+
+def _tokenize(text: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise TagQueryError(f"Unexpected character at position {pos} in {text!r}")
+        pos = m.end()
+        lparen, rparen, quoted, word = m.groups()
+        if lparen:
+            tokens.append(("(", lparen))
+        elif rparen:
+            tokens.append((")", rparen))
+        elif quoted is not None:
+            tokens.append(("tag", quoted.strip()))
+        elif word.upper() in _KEYWORDS:
+            tokens.append((word.upper(), word))
+        else:
+            tokens.append(("tag", word))
+    return tokens
+
+
+def parse_tag_query(text: str) -> Node:
+    """Parse an expression such as ``rent AND (studio OR loft) AND NOT shared``.
+
+    ``NOT`` binds tightest, then ``AND``, then ``OR``. Keywords are case-insensitive;
+    quote tags that contain spaces or clash with a keyword (``"pet friendly"``).
+    """
+    tokens = _tokenize(text)
+    pos = 0
+
+    def peek() -> Optional[str]:
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def take(kind: str) -> str:
+        nonlocal pos
+        if peek() != kind:
+            found = tokens[pos][1] if pos < len(tokens) else "end of expression"
+            raise TagQueryError(f"Expected {kind!r} but found {found!r} in {text!r}")
+        value = tokens[pos][1]
+        pos += 1
+        return value
+
+    def parse_or() -> Node:
+        parts = [parse_and()]
+        while peek() == "OR":
+            take("OR")
+            parts.append(parse_and())
+        return parts[0] if len(parts) == 1 else ("or", parts)
+
+    def parse_and() -> Node:
+        parts = [parse_not()]
+        while peek() == "AND":
+            take("AND")
+            parts.append(parse_not())
+        return parts[0] if len(parts) == 1 else ("and", parts)
+
+    def parse_not() -> Node:
+        if peek() == "NOT":
+            take("NOT")
+            return ("not", parse_not())
+        if peek() == "(":
+            take("(")
+            node = parse_or()
+            take(")")
+            return node
+        return take("tag")
+
+    node = parse_or()
+    if pos != len(tokens):
+        raise TagQueryError(f"Unexpected {tokens[pos][1]!r} in {text!r}")
+    return node
+
+
+def split_tags(tags: str) -> List[str]:
+    return [t.strip() for t in tags.split(",") if t.strip()]
+
+
+class TagIndex:
+    """Inverted index over the Groups sheet: tag -> ascending row ids carrying that tag.
+
+    Build it once per process and query it for every campaign; results keep the
+    sheet's row order.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str]]):
+        self.links: List[str] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._sets: Dict[str, FrozenSet[int]] = {}
+        for row_id, (link, tags) in enumerate(rows):
+            self.links.append(link)
+            for tag in set(split_tags(tags)):
+                self._postings.setdefault(tag, []).append(row_id)
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted(self._postings)
+
+    def postings(self, tag: str) -> List[int]:
+        return self._postings.get(tag.strip(), [])
+
+    def _set(self, tag: str) -> FrozenSet[int]:
+        tag = tag.strip()
+        cached = self._sets.get(tag)
+        if cached is None:
+            cached = self._sets[tag] = frozenset(self.postings(tag))
+        return cached
+
+    def match_all(self, tags: Sequence[str]) -> List[int]:
+        """Ids of rows carrying every tag in ``tags`` (all rows when ``tags`` is empty)."""
+        wanted = {t.strip() for t in tags if t.strip()}
+        if not wanted:
+            return list(range(len(self.links)))
+        # Walk the shortest postings list and probe the others
+        ordered = sorted(wanted, key=lambda t: len(self.postings(t)))
+        others = [self._set(t) for t in ordered[1:]]
+        return [i for i in self.postings(ordered[0]) if all(i in s for s in others)]
+
+    def evaluate(self, node: Node) -> List[int]:
+        if isinstance(node, str):
+            return list(self.postings(node))
+        op, arg = node
+        if op == "not":
+            excluded = set(self.evaluate(arg))
+            return [i for i in range(len(self.links)) if i not in excluded]
+        if op == "or":
+            merged = set()
+            for child in arg:
+                merged.update(self.evaluate(child))
+            return sorted(merged)
+        # "and": intersect the positive operands first, then subtract negated ones so
+        # ``a AND NOT b`` never materializes the complement of ``b``
+        positives = [c for c in arg if not (isinstance(c, tuple) and c[0] == "not")]
+        negatives = [c[1] for c in arg if isinstance(c, tuple) and c[0] == "not"]
+        if positives:
+            lists = sorted((self.evaluate(c) for c in positives), key=len)
+            result = lists[0]
+            for other in lists[1:]:
+                if not result:
+                    break
+                members = set(other)
+                result = [i for i in result if i in members]
+        else:
+            result = list(range(len(self.links)))
+        for child in negatives:
+            if not result:
+                break
+            excluded = set(self.evaluate(child))
+            result = [i for i in result if i not in excluded]
+        return result
+
+    def select(self, filter_tags: Sequence[str] = (), query: Optional[str] = None) -> List[str]:
+        """Links of rows matching all ``filter_tags`` and, when given, the ``query`` expression."""
+        ids = self.match_all(filter_tags)
+        if query and query.strip():
+            matched = set(self.evaluate(parse_tag_query(query)))
+            ids = [i for i in ids if i in matched]
+        return [self.links[i] for i in ids]
@@ -0,0 +1,84 @@
+"""Put the post text into the composer in one go, without the system clipboard.
+
+The clipboard is global to the desktop (several browsers pasting at once race each
+other) and unavailable in headless sessions, and ``send_keys`` types one character
+per key event, slowly, and cannot send characters outside the BMP (most emoji) to
+ChromeDriver. Instead the text is inserted the way an IME or paste would:
+
+1. ``document.execCommand('insertText' / 'insertParagraph')`` for every line, in a
+   single ``execute_script`` call. Editors such as Facebook's handle these as
+   ordinary ``beforeinput`` events, so their state stays in sync with the DOM.
+2. CDP ``Input.insertText`` per line with an Enter key event between lines, for
+   editors that refuse ``execCommand``.
+3. ``send_keys`` as the last resort.
+
+Text is inserted verbatim: emoji, combining marks and right-to-left scripts go in
+as typed, and the editor decides the paragraph direction just as for a paste.
+"""
+from __future__ import annotations
+
+import logging
+from typing import List
+
+# Returns {index, broke}: ``index`` lines went in completely (text and the paragraph
+# break before it), and ``broke`` says the break before line ``index`` is in already,
+# so a fallback can continue from there without doubling it.
+_INSERT_LINES_JS = """
+const el = arguments[0];
+const lines = arguments[1];
+el.focus();
+const selection = window.getSelection();
+if (!selection.rangeCount || !el.contains(selection.anchorNode)) {
+  const range = document.createRange();
+  range.selectNodeContents(el);
+  range.collapse(false);
+  selection.removeAllRanges();
+  selection.addRange(range);
+}
+for (let i = 0; i < lines.length; i++) {
+  if (i > 0 && !document.execCommand('insertParagraph')) return {index: i, broke: false};
+  if (lines[i] && !document.execCommand('insertText', false, lines[i])) return {index: i, broke: i > 0};
+}
+return {index: lines.length, broke: false};
+"""
+
+_ENTER = {"key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13, "nativeVirtualKeyCode": 13}
+
+
+def split_lines(text: str) -> List[str]:
+    return text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+
+def insert_text(driver, element, text: str) -> str:
+    """Insert ``text`` at the caret of the focused editor ``element``.
+
+    Returns the method that completed the insert: ``exec_command``, ``cdp`` or ``keys``.
+    """
+    logger = logging.getLogger(__name__)
+    lines = split_lines(text)
+    try:
+        result = driver.execute_script(_INSERT_LINES_JS, element, lines) or {}
+        done, broke = int(result.get("index", 0)), bool(result.get("broke"))
+    except Exception as e:
+        logger.debug("execCommand insert failed: %s", e)
+        done, broke = 0, False
+    if done >= len(lines):
+        return "exec_command"
+
+    # execCommand works for an editor either from the first line or not at all in
+    # practice; should it stop part-way, the fallbacks carry on from line ``done``
+    try:
+        while done < len(lines):
+            if done > 0 and not broke:
+                driver.execute_cdp_cmd("Input.dispatchKeyEvent", {"type": "keyDown", "text": "\r", **_ENTER})
+                driver.execute_cdp_cmd("Input.dispatchKeyEvent", {"type": "keyUp", **_ENTER})
+                broke = True
+            if lines[done]:
+                driver.execute_cdp_cmd("Input.insertText", {"text": lines[done]})
+            done, broke = done + 1, False
+        return "cdp"
+    except Exception as e:
+        logger.debug("CDP insert unavailable: %s", e)
+    rest = "\n".join(lines[done:])
+    element.send_keys("\n" + rest if done > 0 and not broke else rest)
+    return "keys"
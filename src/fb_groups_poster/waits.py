@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .profiling import percentile
+
+
+# Upper bounds per step; these are the waits post_to_group used before tuning existed.
+DEFAULT_TIMEOUTS: Dict[str, float] = {
+    "create_post": 10.0,
+    "text_area": 10.0,
+    "text_entry": 5.0,
+    "photo_button": 60.0,
+    "composer_ready": 60.0,
+    "posting_started": 120.0,
+    "posting_finished": 120.0,
+}
+
+# Steps whose timeout is never shortened: giving up early on an in-flight post would
+# report a failure for a post that may still go through.
+FIXED_STEPS = frozenset({"posting_started", "posting_finished"})
+
+
+class AdaptiveTimeouts:
+    """Per-step wait timeouts that shrink towards what earlier posts actually needed.
+
+    Each successful step records its duration. Once a step has ``min_samples``
+    observations its timeout becomes ``p95 * margin``, never below ``floor`` and never
+    above the step's default. History is capped per step and can be persisted to
+    ``path`` so later runs start tuned.
+    """
+
+    def __init__(
+        self,
+        defaults: Optional[Dict[str, float]] = None,
+        path: Optional[str] = None,
+        margin: float = 2.0,
+        floor: float = 3.0,
+        min_samples: int = 20,
+        history: int = 200,
+    ):
+        self.defaults = dict(DEFAULT_TIMEOUTS if defaults is None else defaults)
+        self.path = path
+        self.margin = margin
+        self.floor = floor
+        self.min_samples = min_samples
+        self.history = history
+        self._samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    def timeout(self, step: str) -> float:
+        default = self.defaults.get(step, 10.0)
+        if step in FIXED_STEPS:
+            return default
+        with self._lock:
+            samples = list(self._samples.get(step, ()))
+        if len(samples) < self.min_samples:
+            return default
+        tuned = percentile(samples, 95) * self.margin
+        return min(default, max(self.floor, tuned))
+
+    def record(self, step: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(step, [])
+            samples.append(round(seconds, 3))
+            del samples[:-self.history]
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[float]:
+        """Yield the timeout for ``name`` and record the elapsed time if the block succeeds."""
+        start = time.monotonic()
+        yield self.timeout(name)
+        self.record(name, time.monotonic() - start)
+
+    def samples(self, step: str) -> List[float]:
+        with self._lock:
+            return list(self._samples.get(step, ()))
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            for step, samples in raw.items():
+                if isinstance(samples, list):
+                    self._samples[step] = [float(s) for s in samples][-self.history:]
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {step: list(samples) for step, samples in self._samples.items()}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.getLogger(__name__).warning("Could not save step timings to %s: %s", self.path, e)
+
+
+def wait_until(driver, timeout: float, condition: Callable, message: str = "", poll: float = 0.25):
+    """``WebDriverWait(...).until`` with a faster poll than Selenium's 0.5s default."""
+    return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition, message)
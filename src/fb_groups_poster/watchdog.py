@@ -0,0 +1,147 @@
+"""Decide when a long-running browser session should be replaced by a fresh one.
+
+Edge's memory grows over hundreds of heavy group pages until every page gets
+slower or the driver crashes. ``BrowserWatchdog`` watches one session: the
+posts made since it was launched, the resident memory of its process tree, and
+post latency compared with the first posts of the run. The runner quits and
+relaunches the browser (same profile) when ``check`` names a reason.
+
+Memory is read with psutil when it is installed (``pip install
+fb-groups-poster[monitor]``), else from ``/proc`` on Linux; elsewhere the memory
+limit is not enforced.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import statistics
+from collections import deque
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # optional dependency
+    psutil = None
+
+_warned_no_rss = False
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses; fields resume after the last ')'
+        ppid = int(stat[stat.rindex(b")") + 2 :].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def _proc_tree_rss(pid: int) -> int:
+    children = _proc_children()
+    page = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/statm", "r") as f:
+                total += int(f.read().split()[1]) * page
+        except (OSError, ValueError, IndexError):
+            pass
+        stack.extend(children.get(current, []))
+    return total
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Resident memory in bytes of ``pid`` and all its descendants, or None if unknown."""
+    global _warned_no_rss
+    try:
+        if psutil is not None:
+            proc = psutil.Process(pid)
+            total = proc.memory_info().rss
+            for child in proc.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        if os.path.isdir("/proc"):
+            return _proc_tree_rss(pid)
+    except Exception as e:
+        logging.getLogger(__name__).debug("Could not read memory of process %s: %s", pid, e)
+        return None
+    if not _warned_no_rss:
+        _warned_no_rss = True
+        logging.getLogger(__name__).info("Browser memory is not monitored; install psutil to enable browser.recycle_rss_mb")
+    return None
+
+
+def browser_rss(driver) -> Optional[int]:
+    """Memory of the browser launched for ``driver``: msedgedriver and every Edge process under it."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    pid = getattr(process, "pid", None)
+    if not isinstance(pid, int):
+        return None
+    return process_tree_rss(pid)
+
+
+class BrowserWatchdog:
+    """Recycling policy for one browser session; all limits are off when 0.
+
+    - ``max_posts``: posts per session
+    - ``max_rss_mb``: resident memory of the browser's process tree
+    - ``latency_factor``: median latency of the last ``window`` posts compared with
+      the median of the run's first ``window`` posts (the baseline, kept across
+      relaunches)
+    """
+
+    def __init__(self, max_posts: int = 0, max_rss_mb: int = 0, latency_factor: float = 0.0, window: int = 10):
+        self.max_posts = max_posts
+        self.max_rss_mb = max_rss_mb
+        self.latency_factor = latency_factor
+        self.window = max(1, window)
+        self.posts = 0
+        self.baseline: Optional[float] = None
+        self._first: List[float] = []
+        self._recent: deque = deque(maxlen=self.window)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_posts or self.max_rss_mb or self.latency_factor)
+
+    def record(self, seconds: Optional[float]) -> None:
+        """Count one post that took ``seconds`` in the browser (None: it never got there)."""
+        self.posts += 1
+        if seconds is None:
+            return
+        self._recent.append(seconds)
+        if self.baseline is None:
+            self._first.append(seconds)
+            if len(self._first) >= self.window:
+                self.baseline = statistics.median(self._first)
+
+    def check(self, rss: Optional[int] = None) -> Optional[str]:
+        """The reason to recycle now (``posts``, ``memory`` or ``latency``), or None."""
+        if self.max_posts and self.posts >= self.max_posts:
+            return "posts"
+        if self.max_rss_mb and rss is not None and rss >= self.max_rss_mb * 1024 * 1024:
+            return "memory"
+        if (
+            self.latency_factor
+            and self.baseline
+            and len(self._recent) >= self.window
+            and statistics.median(self._recent) >= self.baseline * self.latency_factor
+        ):
+            return "latency"
+        return None
+
+    def reset(self) -> None:
+        """Start counting a fresh session; the latency baseline is kept."""
+        self.posts = 0
+        self._recent.clear()
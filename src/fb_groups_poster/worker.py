@@ -0,0 +1,191 @@
+"""``fbpost work``: post the visits of a queued run, alongside workers on other hosts.
+
+A worker is an ordinary run on this host (its own browsers, pacing, journal,
+tracker rows and profile export) whose groups come from the shared
+``WorkQueue`` instead of the Groups sheet. Each browser claims one visit at a
+time; timed-out posts go back into the shared queue with backoff, so any host
+may retry them.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import click
+from tqdm import tqdm
+
+from .config import AppConfig, Campaign, RetryConfig
+from .journal import RunJournal
+from .planner import GroupVisit
+from .profiling import Profiler, set_profiler
+from .retry import RetryQueue
+from .runner import (
+    _finish,
+    _init_posting_state,
+    _init_sheets_stage,
+    _launch_stage,
+    _log_started,
+    _new_watchdog,
+    _post_visit,
+    _prepare_images_stage,
+    _Progress,
+    _quiet_noisy_loggers,
+    _recycle_if_needed,
+    _Run,
+    _worker_count,
+)
+from .workqueue import Lease, WorkQueue
+
+
+class _SharedRetries(RetryQueue):
+    """``_Run.retries`` for workers: a deferred post becomes a new visit in the shared queue.
+
+    Attempts and the retry budget are checked as in ``RetryQueue``; the budget runs
+    from this worker's first deferral. A post refused here is final, so its lease is
+    completed as failed.
+    """
+
+    def __init__(self, queue: WorkQueue, run_id: str, retry: RetryConfig):
+        super().__init__(
+            max_attempts=retry.max_attempts,
+            base_delay=retry.base_delay,
+            max_delay=retry.max_delay,
+            budget=retry.budget_minutes * 60.0,
+        )
+        self.queue = queue
+        self.run_id = run_id
+
+    def push(self, item: Any, attempt: int) -> bool:
+        if self.allows(attempt) is None:
+            return False
+        _, visit = item
+        self.queue.defer(self.run_id, visit.url, [c.name for c in visit.campaigns], attempt + 1, self.delay(attempt))
+        return True
+
+
+def _post_lease(
+    run: _Run, queue: WorkQueue, driver, idx: int, lease: Lease, campaigns: Dict[str, Campaign]
+) -> list:
+    """Post one leased visit and report it to the queue; returns the post results."""
+    cfg = run.cfg
+    known = [campaigns[name] for name in lease.campaigns if name in campaigns]
+    if len(known) != len(lease.campaigns):
+        missing = ", ".join(name or "<default>" for name in lease.campaigns if name not in campaigns)
+        logging.getLogger(__name__).error("%s: campaign(s) %s are not in this worker's config", lease.url, missing)
+        queue.complete(lease, False, f"unknown campaign: {missing}")
+        return []
+    visit = GroupVisit(lease.url, known)
+    with queue.heartbeat(lease, cfg.queue.lease_seconds) as lost:
+        results = _post_visit(run, driver, idx, visit, attempt=lease.attempt)
+    if not results:
+        # Stopped before posting anything
+        queue.release(lease)
+        return results
+    made = {id(campaign) for campaign, _ in results}
+    left = [c.name for c in visit.campaigns if id(c) not in made]
+    if left:
+        queue.defer(run.run_id, visit.url, left, lease.attempt)
+    notes = ", ".join(f"{c.name or 'post'}: {r.code}" for c, r in results if not r.ok)
+    if not queue.complete(lease, all(r.ok for _, r in results), notes) or lost.is_set():
+        logging.getLogger(__name__).warning("Lease on %s was lost while posting; another worker may repeat it", visit.url)
+    return results
+
+
+def _lease_worker(
+    run: _Run, queue: WorkQueue, driver, worker: str, next_idx: Callable[[int], int], campaigns: Dict[str, Campaign]
+) -> None:
+    """Claim and post visits with one browser until the run has nothing left."""
+    cfg = run.cfg
+    watchdog = _new_watchdog(run)
+    while not run.stopped:
+        lease = queue.claim(run.run_id, worker, cfg.queue.lease_seconds, max_claims=cfg.retry.max_attempts)
+        if lease is None:
+            stopped = queue.stopped(run.run_id)
+            if stopped:
+                run.stopped = run.stopped or stopped
+                return
+            ready_in = queue.next_ready_in(run.run_id)
+            if ready_in is None:
+                return
+            # Other workers still hold leases, or retries are backing off
+            time.sleep(min(cfg.queue.poll_interval, max(ready_in, 0.1)))
+            continue
+        results = _post_lease(run, queue, driver, next_idx(len(lease.campaigns)), lease, campaigns)
+        if run.stopped:
+            queue.stop(run.run_id, run.stopped)
+        fresh = _recycle_if_needed(run, driver, watchdog, results)
+        if fresh is None:
+            return
+        driver = fresh
+
+
+def run_worker(cfg: AppConfig, path: str, run_id: Optional[str] = None, worker: Optional[str] = None) -> bool:
+    """Work on the queued run ``run_id`` (default: the latest) until its queue is drained."""
+    logger = logging.getLogger(__name__)
+    _quiet_noisy_loggers()
+    if not os.path.exists(path):
+        click.echo(f"No work queue at {path}; start a run with `fbpost coordinate` first.", err=True)
+        return False
+    queue = WorkQueue(path)
+    run_id = run_id or queue.latest_run()
+    if run_id is None:
+        click.echo(f"The work queue at {path} has no runs.", err=True)
+        return False
+    stopped = queue.stopped(run_id)
+    if stopped:
+        logger.info("Run %s was stopped (%s); continuing it", run_id, stopped)
+        queue.unstop(run_id)
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    campaigns = {c.name: c for c in cfg.poster.all_campaigns()}
+    outstanding = queue.outstanding(run_id)
+    if not outstanding:
+        click.echo(f"Run {run_id} has nothing left to post.")
+        return True
+
+    profiler = Profiler(run_id)
+    set_profiler(profiler)
+    run = _Run(cfg=cfg, run_id=run_id, resumed=True, journal=RunJournal(cfg.cache_dir, run_id), profiler=profiler)
+    # A snapshot of what is left; other workers take their share of it
+    run.visits = [GroupVisit(url, [campaigns[n] for n in names if n in campaigns]) for url, names in outstanding]
+    if not _init_sheets_stage(run):
+        return False
+    _prepare_images_stage(run)
+    run.launch_started = time.monotonic()
+    _log_started(run)
+    if not _launch_stage(run, _worker_count(run)):
+        return False
+    _init_posting_state(run)
+    run.retries = _SharedRetries(queue, run_id, cfg.retry)
+    logger.info("Worker %s on run %s (%d visit(s) outstanding)", worker, run_id, len(outstanding))
+
+    # Post numbers for the progress lines, shared by this host's browsers
+    numbers = [1]
+    lock = threading.Lock()
+
+    def next_idx(posts: int) -> int:
+        with lock:
+            idx = numbers[0]
+            numbers[0] += posts
+            return idx
+
+    try:
+        click.echo("")
+        with tqdm(total=run.posts, desc=f"Posting ({worker})", unit="post", ncols=80) as pbar:
+            run.progress = _Progress(pbar=pbar, total=run.posts)
+            with ThreadPoolExecutor(max_workers=len(run.drivers), thread_name_prefix="fbpost-worker") as pool:
+                futures = [pool.submit(_lease_worker, run, queue, driver, worker, next_idx, campaigns) for driver in run.drivers]
+                for future in futures:
+                    future.result()
+    finally:
+        _finish(run)
+    counts = queue.counts(run_id)
+    click.echo(
+        f"Run {run_id}: {counts['posted']} visit(s) posted, {counts['failed']} failed, "
+        f"{counts['pending'] + counts['leased']} still queued"
+    )
+    return run.errors == 0 and not run.stopped
@@ -0,0 +1,275 @@
+"""Shared work queue for spreading one run across several hosts.
+
+``fbpost coordinate`` stores the run's group visits in a SQLite file; ``fbpost work``
+processes on any machine that can open the file claim visits one at a time under
+a time-limited lease. A lease is renewed while its visit is being posted, so it
+only runs out when the worker died or lost the file; the visit then goes to the
+next worker that asks.
+
+Every operation opens its own connection and runs in a ``BEGIN IMMEDIATE``
+transaction, so claims are atomic across threads, processes and hosts. The
+default rollback journal is used rather than WAL, which does not work on network
+file systems. Lease times are wall-clock, so hosts need reasonably synced clocks.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .scheduler import Clock
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    stopped TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    campaigns TEXT NOT NULL,
+    attempt INTEGER NOT NULL DEFAULT 1,
+    status TEXT NOT NULL DEFAULT 'pending',
+    not_before REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    token TEXT,
+    lease_expires REAL,
+    claims INTEGER NOT NULL DEFAULT 0,
+    notes TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_by_run ON tasks (run_id, status);
+"""
+
+# pending -> leased -> posted | failed; an expired lease counts as pending again
+STATUSES = ("pending", "leased", "posted", "failed")
+
+
+def queue_path(cfg, override: Optional[str] = None) -> str:
+    """The queue file: ``override``, else ``queue.path``, else ``<cache_dir>/queue.sqlite``."""
+    path = override or getattr(getattr(cfg, "queue", None), "path", "") or os.path.join(cfg.cache_dir, "queue.sqlite")
+    return os.path.abspath(os.path.expanduser(path))
+
+
+@dataclass
+class Lease:
+    """A visit claimed by one worker until ``expires`` (wall-clock seconds)."""
+
+    task_id: int
+    run_id: str
+    url: str
+    campaigns: List[str]
+    attempt: int
+    token: str
+    expires: float
+
+
+class WorkQueue:
+    def __init__(self, path: str, clock: Optional[Clock] = None, timeout: float = 30.0):
+        self.path = path
+        self.clock = clock or Clock()
+        self.timeout = timeout
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as conn:
+            # executescript would commit the open transaction; run the statements one by one
+            for statement in filter(str.strip, _SCHEMA.split(";")):
+                conn.execute(statement)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # isolation_level=None: transactions are managed here, not by the sqlite3 module
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def create_run(self, run_id: str, visits: Sequence[Tuple[str, Sequence[str]]]) -> int:
+        """Queue ``(group url, campaign names)`` visits under a new ``run_id``; returns the count."""
+        now = self.clock.time()
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone():
+                raise ValueError(f"Run {run_id} is already queued")
+            conn.execute("INSERT INTO runs (run_id, created) VALUES (?, ?)", (run_id, now))
+            conn.executemany(
+                "INSERT INTO tasks (run_id, url, campaigns, updated) VALUES (?, ?, ?, ?)",
+                [(run_id, url, json.dumps(list(names)), now) for url, names in visits],
+            )
+        return len(visits)
+
+    def latest_run(self) -> Optional[str]:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT run_id FROM runs ORDER BY created DESC, rowid DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def claim(self, run_id: str, worker: str, lease_seconds: float, max_claims: int = 0) -> Optional[Lease]:
+        """Lease the next ready visit of ``run_id`` to ``worker``, or None if none is ready.
+
+        Ready means pending and past its ``not_before``, or leased to a worker whose
+        lease has run out. With ``max_claims``, a visit whose lease already expired
+        that many times (it keeps killing its worker) is failed instead of handed out.
+        """
+        now = self.clock.time()
+        with self._transaction() as conn:
+            run = conn.execute("SELECT stopped FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if run is None or run[0]:
+                return None
+            while True:
+                row = conn.execute(
+                    "SELECT id, url, campaigns, attempt, status, claims FROM tasks"
+                    " WHERE run_id = ? AND ((status = 'pending' AND not_before <= ?)"
+                    " OR (status = 'leased' AND lease_expires <= ?))"
+                    " ORDER BY id LIMIT 1",
+                    (run_id, now, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                task_id, url, campaigns, attempt, status, claims = row
+                if status == "leased":
+                    if max_claims and claims >= max_claims:
+                        logging.getLogger(__name__).warning("Lease on %s expired %d times; giving up on it", url, claims)
+                        conn.execute(
+                            "UPDATE tasks SET status = 'failed', notes = ?, token = NULL, updated = ? WHERE id = ?",
+                            (f"lease expired {claims} time(s)", now, task_id),
+                        )
+                        continue
+                    logging.getLogger(__name__).warning("Lease on %s expired; reassigning it", url)
+                token = uuid.uuid4().hex
+                expires = now + lease_seconds
+                conn.execute(
+                    "UPDATE tasks SET status = 'leased', worker = ?, token = ?, lease_expires = ?,"
+                    " claims = claims + 1, updated = ? WHERE id = ?",
+                    (worker, token, expires, now, task_id),
+                )
+                return Lease(task_id, run_id, url, json.loads(campaigns), attempt, token, expires)
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        """Extend ``lease``; False if it has already been reassigned or finished."""
+        expires = self.clock.time() + lease_seconds
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND token = ? AND status = 'leased'",
+                (expires, lease.task_id, lease.token),
+            )
+        if cursor.rowcount:
+            lease.expires = expires
+        return bool(cursor.rowcount)
+
+    def complete(self, lease: Lease, ok: bool, notes: str = "") -> bool:
+        """Record the visit's outcome; False if the lease was lost to another worker meanwhile."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, notes = ?, token = NULL, updated = ?"
+                " WHERE id = ? AND token = ? AND status = 'leased'",
+                ("posted" if ok else "failed", notes, self.clock.time(), lease.task_id, lease.token),
+            )
+        return bool(cursor.rowcount)
+
+    def release(self, lease: Lease) -> None:
+        """Hand an unstarted visit back, e.g. when the worker is stopping."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL, token = NULL, lease_expires = NULL,"
+                " claims = claims - 1, updated = ? WHERE id = ? AND token = ? AND status = 'leased'",
+                (self.clock.time(), lease.task_id, lease.token),
+            )
+
+    def defer(self, run_id: str, url: str, campaigns: Sequence[str], attempt: int, delay: float = 0.0) -> None:
+        """Queue another visit for ``campaigns`` that any worker may claim after ``delay`` seconds."""
+        now = self.clock.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO tasks (run_id, url, campaigns, attempt, not_before, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, url, json.dumps(list(campaigns)), attempt, now + delay, now),
+            )
+
+    def stop(self, run_id: str, reason: str) -> None:
+        """Make every worker of ``run_id`` stop claiming, e.g. after Facebook logged the account out."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE runs SET stopped = ? WHERE run_id = ?", (reason, run_id))
+
+    def stopped(self, run_id: str) -> Optional[str]:
+        with self._transaction() as conn:
+            row = conn.execute("SELECT stopped FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def unstop(self, run_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("UPDATE runs SET stopped = NULL WHERE run_id = ?", (run_id,))
+
+    def counts(self, run_id: str) -> Dict[str, int]:
+        """Number of visits per status; expired leases are counted as pending."""
+        now = self.clock.time()
+        counts = dict.fromkeys(STATUSES, 0)
+        with self._transaction() as conn:
+            for status, expired, count in conn.execute(
+                "SELECT status, status = 'leased' AND lease_expires <= ?, COUNT(*) FROM tasks"
+                " WHERE run_id = ? GROUP BY 1, 2",
+                (now, run_id),
+            ):
+                counts["pending" if expired else status] += count
+        return counts
+
+    def outstanding(self, run_id: str) -> List[Tuple[str, List[str]]]:
+        """``(url, campaign names)`` of every visit not finished yet."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT url, campaigns FROM tasks WHERE run_id = ? AND status IN ('pending', 'leased') ORDER BY id",
+                (run_id,),
+            ).fetchall()
+        return [(url, json.loads(campaigns)) for url, campaigns in rows]
+
+    def next_ready_in(self, run_id: str) -> Optional[float]:
+        """Seconds until some visit can be claimed; None when nothing is left to do."""
+        now = self.clock.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT MIN(CASE status WHEN 'pending' THEN not_before ELSE lease_expires END) FROM tasks"
+                " WHERE run_id = ? AND status IN ('pending', 'leased')",
+                (run_id,),
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return max(0.0, row[0] - now)
+
+    @contextmanager
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> Iterator[threading.Event]:
+        """Keep renewing ``lease`` every third of ``lease_seconds`` while the block runs.
+
+        The yielded event is set if the lease could not be renewed (it was reassigned).
+        """
+        done = threading.Event()
+        lost = threading.Event()
+
+        def renew() -> None:
+            while not done.wait(lease_seconds / 3):
+                try:
+                    if not self.renew(lease, lease_seconds):
+                        lost.set()
+                        return
+                except sqlite3.Error as e:
+                    logging.getLogger(__name__).warning("Could not renew lease on %s: %s", lease.url, e)
+
+        thread = threading.Thread(target=renew, name="lease-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield lost
+        finally:
+            done.set()
+            thread.join()
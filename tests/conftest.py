@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def live_driver():
+    """Headless browser for fixture-page tests; opt in with FBPOST_BROWSER=chrome|edge."""
+    browser = os.environ.get("FBPOST_BROWSER")
+    if not browser:
+        pytest.skip("set FBPOST_BROWSER=chrome|edge to run browser tests")
+    from selenium import webdriver
+    if browser == "edge":
+        opts = webdriver.EdgeOptions()
+        factory = webdriver.Edge
+    else:
+        opts = webdriver.ChromeOptions()
+        factory = webdriver.Chrome
+    opts.add_argument("--headless=new")
+    opts.add_argument("--window-size=1920,1080")
+    driver = factory(options=opts)
+    yield driver
+    driver.quit()
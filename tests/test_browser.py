@@ -0,0 +1,138 @@
+import os
+import shutil
+from fb_groups_poster.browser import clone_profile
+from fb_groups_poster.config import BrowserConfig
+
+
+def test_clone_profile(tmp_path):
+    # Given
+    user_data = tmp_path / "User Data"
+    profile = user_data / "Profile 1"
+    (profile / "Cache").mkdir(parents=True)
+    (profile / "Cache" / "data_0").write_text("cached")
+    (profile / "Cookies").write_text("cookies")
+    (profile / "SingletonLock").write_text("")
+    (user_data / "Local State").write_text("{}")
+    cfg = BrowserConfig(edge_profile_dir=str(user_data), edge_profile_name="Profile 1", workers=2)
+
+    # When
+    clone = clone_profile(cfg, worker_no=1)
+
+    # Then
+    try:
+        assert clone.edge_profile_dir != cfg.edge_profile_dir
+        assert clone.edge_profile_name == "Profile 1"
+        assert clone.workers == 2
+        assert os.path.exists(os.path.join(clone.edge_profile_dir, "Local State"))
+        assert os.path.exists(os.path.join(clone.edge_profile_dir, "Profile 1", "Cookies"))
+        # Caches and lock files are not copied
+        assert not os.path.exists(os.path.join(clone.edge_profile_dir, "Profile 1", "Cache"))
+        assert not os.path.exists(os.path.join(clone.edge_profile_dir, "Profile 1", "SingletonLock"))
+    finally:
+        shutil.rmtree(clone.edge_profile_dir, ignore_errors=True)
+
+
+def test_resolve_driver_path_caches_lookup(mocker, tmp_path):
+    # Given
+    from fb_groups_poster.browser import resolve_driver_path
+    driver_file = tmp_path / "msedgedriver"
+    driver_file.write_text("")
+    manager = mocker.patch("fb_groups_poster.browser._resolve_with_manager", return_value=str(driver_file))
+    cfg = BrowserConfig(edge_profile_dir="dummy")
+    cache_dir = str(tmp_path / "cache")
+
+    # When
+    first = resolve_driver_path(cfg, cache_dir)
+    second = resolve_driver_path(cfg, cache_dir)
+    refreshed = resolve_driver_path(cfg, cache_dir, refresh=True)
+
+    # Then: one network lookup for two launches, plus the forced refresh
+    assert first == second == refreshed == str(driver_file)
+    assert manager.call_count == 2
+
+
+def test_resolve_driver_path_pinned(mocker):
+    # Given
+    from fb_groups_poster.browser import resolve_driver_path
+    manager = mocker.patch("fb_groups_poster.browser._resolve_with_manager")
+    cfg = BrowserConfig(edge_profile_dir="dummy", driver_path="/opt/msedgedriver")
+
+    # Then
+    assert resolve_driver_path(cfg, "/unused") == "/opt/msedgedriver"
+    manager.assert_not_called()
+
+
+def test_live_session_address(mocker, tmp_path):
+    # Given
+    from fb_groups_poster.browser import clear_session, live_session_address, write_session
+    urlopen = mocker.patch("fb_groups_poster.browser.urllib.request.urlopen")
+    assert live_session_address(str(tmp_path)) is None
+
+    # When
+    write_session(str(tmp_path), "127.0.0.1:9222")
+
+    # Then
+    assert live_session_address(str(tmp_path)) == "127.0.0.1:9222"
+    urlopen.assert_called_once()
+    assert urlopen.call_args.args[0] == "http://127.0.0.1:9222/json/version"
+
+    # When: the browser is gone
+    urlopen.side_effect = OSError("connection refused")
+    # Then
+    assert live_session_address(str(tmp_path)) is None
+
+    # When
+    clear_session(str(tmp_path))
+    # Then
+    assert not os.path.exists(os.path.join(str(tmp_path), "browser-session.json"))
+
+
+def test_build_edge_lightweight(mocker):
+    # Given
+    from fb_groups_poster.browser import BLOCKED_URL_PATTERNS, build_edge
+    mocker.patch("fb_groups_poster.browser.resolve_driver_path", return_value="/opt/msedgedriver")
+    mocker.patch("fb_groups_poster.browser._service")
+    edge = mocker.patch("fb_groups_poster.browser.webdriver.Edge")
+    cfg = BrowserConfig(edge_profile_dir="dummy", lightweight=True)
+
+    # When
+    driver = build_edge(cfg)
+
+    # Then
+    opts = edge.call_args.kwargs["options"]
+    assert opts.page_load_strategy == "eager"
+    assert "--mute-audio" in opts.arguments
+    driver.execute_cdp_cmd.assert_any_call("Network.enable", {})
+    driver.execute_cdp_cmd.assert_any_call("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+    # When: the default mode
+    edge.reset_mock()
+    driver = build_edge(BrowserConfig(edge_profile_dir="dummy"))
+
+    # Then
+    assert edge.call_args.kwargs["options"].page_load_strategy == "normal"
+    driver.execute_cdp_cmd.assert_not_called()
+
+
+def test_composer_url():
+    # Given: group links as they appear in the sheet, plus two that are not Facebook groups
+    from fb_groups_poster.browser import composer_url
+    links = [
+        "https://www.facebook.com/groups/12345",
+        "https://m.facebook.com/groups/my.group/posts/987?ref=share&mibextid=x",
+        "https://web.facebook.com/groups/12345/about/#top",
+        "https://www.facebook.com/pages/foo",
+        "http://127.0.0.1:8000/groups/3?posting_ms=300",
+    ]
+
+    # When
+    urls = [composer_url(link) for link in links]
+
+    # Then: bare group pages; anything else is left alone
+    assert urls == [
+        "https://www.facebook.com/groups/12345/",
+        "https://www.facebook.com/groups/my.group/",
+        "https://www.facebook.com/groups/12345/",
+        "https://www.facebook.com/pages/foo",
+        "http://127.0.0.1:8000/groups/3?posting_ms=300",
+    ]
@@ -25,7 +25,25 @@ def test_run_success(mocker, mock_config):
 
     # Then
     assert result.exit_code == 0
-    mock_run_posting.assert_called_once_with(mock_config, assume_yes=False)
+    mock_run_posting.assert_called_once_with(mock_config, assume_yes=False, refresh_groups=False, offline=False, resume_run_id=None)
+
+def test_run_group_cache_flags(mocker, mock_config):
+    """Test --refresh-groups and --offline are passed through and are mutually exclusive."""
+    # Given
+    runner = CliRunner()
+    mocker.patch('fb_groups_poster.cli.os.path.exists', return_value=True)
+    mocker.patch('fb_groups_poster.cli.load_config', return_value=mock_config)
+    mock_run_posting = mocker.patch('fb_groups_poster.cli.run_posting', return_value=True)
+
+    # When
+    result = runner.invoke(main, ['run', '--offline'])
+    both = runner.invoke(main, ['run', '--offline', '--refresh-groups'])
+
+    # Then
+    assert result.exit_code == 0
+    mock_run_posting.assert_called_once_with(mock_config, assume_yes=False, refresh_groups=False, offline=True, resume_run_id=None)
+    assert both.exit_code == 2
+    assert "cannot be used together" in both.output
 
 def test_run_config_not_found(mocker):
     """Test the CLI run command fails if config not found."""
@@ -75,3 +93,141 @@ def test_run_default_logging(mocker, mock_config):
     mock_logging.basicConfig.assert_called_once()
     # Check that the log level was set to INFO
     assert mock_logging.basicConfig.call_args[1]['level'] == mock_logging.INFO
+
+def test_run_resume(mocker, mock_config):
+    """Test --resume passes the run ID through."""
+    # Given
+    runner = CliRunner()
+    mocker.patch('fb_groups_poster.cli.os.path.exists', return_value=True)
+    mocker.patch('fb_groups_poster.cli.load_config', return_value=mock_config)
+    mock_run_posting = mocker.patch('fb_groups_poster.cli.run_posting', return_value=True)
+
+    # When
+    result = runner.invoke(main, ['run', '-y', '--resume', 'abc-123'])
+
+    # Then
+    assert result.exit_code == 0
+    mock_run_posting.assert_called_once_with(
+        mock_config, assume_yes=True, refresh_groups=False, offline=False, resume_run_id='abc-123'
+    )
+
+def test_profile_command(mocker, tmp_path):
+    """Test fbpost profile prints per-step percentiles."""
+    # Given
+    from fb_groups_poster.profiling import Profiler
+    profiler = Profiler("run-9")
+    for seconds in [1.0, 2.0, 3.0]:
+        profiler.record("post.total", seconds)
+    path = profiler.export(str(tmp_path))
+    runner = CliRunner()
+
+    # When
+    result = runner.invoke(main, ['profile', path, '--config', str(tmp_path / "missing.yaml")])
+
+    # Then
+    assert result.exit_code == 0
+    assert "post.total" in result.output
+    assert "p95" in result.output
+
+def test_run_async_engine(mocker, mock_config):
+    """Test --async runs the asyncio engine instead of the sync loop."""
+    # Given
+    runner = CliRunner()
+    mocker.patch('fb_groups_poster.cli.os.path.exists', return_value=True)
+    mocker.patch('fb_groups_poster.cli.load_config', return_value=mock_config)
+    mock_run_posting = mocker.patch('fb_groups_poster.cli.run_posting', return_value=True)
+
+    async def fake_async(cfg, **options):
+        return options == dict(assume_yes=True, refresh_groups=False, offline=False, resume_run_id=None)
+
+    mocker.patch('fb_groups_poster.orchestrator.run_posting_async', side_effect=fake_async)
+
+    # When
+    result = runner.invoke(main, ['run', '-y', '--async'])
+
+    # Then
+    assert result.exit_code == 0
+    mock_run_posting.assert_not_called()
+
+def test_validate_reports_problems(tmp_path):
+    """Test fbpost validate flags a missing key file and image."""
+    # Given
+    import yaml
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.dump({
+        "sheets": {"service_account_file": str(tmp_path / "missing.json"), "spreadsheet_id": "abc"},
+        "browser": {"edge_profile_dir": str(tmp_path)},
+        "poster": {"text": "hello", "image_paths": [str(tmp_path / "nope.jpg")], "tag_query": "rent AND ("},
+    }))
+    runner = CliRunner()
+
+    # When
+    result = runner.invoke(main, ['validate', '--config', str(config)])
+
+    # Then
+    assert result.exit_code == 1
+    assert "service_account_file not found" in result.output
+    assert "image not found" in result.output
+    assert "tag_query" in result.output
+
+def test_validate_reports_duplicate_campaign_names(tmp_path):
+    """Test fbpost validate rejects two campaigns with the same name."""
+    # Given
+    import yaml
+    from fb_groups_poster.commands import check_config
+    from fb_groups_poster.config import AppConfig, BrowserConfig, Campaign, PosterConfig, SheetsConfig
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.dump({
+        "sheets": {"service_account_file": "key.json", "spreadsheet_id": "abc"},
+        "browser": {"edge_profile_dir": str(tmp_path)},
+        "poster": {"campaigns": [{"name": "spring", "text": "a"}, {"name": "spring", "text": "b"}]},
+    }))
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="key.json", spreadsheet_id="abc"),
+        browser=BrowserConfig(edge_profile_dir=str(tmp_path)),
+        poster=PosterConfig(campaigns=[Campaign(text="a", name="spring"), Campaign(text="b", name="spring")]),
+    )
+    runner = CliRunner()
+
+    # When
+    result = runner.invoke(main, ['validate', '--config', str(config)])
+    errors, _ = check_config(cfg)
+
+    # Then
+    assert result.exit_code == 1
+    assert "duplicate name(s): spring" in result.output
+    assert "poster.campaigns: more than one campaign is named 'spring'" in errors
+
+def test_groups_list_offline(mocker, mock_config):
+    """Test fbpost groups list passes the cache flags through."""
+    # Given
+    runner = CliRunner()
+    mocker.patch('fb_groups_poster.cli.os.path.exists', return_value=True)
+    mocker.patch('fb_groups_poster.cli.load_config', return_value=mock_config)
+    mock_list = mocker.patch('fb_groups_poster.cli.list_groups', return_value=True)
+
+    # When
+    result = runner.invoke(main, ['groups', 'list', '--offline'])
+
+    # Then
+    assert result.exit_code == 0
+    mock_list.assert_called_once_with(mock_config, refresh=False, offline=True)
+
+def test_work_uses_queue_path(mocker, mock_config, tmp_path):
+    # Given
+    runner = CliRunner()
+    mock_config.cache_dir = str(tmp_path)
+    mocker.patch('fb_groups_poster.cli.os.path.exists', return_value=True)
+    mocker.patch('fb_groups_poster.cli.load_config', return_value=mock_config)
+    mock_worker = mocker.patch('fb_groups_poster.cli.run_worker', return_value=True)
+
+    # When
+    default = runner.invoke(main, ['work'])
+    shared = runner.invoke(main, ['work', '--queue', str(tmp_path / 'shared.sqlite'), '--run', 'run-1', '--worker', 'pc2'])
+
+    # Then
+    assert default.exit_code == 0 and shared.exit_code == 0
+    assert mock_worker.call_args_list[0].args == (mock_config, str(tmp_path / 'queue.sqlite'))
+    assert mock_worker.call_args_list[0].kwargs == {"run_id": None, "worker": None}
+    assert mock_worker.call_args_list[1].args[1] == str(tmp_path / 'shared.sqlite')
+    assert mock_worker.call_args_list[1].kwargs == {"run_id": "run-1", "worker": "pc2"}
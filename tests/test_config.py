@@ -1,7 +1,7 @@
 import os
 import yaml
 import pytest
-from fb_groups_poster.config import load_config, AppConfig, SheetsConfig, BrowserConfig, PosterConfig
+from fb_groups_poster.config import load_config, AppConfig, SheetsConfig, BrowserConfig, PosterConfig, DEFAULT_CACHE_DIR
 
 @pytest.fixture
 def temp_config_file(tmp_path):
@@ -56,3 +56,49 @@ def test_load_config(temp_config_file):
     assert config.poster.text == "Hello, world!"
     assert config.poster.image_paths == [os.path.abspath("/fake/path/image1.jpg"), os.path.abspath("image2.jpg")]
     assert config.poster.filter_tags == ["test", "demo"]
+
+    # Check defaults for optional settings
+    assert config.cache_dir == DEFAULT_CACHE_DIR
+
+def test_load_config_with_campaigns(tmp_path):
+    # Given
+    config_data = {
+        "sheets": {"service_account_file": "key.json", "spreadsheet_id": "id"},
+        "browser": {"edge_profile_dir": "/fake/dir"},
+        "poster": {
+            "campaigns": [
+                {"name": "spring", "text": "Spring sale", "image_paths": ["a.jpg"], "filter_tags": ["rent"]},
+                {"text": "Studios", "filter_tags": ["studio"]},
+            ],
+        },
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.dump(config_data))
+
+    # When
+    config = load_config(str(config_path))
+
+    # Then
+    campaigns = config.poster.all_campaigns()
+    assert [c.name for c in campaigns] == ["spring", "campaign-2"]
+    assert campaigns[0].image_paths == [os.path.abspath("a.jpg")]
+    assert campaigns[1].filter_tags == ["studio"]
+
+def test_load_config_rejects_duplicate_campaign_names(tmp_path):
+    # Given: an explicit name that collides with a generated one
+    config_data = {
+        "sheets": {"service_account_file": "key.json", "spreadsheet_id": "id"},
+        "browser": {"edge_profile_dir": "/fake/dir"},
+        "poster": {
+            "campaigns": [
+                {"name": "campaign-2", "text": "Spring sale"},
+                {"text": "Studios"},
+            ],
+        },
+    }
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.dump(config_data))
+
+    # When / Then
+    with pytest.raises(ValueError, match="campaign-2"):
+        load_config(str(config_path))
@@ -0,0 +1,141 @@
+import re
+import pathlib
+import pytest
+from unittest.mock import Mock
+from fb_groups_poster.dom_probe import climb_and_query, first_clickable, first_match, page_state
+
+FIXTURE = pathlib.Path(__file__).parent / "fixtures" / "group_composer.html"
+
+
+def test_first_match_is_one_round_trip():
+    # Given
+    element = Mock()
+    driver = Mock()
+    driver.execute_script.return_value = [1, element]
+    condition = first_match([re.compile(r"write\s+something", re.I), "//div[@id='x']"], "//div[@role='textbox']")
+
+    # When
+    result = condition(driver)
+
+    # Then
+    assert result == (1, element)
+    assert driver.execute_script.call_count == 1
+    payload = driver.execute_script.call_args.args[1]
+    assert payload == [{"regex": r"write\s+something", "flags": "i"}, {"xpath": "//div[@id='x']"}]
+    driver.find_elements.assert_not_called()
+
+
+def test_probes_return_false_until_found():
+    # Given
+    driver = Mock()
+    driver.execute_script.return_value = None
+
+    # Then
+    assert first_clickable(["//span"])(driver) is False
+    assert first_match(["//span"], "//div")(driver) is False
+    assert climb_and_query(driver, Mock(), 3, "input") is None
+
+
+def test_fixture_only_shows_posting_indicator_after_click():
+    # Given
+    from fb_groups_poster.poster import POSTING_XPATH
+    text = FIXTURE.read_text(encoding="utf-8")
+
+    # Then: the wait's needle is nowhere in the page's markup or scripts, so the
+    # posting_started wait can only be satisfied by the indicator added on click
+    assert "'Posting'" in POSTING_XPATH
+    assert "Posting" not in text.split("-->", 1)[1]
+
+
+def test_page_state_maps_unknown_results_to_ok():
+    # Given
+    driver = Mock()
+    driver.execute_script.side_effect = ["not_member", None, "something-new"]
+
+    # Then
+    assert page_state(driver) == "not_member"
+    assert page_state(driver) == "ok"
+    assert page_state(driver) == "ok"
+    assert driver.execute_script.call_count == 3
+
+
+class CommandCounter:
+    """Counts WebDriver commands sent by a live driver (excluding session setup)."""
+
+    def __init__(self, driver):
+        self.commands = []
+        executor = driver.command_executor
+        original = executor.execute
+
+        def execute(command, params):
+            self.commands.append(command)
+            return original(command, params)
+
+        executor.execute = execute
+
+
+def test_post_against_fixture_counts_commands(live_driver, tmp_path):
+    # Given
+    from fb_groups_poster.poster import post_to_group
+    image = tmp_path / "image.png"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n")
+    client = Mock()
+    counter = CommandCounter(live_driver)
+
+    # When
+    ok = post_to_group(live_driver, client, FIXTURE.as_uri(), "Hello\nfixture", [str(image)], "run-1")
+
+    # Then
+    assert ok, client.log_row.call_args
+    assert live_driver.execute_script("return window.__posted") == 1
+    assert len(counter.commands) <= 40
+
+
+def test_post_waits_out_the_posting_spinner(live_driver, tmp_path):
+    # Given
+    import time
+    from fb_groups_poster.poster import post_to_group
+    image = tmp_path / "image.png"
+    image.write_bytes(b"\x89PNG\r\n\x1a\n")
+
+    def post(posting_ms):
+        started = time.perf_counter()
+        ok = post_to_group(live_driver, Mock(), f"{FIXTURE.as_uri()}?posting_ms={posting_ms}", "Hi", [str(image)], "run-1")
+        assert ok
+        return time.perf_counter() - started
+
+    # When
+    quick = post(100)
+    slow = post(1600)
+
+    # Then: the extra 1.5s of spinner shows up in the post time
+    assert slow - quick >= 1.2
+
+
+@pytest.mark.parametrize("body, expected", [
+    ('<div role="button" aria-label="Join group">Join group</div>', "not_member"),
+    ('<div role="button">Cancel request</div>', "pending"),
+    ("<h2>This content isn't available right now</h2>", "unavailable"),
+    ('<div role="main"><span>This content isn\'t available right now</span></div>', "unavailable"),
+    # A shared post whose original was deleted, in a healthy group's feed
+    ('<div role="main"><span>Write something...</span><div role="feed"><div role="article">'
+     "<h2>This content isn't available right now</h2></div></div></div>", "ok"),
+    ('<div role="main"><div role="button" aria-label="Join group">Join group</div>'
+     '<div role="feed"><div role="article">'
+     "<h2>This content isn't available right now</h2></div></div></div>", "not_member"),
+    # Suggested groups in the sidebar, before the group's own column has rendered its composer
+    ('<div role="main"><span>Loading</span></div><div role="complementary">'
+     '<div role="button" aria-label="Join group">Join group</div></div>', "ok"),
+    ('<div role="main"></div><div role="button">Join group</div>', "ok"),
+    ('<form id="login_form"><input name="pass"></form>', "login"),
+])
+def test_page_state_against_live_page(live_driver, body, expected):
+    # Given
+    live_driver.get(FIXTURE.as_uri())
+    assert page_state(live_driver) == "ok"
+
+    # When
+    live_driver.execute_script("document.body.innerHTML = arguments[0]", body)
+
+    # Then
+    assert page_state(live_driver) == expected
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from fb_groups_poster.images import prepare_images
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _photo(path, size=(4000, 3000)):
+    img = Image.new("RGB", size, (200, 120, 40))
+    exif = Image.Exif()
+    exif[0x010F] = "CameraMaker"  # Make
+    img.save(path, "JPEG", quality=100, exif=exif)
+    return str(path)
+
+
+def test_prepare_images_resizes_and_strips_metadata(tmp_path):
+    # Given
+    src = _photo(tmp_path / "camera.jpg")
+
+    # When
+    [out] = prepare_images([src], str(tmp_path / "cache"), max_edge=2048, workers=1)
+
+    # Then
+    assert out != src
+    assert os.path.getsize(out) < os.path.getsize(src)
+    with Image.open(out) as img:
+        assert max(img.size) == 2048
+        assert not img.getexif()
+
+
+def test_prepare_images_reuses_cache_by_content(tmp_path, mocker):
+    # Given: the same bytes under two names
+    first = _photo(tmp_path / "a.jpg", size=(300, 200))
+    second = tmp_path / "b.jpg"
+    second.write_bytes(open(first, "rb").read())
+    cache_dir = str(tmp_path / "cache")
+    [cached] = prepare_images([first], cache_dir, workers=1)
+
+    # When
+    pool = mocker.patch("fb_groups_poster.images.ProcessPoolExecutor")
+    outputs = prepare_images([first, str(second)], cache_dir)
+
+    # Then
+    pool.assert_not_called()
+    assert outputs == [cached, cached]
+
+
+def test_prepare_images_keeps_transparency_as_png(tmp_path):
+    # Given
+    src = tmp_path / "logo.png"
+    Image.new("RGBA", (100, 100), (0, 0, 0, 0)).save(src)
+
+    # When
+    [out] = prepare_images([str(src)], str(tmp_path / "cache"), workers=1)
+
+    # Then
+    assert out.endswith(".png")
+    with Image.open(out) as img:
+        assert img.mode == "RGBA"
+
+
+def test_prepare_images_falls_back_to_original_on_bad_file(tmp_path):
+    # Given
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+
+    # When
+    outputs = prepare_images([str(broken)], str(tmp_path / "cache"), workers=1)
+
+    # Then
+    assert outputs == [str(broken)]
@@ -0,0 +1,69 @@
+from fb_groups_poster.journal import RunJournal
+
+
+def test_journal_records_and_resumes(tmp_path):
+    # Given
+    journal = RunJournal(str(tmp_path), "run-1", sync_every=2)
+    assert not journal.exists()
+
+    # When
+    journal.record("http://example.com/group1", True)
+    journal.record("http://example.com/group2", False, notes="Error: timeout")
+    journal.record("http://example.com/group3", True)
+    journal.close()
+
+    # Then: only posted groups count as completed
+    resumed = RunJournal(str(tmp_path), "run-1")
+    assert resumed.exists()
+    assert resumed.completed() == {"http://example.com/group1", "http://example.com/group3"}
+
+
+def test_journal_appends_across_sessions_and_ignores_torn_lines(tmp_path):
+    # Given
+    first = RunJournal(str(tmp_path), "run-2")
+    first.record("http://example.com/group1", True)
+    first.close()
+    with open(first.path, "a", encoding="utf-8") as f:
+        f.write('{"url": "http://example.com/gro')  # crash mid-write
+
+    # When
+    second = RunJournal(str(tmp_path), "run-2")
+    second.record("http://example.com/group2", True)
+    second.close()
+
+    # Then
+    assert RunJournal(str(tmp_path), "run-2").completed() == {
+        "http://example.com/group1",
+        "http://example.com/group2",
+    }
+
+
+def test_journal_tracks_campaigns_separately(tmp_path):
+    # Given
+    journal = RunJournal(str(tmp_path), "run-3")
+
+    # When
+    journal.record("http://example.com/group1", True, campaign="spring")
+    journal.record("http://example.com/group1", False, campaign="rent")
+    journal.close()
+
+    # Then
+    assert journal.completed("spring") == {"http://example.com/group1"}
+    assert journal.completed("rent") == set()
+    assert journal.completed() == set()
+
+
+def test_unconfirmed_posts_count_as_done(tmp_path):
+    # Given: a post that failed after the Post click and one that failed before it
+    journal = RunJournal(str(tmp_path), "run-4")
+    journal.record("http://example.com/group1", False, notes="unconfirmed", code="unconfirmed")
+    journal.record("http://example.com/group2", False, notes="timeout", code="timeout")
+    journal.close()
+
+    # When
+    completed = RunJournal(str(tmp_path), "run-4").completed()
+    last_posted = RunJournal.last_posted(str(tmp_path))
+
+    # Then: resume skips the unconfirmed group and the cooldown counts it
+    assert completed == {"http://example.com/group1"}
+    assert set(last_posted) == {"http://example.com/group1"}
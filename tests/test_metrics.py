@@ -0,0 +1,138 @@
+import json
+import socket
+import urllib.error
+import urllib.request
+from unittest.mock import MagicMock
+
+import pytest
+
+from fb_groups_poster.config import AppConfig, BrowserConfig, MetricsConfig, PosterConfig, RetryConfig, SheetsConfig
+from fb_groups_poster.metrics import MetricsServer, RunMetrics
+from fb_groups_poster.poster import PostResult
+from fb_groups_poster.profiling import Profiler
+from fb_groups_poster.runner import run_posting
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_render_counters_gauges_and_histograms(tmp_path):
+    # Given
+    clock = FakeClock()
+    profiler = Profiler("run-1")
+    for seconds in (0.2, 0.7, 3.0):
+        profiler.record("post.navigate", seconds)
+    profiler.record("post.submit", 1.0, error=True)
+    events = tmp_path / "events.jsonl"
+    metrics = RunMetrics("run-1", profiler, events_path=str(events), gauges={"sheets_pending_rows": lambda: 7}, clock=clock)
+
+    # When: three results and a retry over 30 seconds
+    clock.now += 10
+    metrics.post("g1", True, 2.0)
+    metrics.retry("g2", 5.0, "timeout", delay=60)
+    clock.now += 20
+    metrics.post("g2", False, 4.0, code="timeout", attempt=2)
+    metrics.post("g3", True, 1.5)
+    text = metrics.render()
+    metrics.close()
+
+    # Then
+    assert 'fbpost_run_info{run_id="run-1"} 1' in text
+    assert 'fbpost_posts_total{result="success"} 2' in text
+    assert 'fbpost_posts_total{result="error"} 1' in text
+    assert "fbpost_retries_total 1" in text
+    assert "fbpost_posts_per_second 0.1000" in text
+    assert "fbpost_sheets_pending_rows 7" in text
+    assert 'fbpost_step_seconds_bucket{step="post.navigate",le="0.5"} 1' in text
+    assert 'fbpost_step_seconds_bucket{step="post.navigate",le="5"} 3' in text
+    assert 'fbpost_step_seconds_count{step="post.navigate"} 3' in text
+    assert 'fbpost_step_errors_total{step="post.submit"} 1' in text
+    lines = [json.loads(line) for line in events.read_text(encoding="utf-8").splitlines()]
+    assert [e["event"] for e in lines] == ["post", "retry", "post", "post"]
+    assert lines[2] == {**lines[2], "run_id": "run-1", "url": "g2", "ok": False, "code": "timeout", "attempt": 2}
+
+
+def test_rate_only_counts_recent_results():
+    # Given
+    clock = FakeClock()
+    metrics = RunMetrics("run-1", clock=clock)
+    for _ in range(6):
+        metrics.post("g", True, 1.0)
+
+    # When
+    clock.now += 120
+
+    # Then
+    assert metrics.rate() == 0.0
+    assert metrics.success == 6
+
+
+def test_server_serves_metrics():
+    # Given
+    metrics = RunMetrics("run-1")
+    metrics.post("g1", True, 1.0)
+    server = MetricsServer(metrics, port=0)
+    server.start()
+    try:
+        # When
+        with urllib.request.urlopen(server.address, timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.stop()
+
+    # Then
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert 'fbpost_posts_total{result="success"} 1' in body
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_run_serves_metrics_while_posting(mocker, tmp_path):
+    # Given
+    port = _free_port()
+    events = tmp_path / "events.jsonl"
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(text="dummy text", image_paths=[], filter_tags=["tag1"]),
+        cache_dir=str(tmp_path),
+        retry=RetryConfig(max_attempts=1),
+        metrics=MetricsConfig(port=port, events_path=str(events)),
+    )
+    links = ["http://example.com/group1", "http://example.com/group2", "http://example.com/group3"]
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', return_value=links)
+    mocker.patch('fb_groups_poster.runner._launch_browsers', return_value=[MagicMock()])
+    scrapes = []
+
+    def post(driver, client, url, *args, **kwargs):
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            scrapes.append(response.read().decode("utf-8"))
+        return PostResult(url != links[1], "" if url != links[1] else "not_member")
+
+    mocker.patch('fb_groups_poster.runner.post_to_group', side_effect=post)
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: each scrape sees the results so far; the endpoint is gone after the run
+    assert not ok
+    assert 'fbpost_posts_total{result="success"} 0' in scrapes[0]
+    assert "fbpost_active_browsers 1" in scrapes[0]
+    assert "fbpost_posts_planned 3" in scrapes[0]
+    assert 'fbpost_posts_total{result="success"} 1' in scrapes[2]
+    assert 'fbpost_posts_total{result="error"} 1' in scrapes[2]
+    with pytest.raises(urllib.error.URLError):
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5)
+    kinds = [json.loads(line)["event"] for line in events.read_text(encoding="utf-8").splitlines()]
+    assert kinds == ["started", "post", "post", "post", "finished"]
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+from fb_groups_poster.config import AppConfig, SheetsConfig, BrowserConfig, PosterConfig
+from fb_groups_poster.orchestrator import run_posting_async
+from fb_groups_poster.poster import PostResult
+
+
+def _config(tmp_path, workers=1):
+    return AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir", workers=workers),
+        poster=PosterConfig(text="dummy text", image_paths=[], filter_tags=["tag1"]),
+        cache_dir=str(tmp_path),
+    )
+
+
+def _patch_run(mocker, links, launch):
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', side_effect=links)
+    mocker.patch('fb_groups_poster.orchestrator._launch_browsers', side_effect=launch)
+    return mocker.patch('fb_groups_poster.runner.post_to_group', return_value=PostResult(True))
+
+
+def test_browser_launch_overlaps_group_fetch(mocker, tmp_path):
+    # Given: fetching groups only completes once the browser launch has started
+    launching = threading.Event()
+    driver = MagicMock()
+
+    def launch(cfg, workers, clones, profiles=None):
+        launching.set()
+        return [driver]
+
+    def links(*args, **kwargs):
+        assert launching.wait(5), "browser launch did not start before the group fetch finished"
+        return ["http://example.com/group1", "http://example.com/group2"]
+
+    mock_post = _patch_run(mocker, links, launch)
+
+    # When
+    ok = asyncio.run(run_posting_async(_config(tmp_path), assume_yes=True))
+
+    # Then
+    assert ok
+    assert [call.args[2] for call in mock_post.call_args_list] == ["http://example.com/group1", "http://example.com/group2"]
+    driver.quit.assert_called_once()
+
+
+def test_surplus_browsers_are_shut_down(mocker, tmp_path):
+    # Given: three workers configured but only one group to post to
+    drivers = [MagicMock(), MagicMock(), MagicMock()]
+    mock_post = _patch_run(mocker, lambda *a, **k: ["http://example.com/group1"], lambda cfg, workers, clones, profiles=None: list(drivers))
+
+    # When
+    ok = asyncio.run(run_posting_async(_config(tmp_path, workers=3), assume_yes=True))
+
+    # Then
+    assert ok
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.args[0] is drivers[0]
+    for driver in drivers:
+        driver.quit.assert_called_once()
+
+
+def test_launched_browser_is_discarded_when_no_groups_match(mocker, tmp_path):
+    # Given
+    driver = MagicMock()
+    mock_post = _patch_run(mocker, lambda *a, **k: [], lambda cfg, workers, clones, profiles=None: [driver])
+
+    # When
+    ok = asyncio.run(run_posting_async(_config(tmp_path), assume_yes=True))
+
+    # Then
+    assert not ok
+    mock_post.assert_not_called()
+    driver.quit.assert_called_once()
+
+
+def test_offline_run_sets_up_sheets_after_reading_groups(mocker, tmp_path):
+    # Given
+    steps = []
+
+    def links(client, *args, **kwargs):
+        steps.append(("groups", client))
+        return ["http://example.com/group1"]
+
+    mock_post = _patch_run(mocker, links, lambda cfg, workers, clones, profiles=None: [MagicMock()])
+    mocker.patch('fb_groups_poster.runner.init_sheets', side_effect=lambda *a: steps.append("sheets") or MagicMock())
+
+    # When
+    ok = asyncio.run(run_posting_async(_config(tmp_path), assume_yes=True, offline=True))
+
+    # Then
+    assert ok
+    assert steps == [("groups", None), "sheets"]
+    assert mock_post.call_count == 1
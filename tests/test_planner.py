@@ -0,0 +1,52 @@
+from unittest.mock import MagicMock
+
+from fb_groups_poster.config import AppConfig, BrowserConfig, Campaign, PosterConfig, SheetsConfig
+from fb_groups_poster.planner import plan_visits, post_count
+from fb_groups_poster.poster import PostResult
+from fb_groups_poster.runner import run_posting
+from fb_groups_poster.tag_index import TagIndex
+
+
+def test_plan_visits_merges_overlapping_campaigns():
+    # Given
+    spring = Campaign(text="spring", name="spring")
+    rent = Campaign(text="rent", name="rent")
+
+    # When
+    visits = plan_visits([(spring, ["g1", "g2"]), (rent, ["g2", "g3"])])
+
+    # Then: one visit per unique group, campaigns in config order
+    assert [v.url for v in visits] == ["g1", "g2", "g3"]
+    assert [c.name for c in visits[1].campaigns] == ["spring", "rent"]
+    assert post_count(visits) == 4
+
+
+def test_run_loads_each_group_once_for_all_campaigns(mocker, tmp_path):
+    # Given
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(campaigns=[
+            Campaign(text="first", filter_tags=["rent"], name="a"),
+            Campaign(text="second", filter_tags=["studio"], name="b"),
+        ]),
+        cache_dir=str(tmp_path),
+    )
+    index = TagIndex([("g1", "rent"), ("g2", "rent, studio"), ("g3", "studio")])
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.load_group_index', return_value=index)
+    mocker.patch('fb_groups_poster.runner._launch_browsers', return_value=[MagicMock()])
+    mock_post = mocker.patch('fb_groups_poster.runner.post_to_group', return_value=PostResult(True))
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: four posts, but only three page loads
+    assert ok
+    calls = [(c.args[2], c.args[3], c.kwargs["navigate"]) for c in mock_post.call_args_list]
+    assert calls == [
+        ("g1", "first", True),
+        ("g2", "first", True),
+        ("g2", "second", False),
+        ("g3", "second", True),
+    ]
@@ -0,0 +1,92 @@
+from unittest.mock import Mock
+
+from selenium.common.exceptions import TimeoutException
+
+from fb_groups_poster.poster import PostResult, post_to_group
+from fb_groups_poster.retry import is_transient
+
+
+def test_dead_group_fails_fast_with_code():
+    # Given: the page classifier reports a group the account is not a member of
+    driver = Mock()
+    driver.execute_script.return_value = "not_member"
+    client = Mock()
+
+    # When
+    result = post_to_group(driver, client, "http://example.com/group1", "Hello", [], "run-1")
+
+    # Then: one navigation, one script call, no selector waits
+    assert not result
+    assert result.code == "not_member"
+    driver.get.assert_called_once_with("http://example.com/group1")
+    assert driver.execute_script.call_count == 1
+    driver.find_elements.assert_not_called()
+    assert client.log_row.call_args.kwargs["notes"].startswith("Error [not_member]")
+
+
+def test_post_result_is_truthy_only_when_ok():
+    # Given
+    posted = PostResult(True)
+    failed = PostResult(False, "timeout", "Create-post input not found")
+
+    # Then
+    assert posted
+    assert not failed
+
+
+def test_failure_after_post_click_is_unconfirmed(mocker):
+    # Given: the composer works, but the "Posting" indicator never shows up after the click
+    post_button = Mock()
+    mocker.patch("fb_groups_poster.poster.page_state", return_value="ok")
+    mocker.patch("fb_groups_poster.poster._find_with_cache", return_value=Mock())
+    mocker.patch("fb_groups_poster.poster.insert_text", return_value="exec_command")
+    mocker.patch("fb_groups_poster.poster.climb_and_query", return_value=Mock())
+    mocker.patch(
+        "fb_groups_poster.poster.wait_until",
+        side_effect=["Hello", (None, Mock()), post_button, TimeoutException("no spinner")],
+    )
+    client = Mock()
+
+    # When
+    result = post_to_group(Mock(), client, "http://example.com/group1", "Hello", ["a.jpg"], "run-1")
+
+    # Then: not a timeout, so the run does not retry (and double-post) it
+    post_button.click.assert_called_once()
+    assert result.code == "unconfirmed"
+    assert not is_transient(result.code)
+    assert client.log_row.call_args.kwargs["notes"].startswith("Error [unconfirmed]")
+
+
+def test_composer_waits_for_a_preview_per_image(mocker):
+    # Given: Post is already enabled, but only one of two previews has rendered
+    from fb_groups_poster.poster import ATTACHMENT_PREVIEW_XPATH, _composer_ready
+    post_button = Mock()
+    previews = [[Mock()], [Mock(), Mock()]]
+    driver = Mock()
+    driver.find_elements.side_effect = lambda by, xpath: previews.pop(0) if xpath == ATTACHMENT_PREVIEW_XPATH else []
+    driver.execute_script.return_value = [0, post_button]
+    ready = _composer_ready(2)
+
+    # When
+    first = ready(driver)
+    second = ready(driver)
+
+    # Then
+    assert first is False
+    assert second is post_button
+
+
+def test_images_only_post_does_not_wait_for_text(mocker):
+    # Given
+    mocker.patch("fb_groups_poster.poster.page_state", return_value="ok")
+    mocker.patch("fb_groups_poster.poster._find_with_cache", return_value=Mock())
+    mocker.patch("fb_groups_poster.poster.insert_text", return_value="exec_command")
+    mocker.patch("fb_groups_poster.poster.climb_and_query", return_value=Mock())
+    wait = mocker.patch("fb_groups_poster.poster.wait_until", side_effect=[(None, Mock()), Mock(), Mock(), None])
+
+    # When
+    result = post_to_group(Mock(), Mock(), "http://example.com/group1", "  ", ["a.jpg"], "run-1")
+
+    # Then: photo button, composer, posting started and finished; no editor-text wait
+    assert result
+    assert wait.call_count == 4
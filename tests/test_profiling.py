@@ -0,0 +1,48 @@
+import csv
+import json
+import pytest
+from fb_groups_poster.profiling import Profiler, find_profile, summarize
+
+
+def test_spans_and_summary():
+    # Given
+    profiler = Profiler("run-1")
+
+    # When
+    with profiler.span("post.navigate"):
+        pass
+    with pytest.raises(RuntimeError):
+        with profiler.span("post.navigate"):
+            raise RuntimeError("boom")
+    for seconds in [1.0, 2.0, 3.0, 4.0]:
+        profiler.record("post.total", seconds)
+
+    # Then
+    summary = profiler.summary()
+    assert summary["post.navigate"]["count"] == 2
+    assert summary["post.navigate"]["errors"] == 1
+    assert summary["post.total"] == {
+        "count": 4, "errors": 0, "total": 10.0, "p50": 2.0, "p95": 4.0, "p99": 4.0, "max": 4.0,
+    }
+
+
+def test_export_and_find(tmp_path):
+    # Given
+    profiler = Profiler("run-2")
+    profiler.record("sheets.init", 0.5)
+
+    # When
+    path = profiler.export(str(tmp_path))
+
+    # Then
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["run_id"] == "run-2"
+    assert summarize(data["durations"])["sheets.init"]["p50"] == 0.5
+    with open(tmp_path / "run-2.csv", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["step", "count", "errors", "total", "p50", "p95", "p99", "max"]
+    assert rows[1][:2] == ["sheets.init", "1"]
+    assert find_profile(str(tmp_path), "run-2") == path
+    assert find_profile(str(tmp_path), "latest") == path
+    assert find_profile(str(tmp_path), "missing") is None
@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock
+
+from fb_groups_poster.config import AppConfig, BrowserConfig, PosterConfig, RetryConfig, SheetsConfig
+from fb_groups_poster.poster import PostResult
+from fb_groups_poster.retry import RetryQueue, is_transient
+from fb_groups_poster.runner import run_posting
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_classifies_failures():
+    # Given
+    codes = ["timeout", "error", "not_member", "login", "unconfirmed"]
+
+    # When
+    transient = [code for code in codes if is_transient(code)]
+
+    # Then: only failures before the Post click that may pass next time
+    assert transient == ["timeout", "error"]
+
+
+def test_retry_backs_off_exponentially():
+    # Given
+    clock = FakeClock()
+    retries = RetryQueue(max_attempts=4, base_delay=10, max_delay=25, budget=1000, clock=clock)
+
+    # When
+    retries.push("a", attempt=1)
+    retries.push("b", attempt=2)
+    retries.push("c", attempt=3)
+
+    # Then: due after 10s, 20s and 25s (capped)
+    clock.now = 9
+    assert retries.pop_due() is None
+    clock.now = 10
+    assert retries.pop_due() == ("a", 2)
+    clock.now = 20
+    assert retries.pop_due() == ("b", 3)
+    assert retries.next_due_in() == 5
+    clock.now = 25
+    assert retries.pop_due() == ("c", 4)
+
+
+def test_retry_respects_attempt_limit_and_budget():
+    # Given
+    clock = FakeClock()
+    retries = RetryQueue(max_attempts=3, base_delay=60, budget=100, clock=clock)
+
+    # Then
+    assert retries.push("a", attempt=1)
+    assert not retries.push("b", attempt=3)
+    clock.now = 50
+    assert not retries.push("c", attempt=1)  # would be due at 110, past the budget
+    assert len(retries) == 1
+
+
+def test_run_retries_transient_failures_at_the_end(mocker, tmp_path):
+    # Given: g1 times out once, then succeeds; g2 is a dead group
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(text="hello", filter_tags=["rent"]),
+        cache_dir=str(tmp_path),
+        retry=RetryConfig(base_delay=0),
+    )
+    outcomes = {"g1": [PostResult(False, "timeout"), PostResult(True)], "g2": [PostResult(False, "not_member")]}
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', return_value=["g1", "g2", "g3"])
+    mocker.patch('fb_groups_poster.runner._launch_browsers', return_value=[MagicMock()])
+    mock_post = mocker.patch(
+        'fb_groups_poster.runner.post_to_group',
+        side_effect=lambda driver, client, url, *a, **k: outcomes.get(url, [PostResult(True)]).pop(0),
+    )
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: g1 is retried after the other groups, g2 is not retried
+    assert not ok
+    assert [c.args[2] for c in mock_post.call_args_list] == ["g1", "g2", "g3", "g1"]
@@ -0,0 +1,180 @@
+import os
+import threading
+import time
+from unittest.mock import MagicMock
+
+from fb_groups_poster.cache import GroupsCache
+from fb_groups_poster.config import AppConfig, BrowserConfig, Campaign, PacingConfig, PosterConfig, RetryConfig, SheetsConfig
+from fb_groups_poster.poster import PostResult
+from fb_groups_poster.runner import run_posting
+from fb_groups_poster.tag_index import TagIndex
+
+
+def test_run_restamps_groups_cache_after_tracker_writes(mocker, tmp_path):
+    # Given: a cached Groups sheet that matches the spreadsheet before the run
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(text="hello", filter_tags=["rent"]),
+        cache_dir=str(tmp_path),
+    )
+    cache = GroupsCache(str(tmp_path), "dummy_id", cfg.sheets.groups_sheet)
+    cache.save("before-run", [("g1", "rent")])
+    sheets = MagicMock()
+    # The run's tracker rows bump the spreadsheet's modification time
+    sheets.spreadsheet.get_lastUpdateTime.side_effect = ["before-run", "after-run"]
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=sheets)
+    mocker.patch('fb_groups_poster.runner._launch_browsers', return_value=[MagicMock()])
+    mocker.patch('fb_groups_poster.runner.post_to_group', return_value=PostResult(True))
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: served from the cache, which now matches the spreadsheet after the run
+    assert ok
+    sheets.groups_ws.row_values.assert_not_called()
+    assert cache.load()["modified"] == "after-run"
+    assert cache.load()["rows"] == [["g1", "rent"]]
+
+
+def test_parallel_workers_share_one_queue_and_clean_up_clones(mocker, tmp_path):
+    # Given: three browsers on cloned profiles, seven groups, one of them dead
+    user_data = tmp_path / "User Data"
+    (user_data / "Default").mkdir(parents=True)
+    (user_data / "Default" / "Cookies").write_text("cookies")
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir=str(user_data), workers=3),
+        poster=PosterConfig(text="hello", filter_tags=["rent"]),
+        cache_dir=str(tmp_path / "cache"),
+        retry=RetryConfig(max_attempts=1),
+    )
+    links = [f"http://example.com/group{i}" for i in range(1, 8)]
+    launched = []
+    drivers = []
+
+    def build(browser_cfg, **kwargs):
+        assert os.path.isdir(browser_cfg.edge_profile_dir)
+        launched.append(browser_cfg.edge_profile_dir)
+        drivers.append(MagicMock(name=f"driver{len(drivers) + 1}"))
+        return drivers[-1]
+
+    visited = []
+    lock = threading.Lock()
+
+    def post(driver, client, url, *args, **kwargs):
+        time.sleep(0.01)
+        with lock:
+            visited.append((driver, url))
+        return PostResult(url != links[3], "ok" if url != links[3] else "not_member")
+
+    sheets = MagicMock()
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=sheets)
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', return_value=links)
+    mocker.patch('fb_groups_poster.runner.live_session_address', return_value=None)
+    build_edge = mocker.patch('fb_groups_poster.runner.build_edge', side_effect=build)
+    mocker.patch('fb_groups_poster.runner.post_to_group', side_effect=post)
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: every group visited exactly once, results counted across workers
+    assert not ok
+    assert sorted(url for _, url in visited) == sorted(links)
+    assert build_edge.call_count == 3
+    assert {driver for driver, _ in visited} <= set(drivers)
+    finished = [c.kwargs for c in sheets.log_row.call_args_list if c.kwargs["content"] == "Auto Poster Finished"]
+    assert finished[0]["details"] == "Completed. Success: 6, Errors: 1"
+    # Then: every session is closed and no cloned profile is left behind
+    for driver in drivers:
+        driver.quit.assert_called_once()
+    assert len(set(launched)) == 3
+    assert all(path != str(user_data) and not os.path.exists(path) for path in launched)
+    assert (user_data / "Default" / "Cookies").exists()
+
+
+def test_run_stops_on_login_wall(mocker, tmp_path):
+    # Given
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(text="hello", filter_tags=["rent"]),
+        cache_dir=str(tmp_path),
+    )
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', return_value=["g1", "g2", "g3"])
+    mocker.patch('fb_groups_poster.runner._launch_browsers', return_value=[MagicMock()])
+    mock_post = mocker.patch('fb_groups_poster.runner.post_to_group', return_value=PostResult(False, "login"))
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: the remaining groups are left for --resume
+    assert not ok
+    assert mock_post.call_count == 1
+
+
+def test_group_cooldown_gates_the_visit_not_each_campaign(mocker, tmp_path):
+    # Given: a day-long group cooldown, two campaigns in one group, the second one timing out once
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(campaigns=[
+            Campaign(text="first", filter_tags=["rent"], name="a"),
+            Campaign(text="second", filter_tags=["rent"], name="b"),
+        ]),
+        cache_dir=str(tmp_path),
+        pacing=PacingConfig(group_cooldown_hours=24),
+        retry=RetryConfig(base_delay=0),
+    )
+    index = TagIndex([("g1", "rent")])
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.load_group_index', return_value=index)
+    mocker.patch('fb_groups_poster.runner._launch_browsers', return_value=[MagicMock()])
+    sleep = mocker.patch('fb_groups_poster.scheduler.Clock.sleep')
+    results = iter([PostResult(True), PostResult(False, "timeout"), PostResult(True)])
+    mock_post = mocker.patch('fb_groups_poster.runner.post_to_group', side_effect=lambda *a, **k: next(results))
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: neither the second campaign nor its retry waits out the cooldown the first post started
+    assert ok
+    assert [c.args[3] for c in mock_post.call_args_list] == ["first", "second", "second"]
+    sleep.assert_not_called()
+
+
+def test_offline_run_reads_groups_before_contacting_google(mocker, tmp_path):
+    # Given
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(text="hello", filter_tags=["rent"]),
+        cache_dir=str(tmp_path),
+    )
+    steps = []
+
+    def links(client, *args, **kwargs):
+        steps.append(("groups", client))
+        return ["g1"]
+
+    init = mocker.patch('fb_groups_poster.runner.init_sheets', side_effect=lambda *a: steps.append("sheets") or MagicMock())
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', side_effect=links)
+    mocker.patch('fb_groups_poster.runner._launch_browsers', return_value=[MagicMock()])
+    mocker.patch('fb_groups_poster.runner.post_to_group', return_value=PostResult(True))
+    mocker.patch('fb_groups_poster.runner.click.confirm', return_value=False)
+
+    # When: the user declines the group list
+    declined = run_posting(cfg, offline=True)
+
+    # Then: Google was never contacted
+    assert not declined
+    assert steps == [("groups", None)]
+    init.assert_not_called()
+
+    # When
+    ok = run_posting(cfg, assume_yes=True, offline=True)
+
+    # Then: Sheets is only set up for the tracker, after the groups were read from the cache
+    assert ok
+    assert steps[1:] == [("groups", None), "sheets"]
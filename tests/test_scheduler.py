@@ -0,0 +1,135 @@
+from fb_groups_poster.journal import RunJournal
+from fb_groups_poster.scheduler import Scheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self, start=1_000_000.0):
+        self.now = start
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_spaces_calls_after_burst():
+    # Given: 1 token per 10s, burst of 2
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.1, capacity=2, clock=clock)
+
+    # When
+    waits = [bucket.reserve() for _ in range(4)]
+
+    # Then
+    assert waits == [0.0, 0.0, 10.0, 20.0]
+
+
+def test_acquire_enforces_hourly_budget():
+    # Given: 360 posts/hour = one every 10s
+    clock = FakeClock()
+    scheduler = Scheduler(posts_per_hour=360, clock=clock)
+
+    # When
+    for i in range(4):
+        scheduler.acquire(f"g{i}")
+
+    # Then
+    assert clock.slept == [10.0, 10.0, 10.0]
+
+
+def test_plan_orders_by_cooldown_and_spreads_over_workers():
+    # Given: g1 was posted to 30 minutes ago with a 1 hour cooldown
+    clock = FakeClock()
+    scheduler = Scheduler(
+        posts_per_hour=120,
+        cooldown=3600,
+        last_posted={"g1": clock.time() - 1800},
+        workers=2,
+        clock=clock,
+    )
+
+    # When
+    slots = scheduler.plan([("g1", 1), ("g2", 1), ("g3", 2)], post_seconds=60)
+
+    # Then: g1 goes last, fresh groups start as soon as tokens allow
+    assert [s.url for s in slots] == ["g2", "g3", "g1"]
+    assert [s.at for s in slots] == [0.0, 30.0, 1800.0]
+
+
+def test_acquire_waits_out_group_cooldown():
+    # Given
+    clock = FakeClock()
+    scheduler = Scheduler(cooldown=600, last_posted={"g1": clock.time() - 100}, clock=clock)
+
+    # When
+    waited = scheduler.acquire("g1")
+
+    # Then
+    assert waited == 500
+
+
+def test_acquire_without_cooldown_only_takes_a_budget_slot():
+    # Given: g1 was just posted to in this visit
+    clock = FakeClock()
+    scheduler = Scheduler(posts_per_hour=360, cooldown=86400, clock=clock)
+    scheduler.acquire("g1")
+    scheduler.report("g1", True)
+
+    # When
+    waited = scheduler.acquire("g1", cooldown=False)
+
+    # Then
+    assert waited == 10.0
+
+
+def test_error_spike_backs_off_and_clean_window_recovers():
+    # Given
+    clock = FakeClock()
+    scheduler = Scheduler(posts_per_hour=600, clock=clock, error_window=4, error_threshold=0.5)
+
+    # When: three of four posts fail
+    for ok in [False, True, False, False]:
+        scheduler.report("g", ok)
+    slowed = scheduler.posts_per_hour
+    for _ in range(4):
+        scheduler.report("g", True)
+    recovered = scheduler.posts_per_hour
+
+    # Then
+    assert slowed == 300
+    assert recovered == 450
+
+
+def test_unpaced_run_measures_rate_on_first_spike():
+    # Given: no budget, one post every 6s
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock, error_window=4)
+
+    # When
+    for ok in [True, False, False, False]:
+        scheduler.report("g", ok)
+        clock.now += 6
+
+    # Then: slowed to half of the measured rate
+    assert scheduler.posts_per_hour is not None
+    assert round(scheduler.posts_per_hour) == 400
+
+
+def test_last_posted_from_journals(tmp_path):
+    # Given
+    first = RunJournal(str(tmp_path), "run-a")
+    first.record("g1", True)
+    first.record("g2", False)
+    first.close()
+
+    # When
+    history = RunJournal.last_posted(str(tmp_path))
+
+    # Then
+    assert set(history) == {"g1"}
@@ -0,0 +1,57 @@
+from fb_groups_poster.selector_cache import SelectorCache
+
+CANDIDATES = ["first", "second", "third"]
+
+
+def test_order_prefers_recent_winner():
+    # Given
+    cache = SelectorCache()
+    assert cache.order("create_post", CANDIDATES) == CANDIDATES
+
+    # When: "third" wins after the two others were checked and missed
+    for _ in range(3):
+        ordered = cache.order("create_post", CANDIDATES)
+        cache.record("create_post", ordered, ordered.index("third"), latency=0.4)
+
+    # Then
+    assert cache.order("create_post", CANDIDATES)[0] == "third"
+
+
+def test_order_relearns_after_ui_change():
+    # Given: "first" has won many times
+    cache = SelectorCache()
+    for _ in range(20):
+        cache.record("create_post", CANDIDATES, 0, latency=0.2)
+
+    # When: the UI changes and only "second" matches
+    for _ in range(3):
+        ordered = cache.order("create_post", CANDIDATES)
+        cache.record("create_post", ordered, ordered.index("second"), latency=0.3)
+
+    # Then
+    assert cache.order("create_post", CANDIDATES)[0] == "second"
+
+
+def test_per_group_history_takes_precedence():
+    # Given
+    cache = SelectorCache(per_group=True)
+    for _ in range(5):
+        cache.record("text_area", CANDIDATES, 0, group="http://example.com/a")
+    cache.record("text_area", ["third"], 0, group="http://example.com/b")
+
+    # Then
+    assert cache.order("text_area", CANDIDATES, group="http://example.com/b")[0] == "third"
+    assert cache.order("text_area", CANDIDATES, group="http://example.com/c")[0] == "first"
+
+
+def test_persistence(tmp_path):
+    # Given
+    path = str(tmp_path / "selector-stats.json")
+    cache = SelectorCache(path=path)
+    cache.record("create_post", CANDIDATES, 2)
+
+    # When
+    cache.save()
+
+    # Then
+    assert SelectorCache(path=path).order("create_post", CANDIDATES)[0] == "third"
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import Mock, call
-from fb_groups_poster.sheets import get_filtered_group_links, SheetsClient
+from fb_groups_poster.sheets import get_filtered_group_links, SheetsClient, TrackerWriter
 
 @pytest.fixture
 def mock_sheets_client(mocker):
@@ -10,17 +10,36 @@ def mock_sheets_client(mocker):
     mock_client.tracker_ws = mocker.Mock()
     return mock_client
 
+def serve_rows(ws, rows):
+    """Answer ``row_values``/``batch_get`` from a list of sheet rows (header first)."""
+    from gspread.utils import a1_to_rowcol
+
+    def batch_get(ranges):
+        result = []
+        for a1 in ranges:
+            start, end = a1.split(":")
+            (r0, c0), (r1, c1) = a1_to_rowcol(start), a1_to_rowcol(end)
+            values = [row[c0 - 1 : c1] for row in rows[r0 - 1 : r1]]
+            while values and not any(values[-1]):
+                values.pop()
+            result.append(values)
+        return result
+
+    ws.row_values.side_effect = lambda n: rows[n - 1]
+    ws.batch_get.side_effect = batch_get
+    ws.row_count = len(rows)
+
 def test_get_filtered_group_links(mock_sheets_client):
     # Given
-    mock_data = [
-        {"Group Link": "http://example.com/group1", "Tags": "rent, studio"},
-        {"Group Link": "http://example.com/group2", "Tags": "rent"},
-        {"Group Link": "http://example.com/group3", "Tags": "sale, apartment"},
-        {"Group Link": "http://example.com/group4", "Tags": "rent, studio, pet-friendly"},
-        {"Group Link": " ", "Tags": "rent, studio"}, # Empty link
-        {"Group Link": "http://example.com/group6", "Tags": ""}, # Empty tags
-    ]
-    mock_sheets_client.groups_ws.get_all_records.return_value = mock_data
+    serve_rows(mock_sheets_client.groups_ws, [
+        ["Group Link", "Tags"],
+        ["http://example.com/group1", "rent, studio"],
+        ["http://example.com/group2", "rent"],
+        ["http://example.com/group3", "sale, apartment"],
+        ["http://example.com/group4", "rent, studio, pet-friendly"],
+        [" ", "rent, studio"], # Empty link
+        ["http://example.com/group6"], # Empty tags
+    ])
 
     # Test case 1: Filter by 'rent' and 'studio'
     # When
@@ -52,6 +71,53 @@ def test_get_filtered_group_links(mock_sheets_client):
         "http://example.com/group6",
     ]
 
+def test_iter_group_rows_reads_only_needed_columns_in_chunks():
+    # Given: a wide sheet with the tags before the links, and a blank row
+    from fb_groups_poster.sheets import iter_group_rows
+    ws = Mock()
+    rows = [["Notes", "Tags", "Owner", "Group Link", "Members"]]
+    rows += [[f"note {i}", f"tag{i % 2}", "me", f"http://example.com/group{i}", "1000"] for i in range(1, 6)]
+    rows.insert(3, ["just a note", "", "", "", ""])
+    serve_rows(ws, rows)
+
+    # When
+    groups = iter_group_rows(ws, chunk_rows=2)
+
+    # Then: a lazy generator; nothing is fetched until it is consumed
+    ws.row_values.assert_not_called()
+    assert list(groups) == [(f"http://example.com/group{i}", f"tag{i % 2}") for i in range(1, 6)]
+    ws.row_values.assert_called_once_with(1)
+    # 6 data rows in chunks of 2, only columns D and B
+    assert [c.args[0] for c in ws.batch_get.call_args_list] == [
+        ["D2:D3", "B2:B3"], ["D4:D5", "B4:B5"], ["D6:D7", "B6:B7"],
+    ]
+
+def test_iter_group_rows_reads_past_blank_chunks():
+    # Given: a gap of blank rows longer than a chunk, then more groups
+    from fb_groups_poster.sheets import iter_group_rows
+    ws = Mock()
+    rows = [["Group Link", "Tags"], ["http://example.com/group1", "rent"]]
+    rows += [["", ""]] * 5
+    rows += [["http://example.com/group2", "rent"]]
+    serve_rows(ws, rows)
+
+    # When
+    groups = list(iter_group_rows(ws, chunk_rows=2))
+
+    # Then
+    assert groups == [("http://example.com/group1", "rent"), ("http://example.com/group2", "rent")]
+    assert ws.batch_get.call_count == 4
+
+def test_iter_group_rows_without_tags_column():
+    # Given
+    from fb_groups_poster.sheets import iter_group_rows
+    ws = Mock()
+    serve_rows(ws, [["Group Link"], ["http://example.com/group1"]])
+
+    # Then
+    assert list(iter_group_rows(ws)) == [("http://example.com/group1", "")]
+    assert ws.batch_get.call_args.args[0] == ["A2:A2001"]
+
 def test_log_row(mocker):
     # Given
     # Patch datetime.now to have a predictable value
@@ -74,9 +140,14 @@ def test_log_row(mocker):
         notes="Test Notes",
         run_id="test-run-123"
     )
+    # Then: the row is buffered until the batch is flushed
+    mock_tracker_ws.append_rows.assert_not_called()
+
+    # When
+    client.flush()
 
     # Then
-    mock_tracker_ws.append_row.assert_called_once_with([
+    mock_tracker_ws.append_rows.assert_called_once_with([[
         "Test Content",
         "Test Type",
         "Test Details",
@@ -84,4 +155,209 @@ def test_log_row(mocker):
         "MM/DD/YYYY HH:MM:SS",
         "Test Notes",
         "test-run-123",
+    ]])
+
+def test_tracker_writer_flushes_on_batch_size():
+    # Given
+    ws = Mock()
+    writer = TrackerWriter(ws, batch_size=3, flush_interval=3600)
+
+    # When
+    for i in range(7):
+        writer.add([f"row{i}"])
+
+    # Then: two full batches written, one row still pending
+    assert ws.append_rows.call_args_list == [
+        call([["row0"], ["row1"], ["row2"]]),
+        call([["row3"], ["row4"], ["row5"]]),
+    ]
+    assert writer.pending == 1
+
+    # When
+    writer.flush()
+    writer.flush()
+
+    # Then: the final flush writes the remainder once; empty flushes make no API call
+    assert ws.append_rows.call_count == 3
+    assert ws.append_rows.call_args == call([["row6"]])
+
+def test_tracker_writer_flushes_on_interval(mocker):
+    # Given
+    clock = mocker.patch("fb_groups_poster.sheets.time.monotonic", return_value=100.0)
+    ws = Mock()
+    writer = TrackerWriter(ws, batch_size=50, flush_interval=10)
+
+    # When
+    writer.add(["early"])
+    clock.return_value = 111.0
+    writer.add(["late"])
+
+    # Then
+    ws.append_rows.assert_called_once_with([["early"], ["late"]])
+
+def test_tracker_writer_keeps_rows_on_failure():
+    # Given
+    ws = Mock()
+    ws.append_rows.side_effect = [RuntimeError("quota"), None]
+    writer = TrackerWriter(ws, batch_size=50, flush_interval=3600)
+    writer.add(["a"])
+
+    # When / Then
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    assert writer.pending == 1
+    writer.flush()
+    assert ws.append_rows.call_args == call([["a"]])
+    assert writer.pending == 0
+
+def test_tracker_writer_backs_off_after_failure(mocker):
+    # Given: a Sheet that rejects every write
+    clock = mocker.patch("fb_groups_poster.sheets.time.monotonic", return_value=100.0)
+    ws = Mock()
+    ws.append_rows.side_effect = RuntimeError("quota")
+    writer = TrackerWriter(ws, batch_size=3, flush_interval=10)
+
+    # When: many rows arrive right after the first failed batch
+    for i in range(50):
+        try:
+            writer.add([f"row{i}"])
+        except RuntimeError:
+            pass
+
+    # Then: one API call, every row kept
+    assert ws.append_rows.call_count == 1
+    assert writer.pending == 50
+
+    # When: the interval passes, then the doubled delay
+    clock.return_value = 111.0
+    with pytest.raises(RuntimeError):
+        writer.add(["row50"])
+    clock.return_value = 125.0
+    writer.add(["row51"])
+    calls_before_delay = ws.append_rows.call_count
+    clock.return_value = 132.0
+    ws.append_rows.side_effect = None
+    writer.add(["row52"])
+
+    # Then: retried once per back-off, and everything written once the Sheet recovers
+    assert calls_before_delay == 2
+    assert ws.append_rows.call_count == 3
+    assert len(ws.append_rows.call_args.args[0]) == 53
+    assert writer.pending == 0
+
+def test_tracker_writer_background_drains_on_close():
+    # Given
+    ws = Mock()
+    writer = TrackerWriter(ws, batch_size=2, flush_interval=3600, queue_size=2)
+    writer.start()
+
+    # When
+    for i in range(5):
+        writer.add([f"row{i}"])
+    writer.close(timeout=5)
+
+    # Then: every row is written exactly once, in order
+    written = [row for c in ws.append_rows.call_args_list for row in c.args[0]]
+    assert written == [[f"row{i}"] for i in range(5)]
+    assert writer.pending == 0
+
+def test_tracker_writer_background_does_not_block_producer():
+    # Given: a Sheets API call that takes a while
+    import threading
+    release = threading.Event()
+    ws = Mock()
+    ws.append_rows.side_effect = lambda rows: release.wait(5)
+    writer = TrackerWriter(ws, batch_size=1, flush_interval=3600, queue_size=10)
+    writer.start()
+
+    # When
+    writer.add(["slow"])
+    writer.add(["queued"])
+
+    # Then: add() returned while the first write is still in flight
+    assert not release.is_set()
+    release.set()
+    writer.close(timeout=5)
+    assert ws.append_rows.call_count == 2
+
+def test_get_filtered_group_links_uses_cache(tmp_path, mock_sheets_client):
+    # Given
+    from fb_groups_poster.cache import GroupsCache
+    cache = GroupsCache(str(tmp_path), "sheet-id", "Groups", ttl=0)
+    mock_sheets_client.spreadsheet = Mock()
+    mock_sheets_client.spreadsheet.get_lastUpdateTime.return_value = "2026-01-01T00:00:00Z"
+    serve_rows(mock_sheets_client.groups_ws, [
+        ["Group Link", "Tags"],
+        ["http://example.com/group1", "rent, studio"],
+        ["http://example.com/group2", "rent"],
     ])
+
+    # When: first run downloads, second run with an unchanged sheet hits the cache
+    first = get_filtered_group_links(mock_sheets_client, ["rent"], cache=cache)
+    second = get_filtered_group_links(mock_sheets_client, ["studio"], cache=cache)
+
+    # Then
+    assert first == ["http://example.com/group1", "http://example.com/group2"]
+    assert second == ["http://example.com/group1"]
+    assert mock_sheets_client.groups_ws.row_values.call_count == 1
+
+    # When: the spreadsheet changed
+    mock_sheets_client.spreadsheet.get_lastUpdateTime.return_value = "2026-01-02T00:00:00Z"
+    get_filtered_group_links(mock_sheets_client, ["rent"], cache=cache)
+    # Then
+    assert mock_sheets_client.groups_ws.row_values.call_count == 2
+
+    # When: forced refresh
+    get_filtered_group_links(mock_sheets_client, ["rent"], cache=cache, refresh=True)
+    # Then
+    assert mock_sheets_client.groups_ws.row_values.call_count == 3
+
+def test_groups_cache_is_invalidated_by_modified_time_alone(tmp_path):
+    # Given
+    from fb_groups_poster.cache import GroupsCache
+    cache = GroupsCache(str(tmp_path), "sheet-id", "Groups", ttl=900)
+    cache.save("2026-01-01T00:00:00Z", [("http://example.com/group1", "rent")])
+    entry = cache.load()
+
+    # Then: a change within the TTL still misses; the TTL only covers an unknown time
+    assert cache.is_fresh(entry, "2026-01-01T00:00:00Z")
+    assert not cache.is_fresh(entry, "2026-01-01T00:05:00Z")
+    assert cache.is_fresh(entry, None)
+
+def test_groups_cache_restamps_only_checked_rows(tmp_path):
+    # Given
+    from fb_groups_poster.cache import GroupsCache
+    cache = GroupsCache(str(tmp_path), "sheet-id", "Groups")
+    cache.save("t1", [("http://example.com/group1", "rent")])
+
+    # When / Then: rows never checked against the sheet (e.g. offline) are left alone
+    assert not cache.restamp("t2")
+    assert cache.load()["modified"] == "t1"
+
+    # When
+    cache.verified = "t1"
+    restamped = cache.restamp("t2")
+
+    # Then
+    assert restamped
+    assert cache.load()["modified"] == "t2"
+    assert cache.load()["rows"] == [["http://example.com/group1", "rent"]]
+
+def test_get_filtered_group_links_offline(tmp_path, mock_sheets_client):
+    # Given
+    from fb_groups_poster.cache import GroupsCache
+    cache = GroupsCache(str(tmp_path), "sheet-id", "Groups")
+
+    # When / Then: nothing cached yet
+    with pytest.raises(RuntimeError):
+        get_filtered_group_links(mock_sheets_client, [], cache=cache, offline=True)
+
+    # Given
+    cache.save("2026-01-01T00:00:00Z", [("http://example.com/group1", "rent")])
+
+    # When
+    result = get_filtered_group_links(mock_sheets_client, ["rent"], cache=cache, offline=True)
+
+    # Then: served without touching Google
+    assert result == ["http://example.com/group1"]
+    mock_sheets_client.groups_ws.batch_get.assert_not_called()
@@ -0,0 +1,63 @@
+import subprocess
+import sys
+import textwrap
+
+import yaml
+
+HEAVY = ("selenium", "webdriver_manager", "gspread", "google.auth", "google.oauth2", "tqdm", "pyperclip")
+# Cumulative import time of fb_groups_poster.cli; the eager runner import took ~550ms
+HELP_BUDGET_US = 300_000
+
+
+def _run(code):
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", textwrap.dedent(code)], capture_output=True, text=True)
+
+
+def _imported(stderr):
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_help_imports_no_heavy_dependencies_within_budget():
+    # When
+    result = _run("""
+        from fb_groups_poster.cli import main
+        main(["--help"])
+    """)
+
+    # Then
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = _imported(result.stderr)
+    assert not [name for name in times if name.startswith(HEAVY)]
+    assert times["fb_groups_poster.cli"] <= HELP_BUDGET_US, f"{times['fb_groups_poster.cli'] / 1000:.0f}ms"
+
+
+def test_validate_never_imports_selenium(tmp_path):
+    # Given
+    key = tmp_path / "key.json"
+    key.write_text('{"client_email": "bot@example.iam.gserviceaccount.com"}')
+    config = tmp_path / "config.yaml"
+    config.write_text(yaml.dump({
+        "sheets": {"service_account_file": str(key), "spreadsheet_id": "abc"},
+        "browser": {"edge_profile_dir": str(tmp_path)},
+        "poster": {"text": "hello", "image_paths": [], "filter_tags": ["rent"]},
+    }))
+
+    # When
+    result = _run(f"""
+        import sys
+        from fb_groups_poster.cli import main
+        try:
+            main(["validate", "--config", {str(config)!r}])
+        except SystemExit as e:
+            assert e.code == 0, e.code
+        assert not [m for m in sys.modules if m.startswith("selenium")]
+    """)
+
+    # Then
+    assert result.returncode == 0, result.stdout + result.stderr[-2000:]
@@ -0,0 +1,48 @@
+import pytest
+from fb_groups_poster.tag_index import TagIndex, TagQueryError, parse_tag_query
+
+
+@pytest.fixture
+def index():
+    return TagIndex([
+        ("http://example.com/group1", "rent, studio"),
+        ("http://example.com/group2", "rent"),
+        ("http://example.com/group3", "sale, apartment"),
+        ("http://example.com/group4", "rent, studio, pet friendly"),
+        ("http://example.com/group5", "rent, shared"),
+    ])
+
+
+def test_match_all(index):
+    # Then
+    assert index.match_all(["rent", "studio"]) == [0, 3]
+    assert index.match_all([" rent "]) == [0, 1, 3, 4]
+    assert index.match_all(["nonexistent"]) == []
+    assert index.match_all([]) == [0, 1, 2, 3, 4]
+
+
+def test_select_with_query(index):
+    # Then: AND / OR / NOT with precedence NOT > AND > OR
+    assert index.select(query="rent AND NOT studio") == [
+        "http://example.com/group2",
+        "http://example.com/group5",
+    ]
+    assert index.select(query="sale OR studio and not \"pet friendly\"") == [
+        "http://example.com/group1",
+        "http://example.com/group3",
+    ]
+    assert index.select(query="NOT rent") == ["http://example.com/group3"]
+    # filter_tags and query combine with AND
+    assert index.select(["rent"], query="(studio OR shared) AND NOT \"pet friendly\"") == [
+        "http://example.com/group1",
+        "http://example.com/group5",
+    ]
+
+
+def test_parse_tag_query():
+    # Then
+    assert parse_tag_query("a and (b or not c)") == ("and", ["a", ("or", ["b", ("not", "c")])])
+    assert parse_tag_query('"pet friendly"') == "pet friendly"
+    for bad in ["", "a AND", "(a OR b", "a b", "a )"]:
+        with pytest.raises(TagQueryError):
+            parse_tag_query(bad)
@@ -0,0 +1,146 @@
+import pathlib
+import pytest
+from unittest.mock import Mock
+
+from fb_groups_poster.text_input import insert_text, split_lines
+
+FIXTURE = pathlib.Path(__file__).parent / "fixtures" / "group_composer.html"
+TEXT = "Hello group 👋\nمرحبا بالجميع\n\nשלום — last line 🎉"
+
+
+def test_insert_is_one_round_trip():
+    # Given: the editor accepts execCommand
+    driver = Mock()
+    driver.execute_script.return_value = {"index": 4, "broke": False}
+    element = Mock()
+
+    # When
+    method = insert_text(driver, element, TEXT)
+
+    # Then: one script call carrying every line, untouched
+    assert method == "exec_command"
+    assert driver.execute_script.call_count == 1
+    assert driver.execute_script.call_args.args[1:] == (element, split_lines(TEXT))
+    driver.execute_cdp_cmd.assert_not_called()
+    element.send_keys.assert_not_called()
+
+
+def test_insert_falls_back_to_cdp_from_the_failed_line():
+    # Given: execCommand stopped after the first line
+    driver = Mock()
+    driver.execute_script.return_value = {"index": 1, "broke": False}
+
+    # When
+    method = insert_text(driver, Mock(), "one\r\ntwo\n\nthree")
+
+    # Then: Enter between lines, insertText for non-empty lines only
+    assert method == "cdp"
+    calls = [(c.args[0], c.args[1].get("type") or c.args[1].get("text")) for c in driver.execute_cdp_cmd.call_args_list]
+    assert calls == [
+        ("Input.dispatchKeyEvent", "keyDown"), ("Input.dispatchKeyEvent", "keyUp"), ("Input.insertText", "two"),
+        ("Input.dispatchKeyEvent", "keyDown"), ("Input.dispatchKeyEvent", "keyUp"),
+        ("Input.dispatchKeyEvent", "keyDown"), ("Input.dispatchKeyEvent", "keyUp"), ("Input.insertText", "three"),
+    ]
+
+
+def test_insert_does_not_repeat_a_paragraph_break_already_made():
+    # Given: execCommand made the break before line 2, then failed to insert its text
+    driver = Mock()
+    driver.execute_script.return_value = {"index": 1, "broke": True}
+
+    # When
+    method = insert_text(driver, Mock(), "one\ntwo\nthree")
+
+    # Then: the CDP fallback starts with line 2's text, not another Enter
+    assert method == "cdp"
+    calls = [(c.args[0], c.args[1].get("type") or c.args[1].get("text")) for c in driver.execute_cdp_cmd.call_args_list]
+    assert calls == [
+        ("Input.insertText", "two"),
+        ("Input.dispatchKeyEvent", "keyDown"), ("Input.dispatchKeyEvent", "keyUp"), ("Input.insertText", "three"),
+    ]
+
+
+def test_keys_fallback_does_not_repeat_a_paragraph_break_already_made():
+    # Given: the break before line 2 went in by CDP, then CDP failed on its text
+    driver = Mock()
+    driver.execute_script.return_value = {"index": 1, "broke": False}
+    driver.execute_cdp_cmd.side_effect = [None, None, RuntimeError("insertText failed")]
+    element = Mock()
+
+    # When
+    method = insert_text(driver, element, "one\ntwo")
+
+    # Then
+    assert method == "keys"
+    element.send_keys.assert_called_once_with("two")
+
+
+def test_insert_falls_back_to_keys_without_cdp():
+    # Given
+    driver = Mock()
+    driver.execute_script.side_effect = Exception("javascript error")
+    driver.execute_cdp_cmd.side_effect = AttributeError("no CDP")
+    element = Mock()
+
+    # When
+    method = insert_text(driver, element, "a\nb")
+
+    # Then
+    assert method == "keys"
+    element.send_keys.assert_called_once_with("a\nb")
+
+
+def _open_editor(driver, url=FIXTURE.as_uri()):
+    """Load the fixture and open its composer, like post_to_group does; returns the focused editor."""
+    from selenium.webdriver.common.by import By
+    driver.get(url)
+    driver.find_element(By.ID, "open-composer").click()
+    editor = driver.find_element(By.ID, "editor")
+    editor.click()
+    return editor
+
+
+def test_insert_text_against_fixture(live_driver):
+    # Given
+    editor = _open_editor(live_driver)
+
+    # When
+    method = insert_text(live_driver, editor, TEXT)
+
+    # Then: newlines, emoji and RTL text come out as written
+    assert method == "exec_command"
+    assert live_driver.execute_script("return arguments[0].innerText", editor).rstrip("\n") == TEXT
+
+
+def test_insert_time_does_not_grow_with_length(live_driver):
+    # Given: every WebDriver command the driver sends is counted
+    import time
+    commands = []
+    executor = live_driver.command_executor
+    original = executor.execute
+
+    def execute(command, params):
+        commands.append(command)
+        return original(command, params)
+
+    executor.execute = execute
+
+    def insert(size):
+        editor = _open_editor(live_driver)
+        text = ("x" * 79 + "\n") * (size // 80)
+        commands.clear()
+        started = time.perf_counter()
+        method = insert_text(live_driver, editor, text)
+        elapsed = time.perf_counter() - started
+        sent = len(commands)
+        assert method == "exec_command"
+        assert len(live_driver.execute_script("return arguments[0].innerText", editor)) >= len(text) - 1
+        return elapsed, sent
+
+    # When
+    short_time, short_commands = insert(100)
+    long_time, long_commands = insert(20000)
+
+    # Then: 200 times the text is still one round-trip, and nowhere near 200 times slower
+    assert short_commands == long_commands == 1
+    assert long_time < max(10 * short_time, 0.5)
@@ -0,0 +1,63 @@
+from fb_groups_poster.waits import AdaptiveTimeouts, percentile
+
+
+def test_percentile():
+    # Then
+    assert percentile([], 95) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([float(i) for i in range(1, 101)], 95) == 95.0
+
+
+def test_adaptive_timeouts_tune_from_history():
+    # Given
+    timeouts = AdaptiveTimeouts(defaults={"create_post": 10.0, "posting_finished": 120.0}, min_samples=5, floor=1.0)
+
+    # Then: defaults until enough samples
+    for _ in range(4):
+        timeouts.record("create_post", 1.5)
+    assert timeouts.timeout("create_post") == 10.0
+
+    # When
+    timeouts.record("create_post", 2.0)
+    # Then: p95 * margin
+    assert timeouts.timeout("create_post") == 4.0
+
+    # When: slow history never exceeds the default
+    for _ in range(20):
+        timeouts.record("create_post", 9.0)
+    assert timeouts.timeout("create_post") == 10.0
+
+    # When: fixed steps are never shortened
+    for _ in range(20):
+        timeouts.record("posting_finished", 5.0)
+    assert timeouts.timeout("posting_finished") == 120.0
+
+
+def test_adaptive_timeouts_step_records_only_success():
+    # Given
+    timeouts = AdaptiveTimeouts(defaults={"text_area": 10.0})
+
+    # When
+    with timeouts.step("text_area") as timeout:
+        assert timeout == 10.0
+    try:
+        with timeouts.step("text_area"):
+            raise RuntimeError("not found")
+    except RuntimeError:
+        pass
+
+    # Then
+    assert len(timeouts.samples("text_area")) == 1
+
+
+def test_adaptive_timeouts_persist(tmp_path):
+    # Given
+    path = str(tmp_path / "timings" / "steps.json")
+    timeouts = AdaptiveTimeouts(path=path)
+    timeouts.record("create_post", 1.25)
+
+    # When
+    timeouts.save()
+
+    # Then
+    assert AdaptiveTimeouts(path=path).samples("create_post") == [1.25]
@@ -0,0 +1,154 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+
+from fb_groups_poster.config import AppConfig, BrowserConfig, PosterConfig, SheetsConfig
+from fb_groups_poster.poster import PostResult
+from fb_groups_poster.runner import run_posting
+from fb_groups_poster.watchdog import BrowserWatchdog, process_tree_rss
+
+
+def test_watchdog_recycles_after_post_count():
+    # Given
+    watchdog = BrowserWatchdog(max_posts=3)
+
+    # When
+    for _ in range(2):
+        watchdog.record(1.0)
+    # Then
+    assert watchdog.check() is None
+    watchdog.record(1.0)
+    assert watchdog.check() == "posts"
+    watchdog.reset()
+    assert watchdog.check() is None
+
+
+def test_watchdog_memory_and_latency_limits():
+    # Given
+    watchdog = BrowserWatchdog(max_rss_mb=1000, latency_factor=2.0, window=3)
+
+    # When: the first window sets the baseline
+    for seconds in (4.0, 5.0, 6.0):
+        watchdog.record(seconds)
+
+    # Then
+    assert watchdog.baseline == 5.0
+    assert watchdog.check(rss=500 * 1024 * 1024) is None
+    assert watchdog.check(rss=1200 * 1024 * 1024) == "memory"
+    assert watchdog.check(rss=None) is None
+
+    # When: posts get twice as slow
+    for seconds in (9.0, 11.0, 10.0):
+        watchdog.record(seconds)
+    # Then
+    assert watchdog.check() == "latency"
+
+    # When: a fresh session is back to normal; the baseline survives the reset
+    watchdog.reset()
+    for seconds in (5.0, 5.0, 5.0):
+        watchdog.record(seconds)
+    # Then
+    assert watchdog.baseline == 5.0
+    assert watchdog.check() is None
+
+
+def test_watchdog_counts_posts_without_browser_time():
+    # Given
+    watchdog = BrowserWatchdog(max_posts=2, latency_factor=2.0, window=2)
+
+    # When: a post that never reached the browser, then a real one
+    watchdog.record(None)
+    watchdog.record(3.0)
+
+    # Then: both count toward the session, only one toward latency
+    assert watchdog.check() == "posts"
+    assert watchdog.baseline is None
+
+
+def test_watchdog_disabled_by_default():
+    # Given
+    watchdog = BrowserWatchdog()
+
+    # Then
+    assert not watchdog.enabled
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs psutil or /proc")
+def test_process_tree_rss_of_this_process():
+    # When
+    rss = process_tree_rss(os.getpid())
+
+    # Then
+    assert rss > 1024 * 1024
+
+
+def test_run_recycles_browser_without_losing_state(mocker, tmp_path):
+    # Given: one browser, recycled every two posts
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir", recycle_after_posts=2),
+        poster=PosterConfig(text="dummy text", image_paths=[], filter_tags=["tag1"]),
+        cache_dir=str(tmp_path),
+    )
+    links = [f"http://example.com/group{i}" for i in range(1, 6)]
+    first = MagicMock()
+    fresh = [MagicMock(), MagicMock()]
+
+    def launch(cfg, workers, clones, profiles=None):
+        profiles.append(cfg.browser)
+        return [first]
+
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', return_value=links)
+    mocker.patch('fb_groups_poster.runner._launch_browsers', side_effect=launch)
+    build = mocker.patch('fb_groups_poster.runner.build_edge', side_effect=fresh)
+    mock_post = mocker.patch('fb_groups_poster.runner.post_to_group', return_value=PostResult(True))
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then: relaunched on the same profile after posts 2 and 4, every group posted once
+    assert ok
+    assert build.call_count == 2
+    assert build.call_args.args[0] is cfg.browser
+    assert [c.args[2] for c in mock_post.call_args_list] == links
+    assert [c.args[0] for c in mock_post.call_args_list] == [first, first, fresh[0], fresh[0], fresh[1]]
+    for driver in [first, *fresh]:
+        driver.quit.assert_called_once()
+
+
+def test_pacing_waits_do_not_count_as_browser_latency(mocker, tmp_path):
+    # Given: every post takes 1s in the browser, but later ones wait on pacing first
+    import time
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir", recycle_latency_factor=2.0),
+        poster=PosterConfig(text="dummy text", image_paths=[], filter_tags=["tag1"]),
+        cache_dir=str(tmp_path),
+    )
+    links = [f"http://example.com/group{i}" for i in range(1, 26)]
+    calls = []
+
+    def acquire(url, cooldown=True):
+        calls.append(url)
+        if len(calls) > 10:
+            time.sleep(0.02)
+        return 0.0
+
+    def launch(cfg, workers, clones, profiles=None):
+        profiles.append(cfg.browser)
+        return [MagicMock()]
+
+    mocker.patch('fb_groups_poster.runner.init_sheets', return_value=MagicMock())
+    mocker.patch('fb_groups_poster.planner.get_filtered_group_links', return_value=links)
+    mocker.patch('fb_groups_poster.runner._launch_browsers', side_effect=launch)
+    mocker.patch('fb_groups_poster.runner.Scheduler.acquire', side_effect=acquire)
+    build = mocker.patch('fb_groups_poster.runner.build_edge')
+    mocker.patch('fb_groups_poster.runner.post_to_group', return_value=PostResult(True, seconds=1.0))
+
+    # When
+    ok = run_posting(cfg, assume_yes=True)
+
+    # Then
+    assert ok
+    build.assert_not_called()
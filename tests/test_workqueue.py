@@ -0,0 +1,208 @@
+import subprocess
+import sys
+import textwrap
+from unittest.mock import MagicMock
+
+from fb_groups_poster.config import AppConfig, BrowserConfig, Campaign, PosterConfig, RetryConfig, SheetsConfig
+from fb_groups_poster.planner import GroupVisit
+from fb_groups_poster.poster import PostResult
+from fb_groups_poster.workqueue import WorkQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+def test_expired_lease_is_reassigned(tmp_path):
+    # Given
+    clock = FakeClock()
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), clock=clock)
+    queue.create_run("run-1", [("g1", ["a"]), ("g2", ["a", "b"])])
+
+    # When
+    first = queue.claim("run-1", "host-a", lease_seconds=60)
+    second = queue.claim("run-1", "host-b", lease_seconds=60)
+
+    # Then: every visit is out; nothing else to hand out yet
+    assert (first.url, second.url) == ("g1", "g2")
+    assert second.campaigns == ["a", "b"]
+    assert queue.claim("run-1", "host-c", lease_seconds=60) is None
+    assert queue.next_ready_in("run-1") == 60
+
+    # When: host-a renews, host-b goes quiet past its lease
+    clock.now += 30
+    assert queue.renew(first, 60)
+    clock.now += 31
+    third = queue.claim("run-1", "host-c", lease_seconds=60)
+
+    # Then: only host-b's visit moves on, and host-b can no longer report it
+    assert third.url == "g2"
+    assert not queue.complete(second, True)
+    assert queue.complete(third, True)
+    assert queue.complete(first, False, "a: timeout")
+    assert queue.counts("run-1") == {"pending": 0, "leased": 0, "posted": 1, "failed": 1}
+    assert queue.next_ready_in("run-1") is None
+
+
+def test_visit_failed_after_too_many_expired_leases(tmp_path):
+    # Given: a visit whose worker dies every time
+    clock = FakeClock()
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), clock=clock)
+    queue.create_run("run-1", [("g1", [""])])
+
+    # When
+    for _ in range(2):
+        assert queue.claim("run-1", "w", lease_seconds=10, max_claims=2) is not None
+        clock.now += 11
+
+    # Then
+    assert queue.claim("run-1", "w", lease_seconds=10, max_claims=2) is None
+    assert queue.counts("run-1")["failed"] == 1
+
+
+def test_deferred_visit_waits_and_stop_halts_claims(tmp_path):
+    # Given
+    clock = FakeClock()
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), clock=clock)
+    queue.create_run("run-1", [])
+    queue.defer("run-1", "g1", ["a"], attempt=2, delay=120)
+
+    # Then
+    assert queue.claim("run-1", "w", 60) is None
+    assert queue.next_ready_in("run-1") == 120
+    clock.now += 120
+    lease = queue.claim("run-1", "w", 60)
+    assert lease.attempt == 2
+    queue.release(lease)
+
+    # When
+    queue.stop("run-1", "login")
+
+    # Then
+    assert queue.stopped("run-1") == "login"
+    assert queue.claim("run-1", "w", 60) is None
+    queue.unstop("run-1")
+    assert queue.claim("run-1", "w", 60) is not None
+    assert queue.latest_run() == "run-1"
+
+
+WORKER = textwrap.dedent("""
+    import sys, time
+    from fb_groups_poster.workqueue import WorkQueue
+
+    path, name, crash = sys.argv[1], sys.argv[2], sys.argv[3] == "crash"
+    queue = WorkQueue(path)
+    done = []
+    while True:
+        lease = queue.claim("run-1", name, lease_seconds=1.0)
+        if lease is None:
+            if queue.next_ready_in("run-1") is None:
+                break
+            time.sleep(0.05)
+            continue
+        if crash:
+            # Dies holding the lease
+            sys.exit(0)
+        time.sleep(0.005)
+        if queue.complete(lease, True):
+            done.append(lease.url)
+    print(",".join(done))
+""")
+
+
+def test_worker_processes_share_the_queue(tmp_path):
+    # Given
+    path = str(tmp_path / "queue.sqlite")
+    urls = [f"g{i}" for i in range(60)]
+    WorkQueue(path).create_run("run-1", [(url, [""]) for url in urls])
+
+    # When: one worker crashes on its first visit, three others share the rest
+    crasher = subprocess.run([sys.executable, "-c", WORKER, path, "crasher", "crash"], timeout=60)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", WORKER, path, f"w{i}", "-"], stdout=subprocess.PIPE, text=True)
+        for i in range(3)
+    ]
+    outputs = [proc.communicate(timeout=120)[0].strip() for proc in procs]
+
+    # Then: every visit posted exactly once, the crashed lease included, and spread over workers
+    assert crasher.returncode == 0
+    posted = [url for out in outputs for url in out.split(",") if url]
+    assert sorted(posted) == sorted(urls)
+    assert sum(1 for out in outputs if out) >= 2
+    assert WorkQueue(path).counts("run-1")["posted"] == 60
+
+
+def test_coordinate_and_work(mocker, tmp_path):
+    # Given: two campaigns over three groups, queued by the coordinator
+    from fb_groups_poster.commands import queue_groups
+    from fb_groups_poster.worker import run_worker
+    a = Campaign(text="first", name="a")
+    b = Campaign(text="second", name="b")
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir", workers=2),
+        poster=PosterConfig(campaigns=[a, b]),
+        cache_dir=str(tmp_path),
+        retry=RetryConfig(base_delay=0),
+    )
+    visits = [GroupVisit("g1", [a, b]), GroupVisit("g2", [a]), GroupVisit("g3", [b])]
+    mocker.patch("fb_groups_poster.planner.select_visits", return_value=visits)
+    path = str(tmp_path / "queue.sqlite")
+    assert queue_groups(cfg, path, offline=True, assume_yes=True)
+
+    # Given: a worker whose first attempt on g3 times out
+    mocker.patch("fb_groups_poster.runner.init_sheets", return_value=MagicMock())
+    mocker.patch("fb_groups_poster.runner._launch_browsers", return_value=[MagicMock(), MagicMock()])
+    attempts = {}
+
+    def post(driver, client, url, text, *args, **kwargs):
+        attempts[(url, text)] = attempts.get((url, text), 0) + 1
+        if url == "g3" and attempts[(url, text)] == 1:
+            return PostResult(False, "timeout", "Create-post input not found")
+        return PostResult(True)
+
+    mocker.patch("fb_groups_poster.runner.post_to_group", side_effect=post)
+
+    # When
+    ok = run_worker(cfg, path, worker="test")
+
+    # Then: every post made once, the timed-out one retried through the queue
+    assert ok
+    assert attempts == {("g1", "first"): 1, ("g1", "second"): 1, ("g2", "first"): 1, ("g3", "second"): 2}
+    counts = WorkQueue(path).counts(WorkQueue(path).latest_run())
+    assert counts["pending"] == counts["leased"] == 0
+    assert counts["posted"] == 3
+
+
+def test_worker_retries_stop_at_the_retry_budget(mocker, tmp_path):
+    # Given: a queued group that always times out, and a retry backoff past the budget
+    from fb_groups_poster.commands import queue_groups
+    from fb_groups_poster.worker import run_worker
+    cfg = AppConfig(
+        sheets=SheetsConfig(service_account_file="dummy.json", spreadsheet_id="dummy_id"),
+        browser=BrowserConfig(edge_profile_dir="dummy_dir"),
+        poster=PosterConfig(text="hello"),
+        cache_dir=str(tmp_path),
+        retry=RetryConfig(max_attempts=3, base_delay=120, budget_minutes=1),
+    )
+    mocker.patch("fb_groups_poster.planner.select_visits", return_value=[GroupVisit("g1", cfg.poster.all_campaigns())])
+    path = str(tmp_path / "queue.sqlite")
+    assert queue_groups(cfg, path, offline=True, assume_yes=True)
+    mocker.patch("fb_groups_poster.runner.init_sheets", return_value=MagicMock())
+    mocker.patch("fb_groups_poster.runner._launch_browsers", return_value=[MagicMock()])
+    mock_post = mocker.patch("fb_groups_poster.runner.post_to_group", return_value=PostResult(False, "timeout"))
+
+    # When
+    ok = run_worker(cfg, path, worker="test")
+
+    # Then: no retry is queued; the visit is failed right away
+    assert not ok
+    assert mock_post.call_count == 1
+    queue = WorkQueue(path)
+    counts = queue.counts(queue.latest_run())
+    assert counts["failed"] == 1
+    assert counts["pending"] == counts["leased"] == 0